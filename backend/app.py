@@ -1,63 +1,266 @@
 import asyncio
+import json
 import logging
 import os
-from collections import OrderedDict
+import tempfile
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import replace
-from typing import List, Any
-from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Iterable, List, Any, Optional, Tuple, TypeVar
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Request
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
+from starlette.requests import ClientDisconnect
 
+from backend.cluster.coordinator import ClusterUnavailable, Coordinator
+from backend.cluster.protocol import parse_address
 from backend.config import Settings, load_settings
 from backend.models import (
+    AnalyzeOptions,
     AnalyzeRequest,
     AnalyzeResponse,
-    FileResult,
+    DictionaryUpdate,
+    Document,
     HealthResponse,
+    LiveRevision,
 )
-from backend.processing.file_worker import process_document
-from backend.services.file_decode import decode_uploaded_file
+from backend.processing.cancellation import DeadlineHandle
+from backend.processing.file_worker import process_document, unanalyzed_result
+from backend.processing.large_document import (
+    open_large_index,
+    process_large_document,
+    remove_document,
+    store_document,
+)
+from backend.processing.profiling import (
+    PROFILE_ID_RE,
+    collapsed_stacks_path,
+    profile_document,
+    store_collapsed_stacks,
+)
+from backend.processing.reports import EXPORT_FORMATS, encode_export, iter_export, iter_record_pieces, jsonl_record_pieces
+from backend.processing.results import DocumentResult, encode_files_json
+from backend.processing.worker_pool import RecyclingPool
+from backend.services.admission import BULK, INTERACTIVE, AdmissionController, AdmissionRejected, Ticket
+from backend.services.coalescing import SingleFlight, content_digest
+from backend.services.custom_dictionaries import (
+    canonical_words,
+    delete_dictionary,
+    dictionary_exists,
+    read_dictionary,
+    update_dictionary,
+)
+from backend.services.file_decode import decode_uploaded_file_timed
+from backend.services.json_stream import ITEM, JSONStreamError, ObjectStreamParser
+from backend.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Registry
+from backend.services.storage import ExportStore, open_content_store
+from backend.services.windowing import IndexCache, issues_key
 
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+DICTIONARY_NAME_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+T = TypeVar("T")
 
 logger = logging.getLogger("backend")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
 
-class _ContentCache:
-    """Tiny LRU cache to keep decoded text for on-demand editor loads."""
+settings: Settings = load_settings()
+content_cache = open_content_store(settings)
+window_indexes = IndexCache(settings.window_index_items)
+inflight_analyses = SingleFlight()
+export_store = ExportStore(os.path.join(settings.storage_root, "exports"), settings.export_ttl_seconds)
+process_workers = settings.process_workers or max(1, os.cpu_count() or 1)
+# Worker processes start in `lifespan`, not at import, so `--reload`, tooling and anything else importing the
+# app stay cheap.
+worker_pool = RecyclingPool(
+    process_workers,
+    settings,
+    start_method=settings.pool_start_method,
+    max_tasks=settings.worker_max_tasks,
+    max_rss_bytes=settings.worker_max_rss_mb * 1024 * 1024,
+)
+# Slots sized for the pool; asyncio's default executor (the fallback without a pool) has at least as many threads.
+pool_capacity = process_workers
+admission = AdmissionController(
+    # One slot per worker by default so the scheduler, not the executor's FIFO, decides what runs next.
+    settings.admission_max_inflight or pool_capacity,
+    max_queued_bytes=settings.admission_max_queued_bytes,
+    max_queued_requests=settings.admission_max_queued_requests,
+    interactive_burst=settings.scheduler_interactive_burst,
+)
 
-    def __init__(self, capacity: int):
-        self.capacity = max(1, capacity)
-        self._store: OrderedDict[str, str] = OrderedDict()
 
-    def put(self, key: str, value: str) -> None:
-        self._store[key] = value
-        self._store.move_to_end(key)
-        if len(self._store) > self.capacity:
-            self._store.popitem(last=False)
+def _cluster_capacity_changed(slots: int) -> None:
+    """Size pool load and admission slots for the connected nodes (the local pool when there are none)."""
+    global pool_capacity
+    pool_capacity = slots or process_workers
+    if not settings.admission_max_inflight:
+        admission.resize(pool_capacity)
 
-    def get(self, key: str) -> str | None:
-        value = self._store.get(key)
-        if value is not None:
-            self._store.move_to_end(key)
-        return value
 
+cluster: Optional[Coordinator] = None
+if settings.cluster_listen:
+    cluster = Coordinator(
+        *parse_address(settings.cluster_listen, default_host="0.0.0.0"),
+        secret=settings.cluster_secret,
+        heartbeat_seconds=settings.cluster_heartbeat_seconds,
+        node_timeout=settings.cluster_node_timeout,
+        max_attempts=settings.cluster_max_attempts,
+        max_frame_bytes=settings.cluster_max_frame_mb * 1024 * 1024,
+        on_capacity=_cluster_capacity_changed,
+    )
+metrics = Registry()
+stage_seconds = metrics.histogram(
+    "turbotext_stage_seconds",
+    "Time per pipeline stage; worker stages are measured inside the pool processes.",
+    ["stage"],
+)
+pool_wait_seconds = metrics.histogram(
+    "turbotext_pool_wait_seconds", "Pool round-trip time not spent in the task itself (queueing plus IPC)."
+)
+pool_inflight = metrics.gauge("turbotext_pool_inflight_tasks", "Tasks submitted to the process pool and not yet finished.")
+metrics.gauge(
+    "turbotext_pool_queue_depth",
+    "Submitted tasks waiting for a free pool worker.",
+    callback=lambda: {(): max(0, pool_inflight.value() - pool_capacity)},
+)
+metrics.gauge(
+    "turbotext_pool_workers", "Process pool size (0 when running on threads).", callback=lambda: {(): worker_pool.process_workers}
+)
+metrics.gauge("turbotext_pool_generation", "Times the worker pool has been started or recycled.", callback=lambda: {(): worker_pool.generation})
+metrics.counter(
+    "turbotext_pool_recycles_total",
+    "Worker pool replacements, by the limit that triggered them.",
+    ["reason"],
+    callback=lambda: {(reason,): count for reason, count in worker_pool.recycles.items()},
+)
+metrics.gauge(
+    "turbotext_pool_worker_rss_bytes",
+    "Largest RSS reported by a worker of the current pool generation.",
+    callback=lambda: {(): worker_pool.worker_rss_bytes},
+)
+if cluster is not None:
+    metrics.gauge("turbotext_cluster_nodes", "Worker nodes connected to the coordinator.", callback=lambda: {(): len(cluster.nodes)})
+    metrics.gauge("turbotext_cluster_slots", "Tasks the connected worker nodes run at once.", callback=lambda: {(): cluster.capacity})
+    metrics.counter(
+        "turbotext_cluster_tasks_total",
+        "Cluster task events: dispatched, completed, task_errors, cancelled, requeued (node lost), failed (out of attempts).",
+        ["event"],
+        callback=lambda: {(k,): v for k, v in cluster.counters.items() if k != "nodes_lost"},
+    )
+    metrics.counter(
+        "turbotext_cluster_nodes_lost_total",
+        "Nodes dropped (disconnect or missed heartbeats).",
+        callback=lambda: {(): cluster.counters["nodes_lost"]},
+    )
+live_revisions_total = metrics.counter(
+    "turbotext_live_revisions_total",
+    "Revisions received on /ws/live, by fate: analyzed, superseded (a newer one replaced it first), rejected.",
+    ["outcome"],
+)
+documents_total = metrics.counter("turbotext_documents_total", "Documents analyzed, by outcome.", ["outcome"])
+upload_bytes_total = metrics.counter("turbotext_upload_bytes_total", "Raw uploaded bytes read.")
+processed_bytes_total = metrics.counter("turbotext_processed_bytes_total", "UTF-8 bytes of decoded text analyzed.")
+_CACHE_EVENTS = ("hits", "misses", "evictions", "spills", "spill_hits", "expired")
+metrics.counter(
+    "turbotext_content_cache_events_total",
+    "Content cache lookups and evictions.",
+    ["event"],
+    callback=lambda: {(k,): v for k, v in content_cache.stats().items() if k in _CACHE_EVENTS},
+)
+metrics.gauge(
+    "turbotext_content_cache_hit_ratio",
+    "Content cache hits / lookups since start.",
+    callback=lambda: {(): _cache_hit_ratio(content_cache.stats())},
+)
+metrics.gauge(
+    "turbotext_content_cache_bytes",
+    "Bytes held by the content cache (compressed).",
+    callback=lambda: {(): content_cache.stats().get("bytes", 0)},
+)
+admission_wait_seconds = metrics.histogram(
+    "turbotext_admission_wait_seconds",
+    "Per request: longest wait of any of its pool tasks for an in-flight slot.",
+    ["lane"],
+)
+admission_rejections = metrics.counter("turbotext_admission_rejections_total", "Requests refused at admission.", ["reason"])
+metrics.gauge(
+    "turbotext_admission_state",
+    "Admission controller occupancy.",
+    ["field"],
+    callback=lambda: {(k,): v for k, v in admission.stats().items()},
+)
+request_interruptions_total = metrics.counter(
+    "turbotext_request_interruptions_total",
+    "Work cut short: documents returned partial at their deadline, requests cancelled by a client disconnect.",
+    ["reason"],
+)
+coalesced_documents_total = metrics.counter(
+    "turbotext_coalesced_documents_total",
+    "Documents answered by an identical document already in flight instead of their own pool task.",
+)
+coalesced_bytes_total = metrics.counter(
+    "turbotext_coalesced_bytes_total", "UTF-8 bytes of text not analyzed again thanks to coalescing."
+)
+metrics.gauge(
+    "turbotext_coalescing_inflight",
+    "Distinct documents in flight that identical ones can join.",
+    callback=lambda: {(): len(inflight_analyses)},
+)
+_OUTCOMES = ("preflight_rejected", "issue_density_exceeded", "deadline_exceeded")
+# Slack past a request deadline before the API stops waiting for a worker that has not reported back.
+_DEADLINE_GRACE_SECONDS = 1.0
+_DISCONNECT_POLL_SECONDS = 0.5
 
-settings: Settings = load_settings()
-content_cache = _ContentCache(settings.content_cache_items)
-process_workers = settings.process_workers or max(1, os.cpu_count() or 1)
-try:
-    process_pool = ProcessPoolExecutor(max_workers=process_workers)
-    process_pool_workers = process_workers
-except PermissionError as exc:  # pragma: no cover - environment-specific
-    logger.warning("Process pool unavailable (%s); falling back to threads", exc)
-    process_pool = None
-    process_pool_workers = 0
 
-app = FastAPI(title="Spell/Grammar Analysis API", version="1.0.0")
+def _cache_hit_ratio(stats: dict) -> float:
+    hits = stats.get("hits", 0)
+    lookups = hits + stats.get("misses", 0)
+    return hits / lookups if lookups else 0.0
+
+
+def _outcome(result: DocumentResult) -> str:
+    if not result.error:
+        return "ok"
+    kind = result.error.split(":", 1)[0]
+    return kind if kind in _OUTCOMES else "failed"
+
+
+async def _run_in_pool(fn, *args, local: bool = False, deadline: Optional[DeadlineHandle] = None):
+    """
+    Run `fn(*args)` on a cluster node if any are attached (unless `local`), else in this host's pool. `deadline`
+    lets a local task's deadline be extended while it runs (node tasks keep the one they were sent with).
+    """
+    pool_inflight.inc()
+    try:
+        if cluster is not None and cluster.nodes and not local:
+            try:
+                return await cluster.run(fn, *args)
+            except ClusterUnavailable as exc:  # every node left (or kept dying under it): run it here
+                logger.warning("Running task locally: %s", exc)
+        return await worker_pool.run(fn, *args, deadline=deadline)
+    finally:
+        pool_inflight.dec()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    worker_pool.start()
+    if cluster is not None:
+        await cluster.start()
+    try:
+        yield
+    finally:
+        if cluster is not None:
+            await cluster.close()
+        await worker_pool.close()
+        content_cache.flush()
+
+
+app = FastAPI(title="Spell/Grammar Analysis API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -78,6 +281,7 @@ async def index() -> str:
         <ul>
           <li><a href="/docs">Open API Docs</a></li>
           <li>Health check: <code>/health</code></li>
+          <li>Metrics (Prometheus): <code>/metrics</code></li>
           <li>Analyze: <code>POST /analyze</code> with JSON body <code>{"documents":[{"id":"doc1","content":"text..."}]}</code></li>
           <li>Analyze files: <code>POST /analyze-files</code> (form-data files)</li>
         </ul>
@@ -88,35 +292,548 @@ async def index() -> str:
 
 @app.get("/health", response_model=HealthResponse)
 async def health() -> HealthResponse:
-    return HealthResponse(details={"process_workers": process_pool_workers})
+    return HealthResponse(
+        details={
+            "process_workers": worker_pool.process_workers,
+            "pool": worker_pool.stats(),
+            "content_cache": content_cache.stats(),
+            "admission": admission.stats(),
+            "coalescing": inflight_analyses.stats(),
+            "cluster": cluster.stats() if cluster is not None else None,
+        }
+    )
 
 
-async def _analyze_single(doc: dict, effective_settings: Settings, include_content: bool = True) -> FileResult:
-    loop = asyncio.get_running_loop()
-    content_id = doc.get("content_id")
-    cached_available = content_cache.get(content_id) is not None if content_id else False
+@app.get("/metrics")
+async def get_metrics() -> Response:
+    """Prometheus text exposition of stage timings, pool saturation, cache and throughput counters."""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _lane(priority: Optional[str], documents: int, size: int) -> str:
+    """Explicit `priority`, else interactive for a single small document (an editor check)."""
+    if priority in (INTERACTIVE, BULK):
+        return priority
+    return INTERACTIVE if documents == 1 and size <= settings.interactive_max_bytes else BULK
+
+
+def _client_key(request: Request) -> str:
+    return request.headers.get("x-client-id") or (request.client.host if request.client else "")
+
+
+def _rejection(exc: AdmissionRejected) -> HTTPException:
+    admission_rejections.inc(1, exc.reason)
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+    return HTTPException(status_code=exc.status_code, detail=exc.detail, headers=headers)
+
+
+@asynccontextmanager
+async def _admitted(
+    request: Request, documents: int, size: int, priority: Optional[str], tasks: Optional[int] = None
+) -> AsyncIterator[Ticket]:
+    """
+    Admit a request or fail fast with 429/503 (+ Retry-After) instead of queueing without bound. `tasks` is the
+    number of pool tasks it will run when that differs from `documents` (uploads are decoded, then analyzed).
+    """
+    try:
+        lane = _lane(priority, documents, size)
+        ticket = admission.admit(documents if tasks is None else tasks, size, lane, _client_key(request))
+    except AdmissionRejected as exc:
+        raise _rejection(exc)
+    try:
+        yield ticket
+    finally:
+        admission.release(ticket)
+        admission_wait_seconds.observe(ticket.max_wait_seconds, ticket.lane)
+
+
+def _queue_wait_headers(ticket: Ticket) -> dict:
+    return {"X-Queue-Wait-Ms": f"{ticket.max_wait_seconds * 1000.0:.1f}", "X-Priority-Lane": ticket.lane}
+
+
+def _response_headers(results: List[DocumentResult], ticket: Ticket, export_id: Optional[str] = None) -> dict:
+    headers = _queue_wait_headers(ticket)
+    if export_id:
+        headers["X-Export-Id"] = export_id
+    partial = sum(1 for result in results if result.stats.get("partial"))
+    if partial:
+        headers["X-Partial-Results"] = str(partial)
+    return headers
+
+
+def _request_deadline(timeout: Optional[float]) -> float:
+    """Absolute deadline from `?timeout=` (capped at REQUEST_TIMEOUT_MAX_SECONDS) or REQUEST_TIMEOUT_SECONDS; 0 = none."""
+    seconds = min(timeout, settings.request_timeout_max_seconds) if timeout else settings.request_timeout_seconds
+    return time.time() + seconds if seconds > 0 else 0.0
+
+
+async def _until_disconnected(request: Request) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(_DISCONNECT_POLL_SECONDS)
+
+
+async def _unless_disconnected(request: Request, work: Awaitable[T]) -> T:
+    """
+    Await `work`, cancelling it if the client disconnects first. Cancellation reaches the pool: queued
+    documents are dropped, running ones stop between chunks, and their admission slots are released at once.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.create_task(_until_disconnected(request))
     try:
-        result = await loop.run_in_executor(
-            process_pool, process_document, doc["id"], doc["content"], effective_settings
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    if task.cancelled():
+        request_interruptions_total.inc(1, "client_disconnect")
+        raise HTTPException(status_code=499, detail="Client closed the connection")
+    return task.result()
+
+
+def _is_large_upload(upload: UploadFile) -> bool:
+    """Too big for MAX_FILE_BYTES but within LARGE_DOCUMENT_MAX_BYTES, and not a DOCX (which must be parsed whole)."""
+    size = upload.size
+    if size is None or size <= settings.max_file_bytes:
+        return False
+    if size > settings.large_document_max_bytes:
+        return False  # rejected below as before
+    return os.path.splitext(upload.filename or "")[1].lower() != ".docx"
+
+
+def _upload_tasks(uploads: List[UploadFile]) -> int:
+    """Pool tasks a set of uploads runs: a decode and an analysis each, or only the analysis for a large one."""
+    return sum(1 if _is_large_upload(f) else 2 for f in uploads)
+
+
+def _upload_cost(upload: UploadFile) -> int:
+    """
+    Bytes an upload is charged against ADMISSION_MAX_QUEUED_BYTES. A large document is read from disk a few
+    chunks at a time, so it costs no more memory than the largest in-memory upload (MAX_FILE_BYTES).
+    """
+    size = upload.size or 0
+    return min(size, settings.max_file_bytes) if _is_large_upload(upload) else size
+
+
+async def _read_uploads(uploads: List[UploadFile], include_content: bool, ticket: Optional[Ticket] = None) -> List[dict]:
+    """
+    Read uploads and decode them in the process pool so DOCX parsing never blocks the loop. Plain-text uploads
+    above MAX_FILE_BYTES are copied to disk unread instead and analyzed in large-document mode.
+    """
+    payloads = []
+    large = {}
+
+    async def _decode(filename, data):
+        async with admission.slot(ticket, len(data)):
+            submitted = time.perf_counter()
+            text, reason, seconds = await _run_in_pool(decode_uploaded_file_timed, filename, data)
+        stage_seconds.observe(seconds, "decode")
+        pool_wait_seconds.observe(max(0.0, time.perf_counter() - submitted - seconds))
+        return text
+
+    try:
+        for idx, f in enumerate(uploads):
+            doc_id = f.filename or f"file{idx+1}"
+            if _is_large_upload(f):
+                started = time.perf_counter()
+                await f.seek(0)
+                large[idx] = await asyncio.to_thread(
+                    store_document,
+                    f.file,
+                    settings.storage_root,
+                    settings.large_document_ttl_seconds,
+                    settings.large_document_disk_bytes,
+                    f.size,
+                )
+                stage_seconds.observe(time.perf_counter() - started, "read")
+                upload_bytes_total.inc(large[idx][1])
+                payloads.append((doc_id, f.filename, b""))
+                continue
+            started = time.perf_counter()
+            data = await f.read()
+            stage_seconds.observe(time.perf_counter() - started, "read")
+            upload_bytes_total.inc(len(data))
+            if len(data) > settings.max_file_bytes:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File '{f.filename}' exceeds {settings.max_file_bytes} bytes",
+                )
+            payloads.append((doc_id, f.filename, data))
+        decoded = await asyncio.gather(
+            *[_decode(filename, data) for idx, (_, filename, data) in enumerate(payloads) if idx not in large]
         )
+    except BaseException:
+        # Never analyzed, so nothing else would delete them before they expire.
+        for content_id, _ in large.values():
+            remove_document(settings.storage_root, content_id)
+        raise
+
+    documents = []
+    texts = iter(decoded)
+    for idx, (doc_id, _, _) in enumerate(payloads):
+        if idx in large:
+            content_id, size = large[idx]
+            documents.append({"id": doc_id, "content": None, "content_id": content_id, "large": size})
+            continue
+        text = next(texts)
+        content_id = uuid4().hex
         if not include_content:
-            result = {**result, "content": None}
-        return FileResult(
-            **result,
-            content_id=content_id,
-            content_available=include_content or cached_available,
-        )
-    except Exception as exc:  # pragma: no cover - guardrail
-        logger.exception("Failed to analyze %s", doc.get("id"))
-        return FileResult(
-            id=doc.get("id", ""),
-            tokens=[],
-            issues=[],
-            stats={},
-            error=str(exc),
-            content_id=content_id,
-            content_available=include_content or cached_available,
+            await asyncio.to_thread(content_cache.put, content_id, text)
+        documents.append({"id": doc_id, "content": text, "content_id": content_id})
+    return documents
+
+
+def _check_profiling(profile: bool) -> None:
+    if profile and not settings.profiling_enabled:
+        raise HTTPException(status_code=403, detail="Profiling is disabled on this server (set PROFILING=1)")
+
+
+async def _store_profile_stacks(profile: dict) -> None:
+    """Keep a profile's collapsed stacks here, wherever it ran, so `GET /profiles/{id}` can serve them."""
+    stacks = profile.pop("collapsed_stacks", None)
+    profile["collapsed_stacks_id"] = (
+        await asyncio.to_thread(store_collapsed_stacks, settings.storage_root, stacks) if stacks else None
+    )
+
+
+async def _analyze_single(
+    doc: dict,
+    effective_settings: Settings,
+    include_content: bool = True,
+    profile: bool = False,
+    ticket: Optional[Ticket] = None,
+) -> DocumentResult:
+    if doc.get("large"):
+        return await _analyze_large(doc, effective_settings, ticket)
+    content_id = doc.get("content_id")
+    cached_available = content_cache.contains(content_id) if content_id else False
+    content = doc["content"]
+
+    async def _run(deadline: Optional[DeadlineHandle] = None) -> Tuple[DocumentResult, float]:
+        async with admission.slot(ticket, len(content)) as waited:
+            submitted = time.perf_counter()
+            try:
+                worker = profile_document if profile else process_document
+                # Share of the pool busy with other documents at submit time; guides CHUNK_SIZE=auto.
+                pool_load = min(1.0, pool_inflight.value() / pool_capacity)
+                result = await _run_in_pool(
+                    worker, doc["id"], content, effective_settings, pool_load, deadline=deadline
+                )
+            except Exception as exc:  # pragma: no cover - guardrail
+                logger.exception("Failed to analyze %s", doc.get("id"))
+                result = DocumentResult(doc.get("id", ""), error=str(exc))
+            _observe_result(result, time.perf_counter() - submitted)
+            if "profile" in result.stats:
+                await _store_profile_stacks(result.stats["profile"])
+            return result, waited
+
+    async def _run_once() -> Tuple[DocumentResult, float, bool]:
+        if profile or not settings.coalesce_inflight:
+            return (*await _run(), False)
+        # Keyed by the text and every setting that shapes the result but the per-request deadline: the shared
+        # task runs until the latest deadline of the requests waiting on it (one waiting past its own deadline
+        # gets its backstop result below), so no document inherits a result cut short by an earlier one.
+        key = (content_digest(content), replace(effective_settings, deadline=0.0))
+        handle = DeadlineHandle(effective_settings.deadline)
+        (result, waited), shared = await inflight_analyses.run(
+            key, lambda: _run(handle), handle, lambda leader: leader.extend(effective_settings.deadline)
         )
+        return result, waited, shared
+
+    shared = False
+    try:
+        if effective_settings.deadline:
+            # The worker stops at the deadline on its own; this only catches documents that never got a slot,
+            # or a worker that cannot reach its next check in time (the cancellation then frees it).
+            backstop = effective_settings.deadline + _DEADLINE_GRACE_SECONDS - time.time()
+            result, waited, shared = await asyncio.wait_for(_run_once(), max(0.0, backstop))
+        else:
+            result, waited, shared = await _run_once()
+    except asyncio.TimeoutError:
+        result, waited = unanalyzed_result(doc["id"], content, "deadline"), 0.0
+        documents_total.inc(1, _outcome(result))
+    else:
+        # Every caller gets its own copy under its own id, so per-request annotations never leak across.
+        result = result.copy(doc["id"])
+    if shared:
+        documents_total.inc(1, _outcome(result))
+        coalesced_documents_total.inc()
+        coalesced_bytes_total.inc(result.stats.get("bytes", 0))
+    if result.stats.get("partial"):
+        request_interruptions_total.inc(1, "deadline")
+    result.stats["queue_wait_ms"] = round(0.0 if shared else waited * 1000.0, 3)
+    if not include_content:
+        result.content = None
+    if cached_available:
+        # Kept next to the text so the viewer can page issues by window without the full payload; "[]" too, so a
+        # clean document pages as empty rather than "not available".
+        issues_json = "[" + ",".join(result.issues.iter_json()) + "]"
+        # Compression and any spill of evicted entries to disk run off the event loop.
+        await asyncio.to_thread(content_cache.put, issues_key(content_id), issues_json)
+    result.content_id = content_id
+    result.content_available = include_content or cached_available
+    return result
+
+
+async def _analyze_large(doc: dict, effective_settings: Settings, ticket: Optional[Ticket]) -> DocumentResult:
+    """
+    Large-document mode: the worker reads the spooled file itself and writes issues next to it, so the result
+    holds only stats; content and issues are paged from disk. Never coalesced (there is no text to digest), and
+    always run on this host, whose STORAGE_ROOT holds the file.
+    """
+    async with admission.slot(ticket, doc["large"]) as waited:
+        submitted = time.perf_counter()
+        try:
+            pool_load = min(1.0, pool_inflight.value() / pool_capacity)
+            result = await _run_in_pool(
+                process_large_document, doc["id"], doc["content_id"], effective_settings, pool_load, local=True
+            )
+        except Exception as exc:  # pragma: no cover - guardrail
+            logger.exception("Failed to analyze %s", doc.get("id"))
+            result = DocumentResult(doc.get("id", ""), error=str(exc))
+        _observe_result(result, time.perf_counter() - submitted)
+    if result.stats.get("partial"):
+        request_interruptions_total.inc(1, "deadline")
+    result.stats["queue_wait_ms"] = round(waited * 1000.0, 3)
+    result.content_id = doc["content_id"]
+    result.content_available = "large_document" in result.stats
+    if not result.content_available:
+        # Rejected, failed or never started: there is nothing to page, so do not keep the upload.
+        await asyncio.to_thread(remove_document, settings.storage_root, doc["content_id"])
+    return result
+
+
+def _observe_result(result: DocumentResult, round_trip: float) -> None:
+    documents_total.inc(1, _outcome(result))
+    processed_bytes_total.inc(result.stats.get("bytes", 0))
+    stage_ms = result.stats.get("stage_ms") or {}
+    for stage, ms in stage_ms.items():
+        stage_seconds.observe(ms / 1000.0, stage)
+    if "total" in stage_ms:
+        pool_wait_seconds.observe(max(0.0, round_trip - stage_ms["total"] / 1000.0))
+
+
+@lru_cache(maxsize=1)
+def _msgpack() -> Any:
+    """Optional `msgpack`, imported on the first request that asks for it; None when not installed."""
+    try:
+        import msgpack  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    return msgpack
+
+
+def _wants_msgpack(request: Request) -> bool:
+    return MSGPACK_MEDIA_TYPE in request.headers.get("accept", "") and _msgpack() is not None
+
+
+async def _save_export(results: List[DocumentResult], export: bool) -> Optional[str]:
+    """With `export=true`, keep the results (no tokens) for `GET /exports/{id}`; returns the export id."""
+    if not export:
+        return None
+    return await asyncio.to_thread(export_store.save, (_export_record(result) for result in results))
+
+
+def _export_record(result: DocumentResult) -> Iterable[str]:
+    """A result's export record; a large document's issues are streamed from its issues.jsonl."""
+    issues = None
+    if result.stats.get("large_document"):
+        index = _large_index(result.content_id or "")
+        issues = index.issues.iter_json() if index is not None else None
+    return jsonl_record_pieces(result, issues)
+
+
+def _files_response(
+    request: Request, results: List[DocumentResult], ticket: Ticket, export_id: Optional[str] = None
+) -> Response:
+    """Encode trusted worker results directly, skipping pydantic validation of every token/issue."""
+    started = time.perf_counter()
+    if _wants_msgpack(request):
+        body = _msgpack().packb({"files": [r.to_dict() for r in results]})
+        media_type = MSGPACK_MEDIA_TYPE
+    else:
+        body = encode_files_json(results)
+        media_type = "application/json"
+    stage_seconds.observe(time.perf_counter() - started, "serialize")
+    return Response(content=body, media_type=media_type, headers=_response_headers(results, ticket, export_id))
+
+
+def _check_dictionary(name: Optional[str]) -> None:
+    """A named dictionary that does not exist is the caller's mistake, not an empty overlay."""
+    if name and not dictionary_exists(settings.storage_root, name):
+        raise HTTPException(status_code=404, detail=f"Dictionary '{name}' not found")
+
+
+def _json_settings(options: AnalyzeOptions, dictionary: Optional[str], deadline: float) -> Settings:
+    _check_dictionary(options.dictionary or dictionary)
+    return replace(
+        settings,
+        chunk_size=0 if options.chunk_size == "auto" else (options.chunk_size or settings.chunk_size),
+        chunk_overlap=options.chunk_overlap or settings.chunk_overlap,
+        language=options.language or settings.language,
+        custom_dictionary=options.dictionary or dictionary or settings.custom_dictionary,
+        custom_words=canonical_words(options.custom_words or ()),
+        deadline=deadline,
+    )
+
+
+def _streams_json_body(request: Request) -> bool:
+    """Large (or chunked, length unknown) JSON bodies are parsed incrementally instead of buffered."""
+    length = request.headers.get("content-length")
+    return not length or not length.isdigit() or int(length) > settings.stream_json_min_bytes
+
+
+_SPOOL_READ_BYTES = 1024 * 1024
+
+
+def _json_options(options: dict, dictionary: Optional[str], deadline: float) -> Settings:
+    try:
+        return _json_settings(AnalyzeOptions.model_validate(options), dictionary, deadline)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+async def _dispatch_json_stream(
+    request: Request,
+    ticket: Ticket,
+    include_content: bool,
+    profile: bool,
+    dictionary: Optional[str],
+    deadline: float,
+) -> List["asyncio.Task[DocumentResult]"]:
+    """
+    Read the JSON body incrementally and start each document's analysis as soon as it has been parsed and
+    validated. At most two pool-fulls of documents are held unfinished: past that the body is not read
+    further, so memory follows the pool, not the body. Documents start with the options read before them;
+    the body is also spooled (to disk past STREAM_JSON_MIN_BYTES) so that if options after `documents`
+    change the settings, the started analyses are cancelled and the documents replayed from the spool.
+    """
+    parser = ObjectStreamParser("documents")
+    options: dict = {}
+    effective_settings: Optional[Settings] = None
+    tasks: List["asyncio.Task[DocumentResult]"] = []
+    window = asyncio.Semaphore(max(2, 2 * pool_capacity))
+    charge_bytes = not ticket.size  # a chunked body was admitted without a size; charge documents as they arrive
+    replaying = False  # documents replayed from the spool were charged on the first pass
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.stream_json_min_bytes)
+
+    async def _dispatch(item: Any) -> None:
+        nonlocal effective_settings
+        if effective_settings is None:
+            effective_settings = _json_options(options, dictionary, deadline)
+        if len(tasks) >= settings.max_files:
+            raise HTTPException(status_code=400, detail=f"Too many files; limit is {settings.max_files}")
+        try:
+            doc = Document.model_validate(item).model_dump()
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail=f"documents[{len(tasks)}]: {exc}")
+        if not replaying:
+            try:
+                admission.add_documents(ticket, 1, len(doc["content"].encode("utf-8")) if charge_bytes else 0)
+            except AdmissionRejected as exc:
+                raise _rejection(exc)  # stops reading the body; documents already started are cancelled
+        await window.acquire()
+        task = asyncio.create_task(_analyze_single(doc, effective_settings, include_content, profile, ticket))
+        task.add_done_callback(lambda _: window.release())
+        tasks.append(task)
+
+    async def _handle(events: List[Tuple[str, Any]]) -> None:
+        for kind, value in events:
+            if kind == ITEM:
+                await _dispatch(value)
+            else:
+                options[value[0]] = value[1]
+
+    async def _cancel_all() -> None:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    try:
+        try:
+            async for chunk in request.stream():
+                await asyncio.to_thread(spool.write, chunk)
+                await _handle(parser.feed(chunk))
+            await _handle(parser.close())
+        except JSONStreamError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {exc}")
+        except ClientDisconnect:
+            request_interruptions_total.inc(1, "client_disconnect")
+            raise HTTPException(status_code=499, detail="Client closed the connection")
+        if not tasks:
+            raise HTTPException(status_code=400, detail="documents: at least one document is required")
+        # Options after `documents` that leave the settings as they were (restated values, keys the model ignores,
+        # custom words in another order or case) keep the analyses already running. Every document started with
+        # the same settings, so either all of them are stale or none is.
+        final_settings = _json_options(options, dictionary, deadline)
+        if final_settings != effective_settings:
+            # The options changed what the analysis does: rerun every document with the final settings.
+            await _cancel_all()
+            tasks.clear()
+            effective_settings, replaying = final_settings, True
+            await asyncio.to_thread(spool.seek, 0)
+            replay = ObjectStreamParser("documents")
+            while True:
+                chunk = await asyncio.to_thread(spool.read, _SPOOL_READ_BYTES)
+                if not chunk:
+                    break
+                for kind, value in replay.feed(chunk):
+                    if kind == ITEM:
+                        await _dispatch(value)
+            for kind, value in replay.close():
+                if kind == ITEM:
+                    await _dispatch(value)
+    except BaseException:
+        await _cancel_all()
+        raise
+    finally:
+        spool.close()
+    return tasks
+
+
+async def _analyze_json_stream(
+    request: Request,
+    stream: bool,
+    include_content: bool,
+    profile: bool,
+    priority: Optional[str],
+    dictionary: Optional[str],
+    deadline: float,
+    export: bool,
+) -> Response:
+    """
+    Incrementally parsed JSON `/analyze`. The response is the usual `files` payload, or with `stream=true`
+    NDJSON: one `FileResult` line per document in completion order, written as each finishes.
+    """
+    length = request.headers.get("content-length", "")
+    size = int(length) if length.isdigit() else 0
+    exits = AsyncExitStack()
+    ticket = await exits.enter_async_context(_admitted(request, 0, size, priority))
+    try:
+        tasks = await _dispatch_json_stream(request, ticket, include_content, profile, dictionary, deadline)
+    except BaseException:
+        await exits.aclose()
+        raise
+    if not stream:
+        async with exits:
+            results = await _unless_disconnected(request, asyncio.gather(*tasks))
+        return _files_response(request, results, ticket, await _save_export(results, export))
+    return StreamingResponse(
+        _ndjson_results(tasks, exits), media_type="application/x-ndjson", headers=_queue_wait_headers(ticket)
+    )
+
+
+async def _ndjson_results(tasks: List["asyncio.Task[DocumentResult]"], exits: AsyncExitStack) -> AsyncIterator[bytes]:
+    # Owns the admission ticket; a client that disconnects closes this generator, which cancels the rest.
+    async with exits:
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                yield ("".join(result.iter_json()) + "\n").encode("utf-8")
+        finally:
+            for task in tasks:
+                task.cancel()
 
 
 @app.post("/analyze")
@@ -124,104 +841,102 @@ async def analyze(
     request: Request,
     files: List[UploadFile] | None = File(default=None),
     include_content: bool = False,
+    profile: bool = False,
+    export: bool = False,
+    stream: bool = False,
+    priority: Optional[str] = Query(None, pattern="^(interactive|bulk)$"),
+    dictionary: Optional[str] = Query(None, pattern=DICTIONARY_NAME_PATTERN),
+    timeout: Optional[float] = Query(None, gt=0),
 ) -> Any:
+    _check_profiling(profile)
+    deadline = _request_deadline(timeout)
     # Multipart form-data path: treat as file uploads and return a simplified summary.
     if files:
+        _check_dictionary(dictionary)
         if len(files) > settings.max_files:
             raise HTTPException(
                 status_code=400,
                 detail=f"Too many files; limit is {settings.max_files}",
             )
 
-        documents = []
-        for idx, f in enumerate(files):
-            data = await f.read()
-            if len(data) > settings.max_file_bytes:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File '{f.filename}' exceeds {settings.max_file_bytes} bytes",
+        async def _analyze_uploads():
+            cost = sum(_upload_cost(f) for f in files)
+            async with _admitted(request, len(files), cost, priority, _upload_tasks(files)) as ticket:
+                documents = await _read_uploads(files, include_content, ticket)
+                effective_settings = replace(
+                    settings, custom_dictionary=dictionary or settings.custom_dictionary, deadline=deadline
                 )
-            text, _ = decode_uploaded_file(f.filename, data)
-            content_id = uuid4().hex
-            if not include_content:
-                content_cache.put(content_id, text)
-            documents.append({"id": f.filename or f"file{idx+1}", "content": text, "content_id": content_id})
-
-        effective_settings = replace(settings)
-        results = await asyncio.gather(
-            *[_analyze_single(doc, effective_settings, include_content) for doc in documents]
-        )
+                results = await asyncio.gather(
+                    *[_analyze_single(doc, effective_settings, include_content, profile, ticket) for doc in documents]
+                )
+            return results, ticket
 
-        formatted = []
+        results, ticket = await _unless_disconnected(request, _analyze_uploads())
+        summaries = []
         for res in results:
-            spelling_errors = []
-            grammar_errors = []
-            for issue in res.issues:
-                if issue.type == "spelling":
-                    spelling_errors.append(
-                        {
-                            "word": issue.original,
-                            "suggestions": issue.suggestions,
-                            "start": issue.position.start,
-                            "end": issue.position.end,
-                        }
-                    )
-                else:
-                    grammar_errors.append(
-                        {
-                            "issue": issue.message,
-                            "suggestions": issue.suggestions,
-                            "start": issue.position.start,
-                            "end": issue.position.end,
-                        }
-                    )
-            formatted.append(
-                {
-                    "filename": res.id,
-                    "spelling_errors": spelling_errors,
-                    "grammar_errors": grammar_errors,
-                }
-            )
-
-        return {"status": "success", "files": formatted}
+            summary = res.summary_dict()
+            if res.stats.get("partial"):
+                summary["partial"] = res.stats["partial"]
+            if "profile" in res.stats:
+                summary["profile"] = res.stats["profile"]
+            summaries.append(summary)
+        payload = {"status": "success", "files": summaries}
+        headers = _response_headers(results, ticket, await _save_export(results, export))
+        if _wants_msgpack(request):
+            return Response(content=_msgpack().packb(payload), media_type=MSGPACK_MEDIA_TYPE, headers=headers)
+        return JSONResponse(payload, headers=headers)
 
     # JSON path: preserve existing request/response shape.
-    try:
-        payload = await request.json()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
-
-    try:
-        parsed = AnalyzeRequest.model_validate(payload)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
+    if stream or _streams_json_body(request):
+        if stream and export:
+            raise HTTPException(status_code=400, detail="export=true needs the whole response; drop stream=true")
+        return await _analyze_json_stream(request, stream, include_content, profile, priority, dictionary, deadline, export)
+    # Admitted on the body's Content-Length (always present here: see `_streams_json_body`) before it is read or
+    # parsed, so a full queue turns requests away without buffering them; documents are charged once known.
+    async with _admitted(request, 0, int(request.headers["content-length"]), priority) as ticket:
+        try:
+            payload = await request.json()
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
 
-    if len(parsed.documents) > settings.max_files:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Too many files; limit is {settings.max_files}",
-        )
+        try:
+            parsed = AnalyzeRequest.model_validate(payload)
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
 
-    effective_settings = replace(
-        settings,
-        chunk_size=parsed.chunk_size or settings.chunk_size,
-        chunk_overlap=parsed.chunk_overlap or settings.chunk_overlap,
-        language=parsed.language or settings.language,
-    )
+        if len(parsed.documents) > settings.max_files:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many files; limit is {settings.max_files}",
+            )
 
-    tasks = [
-        _analyze_single(doc.model_dump(), effective_settings, include_content) for doc in parsed.documents
-    ]
-    results = await asyncio.gather(*tasks)
-    return AnalyzeResponse(files=results)
+        effective_settings = _json_settings(parsed, dictionary, deadline)
+        ticket.lane = _lane(priority, len(parsed.documents), ticket.size)
+        admission.add_documents(ticket, len(parsed.documents))
+        tasks = [
+            _analyze_single(doc.model_dump(), effective_settings, include_content, profile, ticket)
+            for doc in parsed.documents
+        ]
+        results = await _unless_disconnected(request, asyncio.gather(*tasks))
+    return _files_response(request, results, ticket, await _save_export(results, export))
 
 
-@app.post("/analyze-files", response_model=AnalyzeResponse)
+# Documented shape only: the handler returns an already encoded Response, which FastAPI does not validate.
+@app.post("/analyze-files", responses={200: {"model": AnalyzeResponse}})
 async def analyze_files(
+    request: Request,
     files: List[UploadFile] | None = File(default=None),
     file: UploadFile | None = File(default=None),
     include_content: bool = False,
-) -> AnalyzeResponse:
+    profile: bool = False,
+    export: bool = False,
+    priority: Optional[str] = Query(None, pattern="^(interactive|bulk)$"),
+    dictionary: Optional[str] = Query(None, pattern=DICTIONARY_NAME_PATTERN),
+    timeout: Optional[float] = Query(None, gt=0),
+) -> Response:
+    _check_profiling(profile)
+    _check_dictionary(dictionary)
+    deadline = _request_deadline(timeout)
     incoming: List[UploadFile] = []
     if file is not None:
         incoming.append(file)
@@ -233,34 +948,272 @@ async def analyze_files(
     if len(incoming) > settings.max_files:
         raise HTTPException(status_code=400, detail=f"Too many files; limit is {settings.max_files}")
 
-    documents = []
-    for idx, f in enumerate(incoming):
-        data = await f.read()
-        if len(data) > settings.max_file_bytes:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File '{f.filename}' exceeds {settings.max_file_bytes} bytes",
+    async def _analyze_uploads():
+        cost = sum(_upload_cost(f) for f in incoming)
+        async with _admitted(request, len(incoming), cost, priority, _upload_tasks(incoming)) as ticket:
+            documents = await _read_uploads(incoming, include_content, ticket)
+            effective_settings = replace(
+                settings, custom_dictionary=dictionary or settings.custom_dictionary, deadline=deadline
             )
-        text, _ = decode_uploaded_file(f.filename, data)
-        content_id = uuid4().hex
-        if not include_content:
-            content_cache.put(content_id, text)
-        documents.append({"id": f.filename or f"file{idx+1}", "content": text, "content_id": content_id})
+            tasks = [_analyze_single(doc, effective_settings, include_content, profile, ticket) for doc in documents]
+            return await asyncio.gather(*tasks), ticket
+
+    results, ticket = await _unless_disconnected(request, _analyze_uploads())
+    return _files_response(request, results, ticket, await _save_export(results, export))
+
 
-    effective_settings = replace(settings)
-    tasks = [_analyze_single(doc, effective_settings, include_content) for doc in documents]
-    results = await asyncio.gather(*tasks)
-    return AnalyzeResponse(files=results)
+async def _live_send(websocket: WebSocket, lock: asyncio.Lock, text: str) -> None:
+    async with lock:
+        await websocket.send_text(text)
+
+
+async def _live_check(
+    websocket: WebSocket, lock: asyncio.Lock, revision: LiveRevision, effective_settings: Settings, client: str
+) -> None:
+    # Debounce: a newer revision arriving during this sleep cancels the task before any work is queued.
+    await asyncio.sleep(settings.live_debounce_ms / 1000.0)
+    size = len(revision.text)
+    try:
+        ticket = admission.admit(1, size, _lane(None, 1, size), client)
+    except AdmissionRejected as exc:
+        admission_rejections.inc(1, exc.reason)
+        live_revisions_total.inc(1, "rejected")
+        error = {"type": "error", "revision": revision.revision, "status": exc.status_code, "detail": exc.detail}
+        await _live_send(websocket, lock, json.dumps({**error, "retry_after": exc.retry_after}))
+        return
+    try:
+        # Cancelled waiting for a slot, it never reaches the pool; cancelled while running, the worker stops
+        # between chunks.
+        result = await _analyze_single(
+            {"id": f"revision-{revision.revision}", "content": revision.text}, effective_settings, False, False, ticket
+        )
+    finally:
+        admission.release(ticket)
+        admission_wait_seconds.observe(ticket.max_wait_seconds, ticket.lane)
+    live_revisions_total.inc(1, "analyzed")
+    body = f'{{"type":"result","revision":{revision.revision},"result":{"".join(result.iter_json())}}}'
+    # A newer revision may cancel this task now; let the finished result go out whole rather than cut a frame.
+    await asyncio.shield(_live_send(websocket, lock, body))
+
+
+@app.websocket("/ws/live")
+async def live(websocket: WebSocket, dictionary: Optional[str] = Query(None, pattern=DICTIONARY_NAME_PATTERN)) -> None:
+    """
+    Live checking for an editor: send `{"revision": n, "text": ..., "language"?, "dictionary"?, "custom_words"?}`
+    on every edit. Only the latest revision is analyzed, once none newer has arrived for LIVE_DEBOUNCE_MS; a
+    newer revision cancels the previous one wherever it is (debounce, slot queue or pool worker). Replies are
+    `{"type": "result", "revision": n, "result": {...}}` or `{"type": "error", "revision": n, ...}`.
+    """
+    await websocket.accept()
+    client = websocket.headers.get("x-client-id") or (websocket.client.host if websocket.client else "")
+    lock = asyncio.Lock()
+    pending: Optional[asyncio.Task] = None
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                revision = LiveRevision.model_validate_json(raw)
+            except ValueError as exc:
+                live_revisions_total.inc(1, "rejected")
+                await _live_send(websocket, lock, json.dumps({"type": "error", "status": 400, "detail": str(exc)}))
+                continue
+            if len(revision.text.encode("utf-8")) > settings.max_file_bytes:
+                live_revisions_total.inc(1, "rejected")
+                error = {"type": "error", "revision": revision.revision, "status": 413}
+                detail = f"Text exceeds {settings.max_file_bytes} bytes"
+                await _live_send(websocket, lock, json.dumps({**error, "detail": detail}))
+                continue
+            name = revision.dictionary or dictionary
+            if name and not dictionary_exists(settings.storage_root, name):
+                live_revisions_total.inc(1, "rejected")
+                error = {"type": "error", "revision": revision.revision, "status": 404}
+                await _live_send(websocket, lock, json.dumps({**error, "detail": f"Dictionary '{name}' not found"}))
+                continue
+            if pending is not None and not pending.done():
+                pending.cancel()
+                live_revisions_total.inc(1, "superseded")
+            effective_settings = replace(
+                settings,
+                language=revision.language or settings.language,
+                custom_dictionary=name or settings.custom_dictionary,
+                custom_words=canonical_words(revision.custom_words or ()),
+            )
+            pending = asyncio.create_task(_live_check(websocket, lock, revision, effective_settings, client))
+            pending.add_done_callback(_live_check_done)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+
+
+def _live_check_done(task: "asyncio.Task[None]") -> None:
+    """Retrieve a live check's failure (typically a send to a socket that just closed) so it is not left unseen."""
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None and not isinstance(exc, (WebSocketDisconnect, RuntimeError)):
+        logger.warning("Live check failed: %r", exc)
+
+
+@app.get("/dictionaries/{name}")
+async def get_dictionary(name: str) -> dict:
+    """A custom dictionary: its version and the words it adds to / removes from the lexicon."""
+    try:
+        data = await asyncio.to_thread(read_dictionary, settings.storage_root, name)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if data is None:
+        raise HTTPException(status_code=404, detail="Dictionary not found")
+    return data
+
+
+@app.patch("/dictionaries/{name}")
+async def patch_dictionary(name: str, update: DictionaryUpdate) -> dict:
+    """Add and/or remove words (creating the dictionary if needed); workers pick it up on their next document."""
+    try:
+        return await asyncio.to_thread(update_dictionary, settings.storage_root, name, update.add, update.remove)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.delete("/dictionaries/{name}")
+async def remove_dictionary(name: str) -> dict:
+    try:
+        deleted = await asyncio.to_thread(delete_dictionary, settings.storage_root, name)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Dictionary not found")
+    return {"name": name, "deleted": True}
 
 
 @app.get("/file-content/{content_id}")
 async def get_file_content(content_id: str) -> dict:
-    cached = content_cache.get(content_id)
+    cached = await asyncio.to_thread(content_cache.get, content_id)
+    if cached is None and _large_index(content_id) is not None:
+        raise HTTPException(status_code=413, detail="Large document: page it with /file-content/{id}/range")
     if cached is None:
         raise HTTPException(status_code=404, detail="Content not found or expired")
     return {"file_id": content_id, "content": cached}
 
 
+def _large_index(content_id: str):
+    return open_large_index(settings.storage_root, content_id, settings.large_document_ttl_seconds)
+
+
+def _window_index(content_id: str):
+    index = window_indexes.get_or_build(content_id, content_cache.get, content_cache.get)
+    if index is None:
+        # Large documents keep their own on-disk indexes; opening them maps files, nothing is read whole.
+        index = _large_index(content_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Content not found or expired")
+    return index
+
+
+@app.get("/file-content/{content_id}/range")
+async def get_file_content_range(
+    content_id: str,
+    start: Optional[int] = Query(None, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    line_start: Optional[int] = Query(None, ge=1),
+    line_end: Optional[int] = Query(None, ge=1),
+) -> dict:
+    """Return a character range (`start`/`end`) or an inclusive 1-based line range of a document."""
+    index = await asyncio.to_thread(_window_index, content_id)
+    if line_start is not None:
+        char_start, char_end = index.line_range_to_chars(line_start, line_end or line_start)
+    elif start is not None:
+        char_start = min(start, index.total_chars)
+        char_end = min(end if end is not None else char_start + settings.window_max_chars, index.total_chars)
+    else:
+        raise HTTPException(status_code=400, detail="Provide start/end or line_start/line_end")
+    if char_end - char_start > settings.window_max_chars:
+        char_end = char_start + settings.window_max_chars
+    first_line, last_line = index.char_range_to_lines(char_start, char_end)
+    return {
+        "file_id": content_id,
+        "start": char_start,
+        "end": max(char_start, char_end),
+        "line_start": first_line,
+        "line_end": last_line,
+        "total_chars": index.total_chars,
+        "total_lines": index.total_lines,
+        "content": index.content_window(char_start, char_end),
+    }
+
+
+@app.get("/file-issues/{content_id}")
+async def get_file_issues(
+    content_id: str,
+    start: Optional[int] = Query(None, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    line_start: Optional[int] = Query(None, ge=1),
+    line_end: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1),
+) -> Response:
+    """Page through a document's issues by offset window or line range; `next_cursor` continues the page."""
+    index = await asyncio.to_thread(_window_index, content_id)
+    if index.issues is None:
+        raise HTTPException(status_code=404, detail="Issues not available for this content")
+    if line_start is not None:
+        lo, hi = index.issue_span_by_line(line_start, line_end or line_start)
+    elif start is not None:
+        lo, hi = index.issue_span_by_offset(start, end if end is not None else index.total_chars)
+    else:
+        lo, hi = 0, len(index.issues)
+    page_start = lo
+    if cursor:
+        try:
+            page_start = max(lo, int(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    page_end = max(page_start, min(hi, page_start + min(limit, settings.window_max_issues)))
+    next_cursor = json.dumps(str(page_end)) if page_end < hi else "null"
+    body = (
+        f'{{"file_id":{json.dumps(content_id)},"total":{max(0, hi - lo)},'
+        f'"issues":[{",".join(index.issues.iter_json(page_start, page_end))}],"next_cursor":{next_cursor}}}'
+    )
+    return Response(content=body.encode("utf-8"), media_type="application/json")
+
+
+@app.get("/exports/{export_id}")
+def get_export(
+    export_id: str,
+    format: str = Query("summary-csv", pattern="^(summary-csv|issues-csv|jsonl|txt)$"),
+    gzip: bool = False,
+) -> StreamingResponse:
+    """
+    Stream a saved export (`export=true` on an analyze request) as per-file summary CSV, one-row-per-issue CSV,
+    JSONL or text reports, record by record, so memory does not grow with the number of files or issues.
+    """
+    path = export_store.path(export_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Export not found or expired")
+    extension, media_type = EXPORT_FORMATS[format]
+    filename = f"turbotext-{export_id}-{format}.{extension}"
+    if gzip:
+        filename, media_type = filename + ".gz", "application/gzip"
+    # A sync iterator: Starlette pulls it in its thread pool, so file reads never block the loop.
+    body = encode_export(iter_export(iter_record_pieces(str(path)), format), gzip=gzip)
+    return StreamingResponse(
+        body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str) -> FileResponse:
+    """Collapsed stacks of a `profile=true` run (`stats.profile.collapsed_stacks_id`), for flamegraph.pl or speedscope."""
+    _check_profiling(True)
+    path = collapsed_stacks_path(settings.storage_root, profile_id) if PROFILE_ID_RE.fullmatch(profile_id) else None
+    if path is None or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=f"{profile_id}.folded")
+
+
 # Entrypoint for `uvicorn backend.app:app --reload`
 def get_app() -> FastAPI:
     return app
@@ -0,0 +1,420 @@
+"""
+Headless batch analysis: files on disk → process pool → reports in an output directory.
+
+    python -m backend.batch corpus/ --out reports/ --workers 8
+    python -m backend.batch --list files.txt --out reports/ --format jsonl --language en-GB
+    python -m backend.batch --out reports/ --export issues-csv --export-to issues.csv.gz
+
+Each pool task reads, decodes and analyzes one file with `process_document` and writes
+its `<file>_report.txt`; nothing goes through HTTP, multipart or the response encoder.
+JSONL records (summary and issues, no tokens) are appended to `OUT/results.jsonl` as
+files finish.
+
+`OUT/manifest.jsonl` is the checkpoint: one line per finished file (path, size, mtime,
+outcome, and the byte range of its `results.jsonl` record), written after its reports. A
+rerun with the same `--out` skips files whose size and mtime are unchanged, retries ones
+that failed, and truncates `results.jsonl` to the last checkpointed record. Records of
+files analyzed again are dropped from `results.jsonl` at the end of the run (the manifest
+is rewritten with the shifted ranges), so every file appears once. `--restart` ignores the
+manifest.
+
+`--export` renders `OUT/results.jsonl` as summary CSV, per-issue CSV, JSONL or text
+reports (after the run, or on its own when no paths are given), streaming record by
+record; a `.gz` target is gzipped.
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from backend.config import Settings, load_settings
+from backend.processing.worker_pool import RecyclingPool
+
+MANIFEST_NAME = "manifest.jsonl"
+RESULTS_NAME = "results.jsonl"
+COMPACTING_SUFFIX = ".compacting"
+DEFAULT_EXTENSIONS = (".txt", ".md", ".docx")
+FORMATS = ("txt", "jsonl")
+_COPY_BYTES = 1024 * 1024
+
+
+def discover(paths: List[str], list_file: Optional[str], extensions: Tuple[str, ...]) -> Iterator[Tuple[str, Path]]:
+    """Yield (document id, path): files as given, directories walked recursively in sorted order."""
+    sources = list(paths)
+    if list_file:
+        with open(list_file, encoding="utf-8") as handle:
+            sources.extend(line.strip() for line in handle if line.strip() and not line.startswith("#"))
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(extensions) and not name.startswith("~$"):
+                        child = Path(root) / name
+                        yield child.relative_to(path).as_posix(), child
+        else:
+            yield source, path
+
+
+def analyze_file(doc_id: str, path: str, settings: Settings, out_dir: str, formats: Tuple[str, ...], pool_load: float) -> Dict:
+    """Pool task: read, decode and analyze one file, write its text report; returns the checkpoint fields."""
+    from backend.processing.file_worker import process_document
+    from backend.processing.reports import jsonl_record, report_filename, text_report
+    from backend.services.file_decode import decode_uploaded_file
+
+    started = time.perf_counter()
+    if Path(path).stat().st_size > settings.max_file_bytes:
+        return {"status": "failed", "error": f"file exceeds {settings.max_file_bytes} bytes"}
+    data = Path(path).read_bytes()
+    text, _ = decode_uploaded_file(path, data)
+    result = process_document(doc_id, text, settings, pool_load)
+    result.content = None
+    entry: Dict = {"status": "done", "error": result.error, "issues": len(result.issues)}
+    if "txt" in formats:
+        report = Path(out_dir) / report_filename(doc_id, str(Path(path).resolve()))
+        partial = report.with_name(report.name + f".{os.getpid()}.tmp")
+        partial.write_text(text_report(result), encoding="utf-8")
+        os.replace(partial, report)  # a killed run never leaves a truncated report behind
+        entry["report"] = report.name
+    if "jsonl" in formats:
+        entry["jsonl"] = jsonl_record(result, path=path)
+    entry["seconds"] = round(time.perf_counter() - started, 4)
+    return entry
+
+
+class Checkpoint:
+    """Append-only manifest of finished files; see the module docstring."""
+
+    def __init__(self, out_dir: Path, restart: bool = False) -> None:
+        self.path = out_dir / MANIFEST_NAME
+        self.results_path = out_dir / RESULTS_NAME
+        self.done: Dict[str, Dict] = {}
+        self.results_end = 0
+        # path -> byte range of its current results.jsonl record; ranges of replaced records.
+        self.records: Dict[str, Tuple[int, int]] = {}
+        self.superseded: List[Tuple[int, int]] = []
+        staged = self.results_path.with_name(RESULTS_NAME + COMPACTING_SUFFIX)
+        if restart:
+            self.path.unlink(missing_ok=True)
+            staged.unlink(missing_ok=True)
+        elif self.path.exists():
+            self._finish_compaction(staged)
+            self._load()
+        self._handle = open(self.path, "a", encoding="utf-8")
+
+    def _finish_compaction(self, staged: Path) -> None:
+        # A run killed between the two renames of `compact`: the new manifest names the staged file's size.
+        if not staged.exists():
+            return
+        with open(self.path, "rb") as handle:
+            try:
+                header = json.loads(handle.readline())
+            except ValueError:
+                header = {}
+        if isinstance(header, dict) and header.get("compacted") == staged.stat().st_size:
+            os.replace(staged, self.results_path)
+        else:
+            staged.unlink()
+
+    def _load(self) -> None:
+        with open(self.path, "r+b") as handle:
+            lines = handle.read().split(b"\n")
+            # A killed run can leave a torn last line; cut it so new entries start on a fresh line.
+            handle.truncate(handle.tell() - len(lines[-1]))
+        for line in lines[:-1]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "path" not in entry:
+                continue
+            if entry.get("status") == "done":
+                self.done[entry["path"]] = entry
+            self._track(entry)
+
+    def _track(self, entry: Dict) -> None:
+        """Note `entry`'s record (manifests from before `results_start` imply it from the previous end)."""
+        previous = self.records.pop(entry["path"], None)
+        if previous is not None:
+            self.superseded.append(previous)
+        if "results_end" in entry:
+            start = entry.get("results_start", self.results_end)
+            self.records[entry["path"]] = (start, entry["results_end"])
+            self.results_end = max(self.results_end, entry["results_end"])
+
+    def is_done(self, path: Path) -> bool:
+        entry = self.done.get(str(path.resolve()))
+        if entry is None:
+            return False
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+    def record(self, entry: Dict) -> None:
+        self._track(entry)
+        self._handle.write(json.dumps(entry) + "\n")
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+
+    def compact(self) -> None:
+        """
+        After `close()`: copy results.jsonl without the superseded records and rewrite the manifest with
+        the shifted ranges. The manifest is replaced first, headed by the new file's size, so a run killed
+        before the results rename finishes it on the next start.
+        """
+        if not self.superseded or not self.results_path.exists():
+            return
+        dropped = sorted(self.superseded)
+        ends, removed = [], [0]
+        for start, end in dropped:
+            ends.append(end)
+            removed.append(removed[-1] + end - start)
+
+        def shift(offset: int) -> int:
+            return offset - removed[bisect.bisect_right(ends, offset)]
+
+        staged = self.results_path.with_name(RESULTS_NAME + COMPACTING_SUFFIX)
+        with open(self.results_path, "rb") as source, open(staged, "wb") as target:
+            position = 0
+            for start, end in dropped:
+                _copy(source, target, position, start)
+                position = end
+            _copy(source, target, position, None)
+            target.flush()
+            os.fsync(target.fileno())
+            size = target.tell()
+        kept = set(self.records.values())
+        partial = self.path.with_name(MANIFEST_NAME + ".tmp")
+        with open(self.path, encoding="utf-8") as source, open(partial, "w", encoding="utf-8") as target:
+            target.write(json.dumps({"compacted": size}) + "\n")
+            results_end = 0
+            for line in source:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if "path" not in entry:
+                    continue
+                if "results_end" in entry:
+                    span = (entry.get("results_start", results_end), entry["results_end"])
+                    results_end = max(results_end, span[1])
+                    if span not in kept:
+                        continue
+                    entry["results_start"], entry["results_end"] = shift(span[0]), shift(span[1])
+                target.write(json.dumps(entry) + "\n")
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(partial, self.path)
+        os.replace(staged, self.results_path)
+
+
+def _copy(source: BinaryIO, target: BinaryIO, start: int, stop: Optional[int]) -> None:
+    """Copy bytes `start:stop` of `source` (to its end when `stop` is None)."""
+    source.seek(start)
+    remaining = None if stop is None else stop - start
+    while remaining is None or remaining > 0:
+        piece = source.read(_COPY_BYTES if remaining is None else min(_COPY_BYTES, remaining))
+        if not piece:
+            return
+        target.write(piece)
+        if remaining is not None:
+            remaining -= len(piece)
+
+
+class _Progress:
+    def __init__(self, every: int) -> None:
+        self.every = every
+        self.started = time.perf_counter()
+        self.counts = {"done": 0, "failed": 0, "skipped": 0}
+
+    def count(self, status: str) -> None:
+        self.counts[status] += 1
+        finished = self.counts["done"] + self.counts["failed"]
+        if status != "skipped" and self.every and finished % self.every == 0:
+            self.report()
+
+    def report(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        finished = self.counts["done"] + self.counts["failed"]
+        rate = finished / elapsed if elapsed else 0.0
+        print(
+            f"{finished} analyzed ({self.counts['failed']} failed), {self.counts['skipped']} skipped, "
+            f"{rate:.1f} files/s, {elapsed:.1f}s",
+            file=sys.stderr,
+        )
+
+
+async def run_batch(args: argparse.Namespace, settings: Settings) -> Dict[str, int]:
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    formats = tuple(args.format)
+    checkpoint = Checkpoint(out_dir, restart=args.restart)
+    results = None
+    if "jsonl" in formats:
+        results = open(out_dir / RESULTS_NAME, "a+b")
+        results.truncate(checkpoint.results_end)  # drop records written after the last checkpoint
+        results.seek(checkpoint.results_end)
+    workers = args.workers or settings.process_workers or max(1, os.cpu_count() or 1)
+    pool = RecyclingPool(
+        workers,
+        settings,
+        start_method=settings.pool_start_method,
+        max_tasks=settings.worker_max_tasks,
+        max_rss_bytes=settings.worker_max_rss_mb * 1024 * 1024,
+    )
+    progress = _Progress(args.progress_every)
+    # Enough queued to keep every worker busy while results are written, without materializing the file list.
+    slots = asyncio.Semaphore(workers * 2)
+    inflight = 0
+
+    async def _one(doc_id: str, path: Path, entry: Dict) -> None:
+        nonlocal inflight
+        inflight += 1
+        try:
+            pool_load = min(1.0, (inflight - 1) / workers)
+            entry.update(await pool.run(analyze_file, doc_id, str(path), settings, str(out_dir), formats, pool_load))
+        except Exception as exc:
+            entry.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+        finally:
+            inflight -= 1
+            slots.release()
+        record = entry.pop("jsonl", None)
+        if record is not None and results is not None:
+            entry["results_start"] = results.tell()
+            results.write(record.encode("utf-8") + b"\n")
+            results.flush()
+            entry["results_end"] = results.tell()
+        checkpoint.record(entry)
+        progress.count(entry["status"])
+
+    pool.start()
+    tasks = set()
+    try:
+        for doc_id, path in discover(args.paths, args.list, tuple(args.extensions)):
+            try:
+                stat = path.stat()
+            except OSError as exc:
+                print(f"skipping {path}: {exc.strerror}", file=sys.stderr)
+                continue
+            if checkpoint.is_done(path):
+                progress.count("skipped")
+                continue
+            entry = {"path": str(path.resolve()), "id": doc_id, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            await slots.acquire()
+            task = asyncio.create_task(_one(doc_id, path, entry))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await pool.close()
+        checkpoint.close()
+        if results is not None:
+            results.close()
+        checkpoint.compact()
+    progress.report()
+    return progress.counts
+
+
+def export_results(out_dir: Path, fmt: str, target: str) -> None:
+    """Stream OUT/results.jsonl as `fmt` to `target` (`-` for stdout; gzip when it ends in `.gz`)."""
+    from backend.processing.reports import EXPORT_FORMATS, encode_export, iter_export, iter_record_pieces
+
+    source = out_dir / RESULTS_NAME
+    if not source.exists():
+        raise FileNotFoundError(f"{source} not found; run with --format jsonl first")
+    target = target or str(out_dir / f"export-{fmt}.{EXPORT_FORMATS[fmt][0]}")
+    pieces = encode_export(iter_export(iter_record_pieces(str(source)), fmt), gzip=target.endswith(".gz"))
+    if target == "-":
+        for piece in pieces:
+            sys.stdout.buffer.write(piece)
+        sys.stdout.buffer.flush()
+        return
+    partial = Path(target + ".tmp")
+    with open(partial, "wb") as handle:
+        for piece in pieces:
+            handle.write(piece)
+    os.replace(partial, target)
+    print(f"exported {fmt} to {target}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("paths", nargs="*", help="files or directories (walked recursively)")
+    parser.add_argument("--list", help="file with one path per line")
+    parser.add_argument("--out", required=True, help="output directory for reports and the checkpoint manifest")
+    parser.add_argument(
+        "--format", type=lambda v: [f for f in v.split(",") if f], default=list(FORMATS), help="txt,jsonl (default both)"
+    )
+    parser.add_argument("--extensions", type=lambda v: v.split(","), default=list(DEFAULT_EXTENSIONS))
+    parser.add_argument("--workers", type=int, default=0, help="process workers (default PROCESS_WORKERS or CPU count)")
+    parser.add_argument("--language", help="override LANGUAGE")
+    parser.add_argument("--chunk-size", help="override CHUNK_SIZE (number or auto)")
+    parser.add_argument("--dictionary", help="custom dictionary layered over the lexicon (override CUSTOM_DICTIONARY)")
+    parser.add_argument("--restart", action="store_true", help="ignore the manifest and analyze everything again")
+    parser.add_argument("--progress-every", type=int, default=100)
+    parser.add_argument(
+        "--export",
+        choices=("summary-csv", "issues-csv", "jsonl", "txt"),
+        help="render OUT/results.jsonl in this format (after the run, or alone without paths)",
+    )
+    parser.add_argument("--export-to", default="", help="export file (default OUT/export-<format>.<ext>; - for stdout)")
+    args = parser.parse_args(argv)
+    if not args.paths and not args.list and not args.export:
+        parser.error("give at least one path, --list or --export")
+    unknown = set(args.format) - set(FORMATS)
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+    if args.export and (args.paths or args.list) and "jsonl" not in args.format:
+        parser.error("--export reads results.jsonl; include jsonl in --format")
+    if not args.paths and not args.list:
+        try:
+            export_results(Path(args.out), args.export, args.export_to)
+        except FileNotFoundError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        return 0
+    args.extensions = [ext if ext.startswith(".") else f".{ext}" for ext in args.extensions]
+
+    settings = load_settings()
+    if args.language:
+        settings = replace(settings, language=args.language)
+    if args.chunk_size:
+        settings = replace(settings, chunk_size=0 if args.chunk_size == "auto" else int(args.chunk_size))
+    if args.dictionary:
+        from backend.services.custom_dictionaries import dictionary_exists
+
+        try:
+            known = dictionary_exists(settings.storage_root, args.dictionary)
+        except ValueError as exc:
+            parser.error(str(exc))
+        if not known:
+            parser.error(f"dictionary '{args.dictionary}' not found under {settings.storage_root}/dictionaries")
+        settings = replace(settings, custom_dictionary=args.dictionary)
+    try:
+        counts = asyncio.run(run_batch(args, settings))
+    except KeyboardInterrupt:
+        print("interrupted; rerun with the same --out to resume", file=sys.stderr)
+        return 130
+    if args.export:
+        export_results(Path(args.out), args.export, args.export_to)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
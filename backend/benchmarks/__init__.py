@@ -0,0 +1 @@
+"""Benchmark scripts for the analysis pipeline (run with `python -m backend.benchmarks.<name>`)."""
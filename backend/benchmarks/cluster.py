@@ -0,0 +1,198 @@
+"""
+Cluster scaling benchmark: one coordinator, 1..N worker nodes on localhost.
+
+The coordinator runs in this process on a free port; each step starts `n` node
+processes (one pool worker each, so a node stands in for one machine's worth of
+capacity) and pushes the seeded corpus through `process_document` on them. Scaling
+efficiency is `docs/sec at n / (n * docs/sec at 1)`. With `--kill-node` the last step
+kills one node mid-run and checks that its tasks were requeued and every document
+still finished.
+
+    python -m backend.benchmarks.cluster --nodes 4 --docs 200 --out cluster_results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from backend.benchmarks.corpus import CorpusSpec, build_corpus
+from backend.benchmarks.throughput import (
+    DEFAULT_CORPUS_DIR,
+    _stop_process_group,
+    kill_process_group,
+    process_group_options,
+)
+
+
+def _load_documents(corpus_dir: Path) -> List[Tuple[str, str]]:
+    from backend.services.file_decode import decode_uploaded_file
+
+    names = json.loads((corpus_dir / "manifest.json").read_text(encoding="utf-8"))["files"]
+    docs = []
+    for entry in names:
+        text, _ = decode_uploaded_file(entry["name"], (corpus_dir / entry["name"]).read_bytes())
+        docs.append((entry["name"], text))
+    return docs
+
+
+def _start_nodes(count: int, port: int, env: Dict[str, str], first: int) -> List[subprocess.Popen]:
+    return [
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "backend.cluster.node",
+                "--coordinator", f"127.0.0.1:{port}", "--processes", "1", "--name", f"bench-{first + i}",
+            ],
+            env=env,
+            **process_group_options(),  # own group, so `_stop_process_group` also reaps its pool worker
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for i in range(count)
+    ]
+
+
+async def _wait_for_nodes(coordinator, count: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while len(coordinator.nodes) < count:
+        if time.monotonic() > deadline:
+            raise SystemExit(f"only {len(coordinator.nodes)} of {count} nodes joined within {timeout:g}s")
+        await asyncio.sleep(0.1)
+
+
+async def _drive(coordinator, docs, settings, kill: subprocess.Popen = None) -> Dict:
+    from backend.processing.file_worker import process_document
+
+    errors = 0
+
+    async def _one(doc_id: str, text: str) -> None:
+        nonlocal errors
+        result = await coordinator.run(process_document, doc_id, text, settings, 0.0)
+        errors += bool(result.error)
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(_one(doc_id, text)) for doc_id, text in docs]
+    if kill is not None:
+        # Let every node pick up work, then take one away with tasks in flight.
+        while coordinator.counters["completed"] < max(1, len(docs) // 4):
+            await asyncio.sleep(0.05)
+        kill_process_group(kill)
+    await asyncio.gather(*tasks)
+    return {"seconds": time.perf_counter() - started, "file_errors": errors}
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    from backend.cluster.coordinator import Coordinator
+    from backend.config import load_settings
+
+    spec = CorpusSpec(seed=args.seed, docs=args.docs, sizes=((args.words, 1.0),), formats=(("txt", 1.0),))
+    corpus_dir = args.corpus_dir / f"cluster-seed{spec.seed}-docs{spec.docs}-words{args.words}"
+    build_corpus(spec, corpus_dir)
+    docs = _load_documents(corpus_dir)
+
+    storage_root = tempfile.mkdtemp(prefix="turbotext-cluster-")
+    secret = secrets.token_hex(16)
+    env = os.environ.copy()
+    env.update(
+        {
+            "CLUSTER_SECRET": secret,
+            "GRAMMAR_BACKEND": args.grammar,
+            "STUB_GRAMMAR_PER_KCHAR_MS": str(args.stub_per_kchar_ms),
+            "WORKER_MAX_RSS_MB": "0",
+        }
+    )
+    settings = replace(
+        load_settings(),
+        dictionary_path=str(corpus_dir / "dictionary.json"),
+        storage_root=storage_root,
+        grammar_backend=args.grammar,
+        stub_grammar_per_kchar_ms=args.stub_per_kchar_ms,
+    )
+    coordinator = Coordinator(
+        "127.0.0.1", 0, secret, heartbeat_seconds=0.5, node_timeout=args.node_timeout, max_attempts=3
+    )
+    await coordinator.start()
+    steps: List[Dict] = []
+    nodes: List[subprocess.Popen] = []
+    failover = None
+    try:
+        for n in range(1, args.nodes + 1):
+            nodes += _start_nodes(n - len(nodes), coordinator.port, env, len(nodes))
+            await _wait_for_nodes(coordinator, n)
+            await _drive(coordinator, docs[: min(len(docs), n)], settings)  # warm each node's lexicon
+            before = dict(coordinator.counters)
+            measured = await _drive(coordinator, docs, settings)
+            rate = len(docs) / measured["seconds"]
+            step = {
+                "nodes": n,
+                "docs": len(docs),
+                "seconds": round(measured["seconds"], 4),
+                "docs_per_sec": round(rate, 3),
+                "efficiency": round(rate / (n * steps[0]["docs_per_sec"]), 3) if steps else 1.0,
+                "file_errors": measured["file_errors"],
+                "requeued": coordinator.counters["requeued"] - before["requeued"],
+            }
+            steps.append(step)
+            print(
+                f"nodes={n} {step['docs_per_sec']:.2f} docs/s efficiency={step['efficiency']:.2f} "
+                f"errors={step['file_errors']}"
+            )
+        if args.kill_node and len(nodes) > 1:
+            before = dict(coordinator.counters)
+            measured = await _drive(coordinator, docs, settings, kill=nodes[-1])
+            failover = {
+                "docs": len(docs),
+                "seconds": round(measured["seconds"], 4),
+                "file_errors": measured["file_errors"],
+                "requeued": coordinator.counters["requeued"] - before["requeued"],
+                "failed": coordinator.counters["failed"] - before["failed"],
+                "nodes_lost": coordinator.counters["nodes_lost"] - before["nodes_lost"],
+            }
+            print(
+                f"failover: killed 1 of {len(nodes)} nodes, {failover['requeued']} tasks requeued, "
+                f"{failover['failed']} failed, all {len(docs)} documents answered"
+            )
+    finally:
+        await coordinator.close()
+        for proc in nodes:
+            _stop_process_group(proc)
+    return {
+        "corpus": {"seed": spec.seed, "docs": spec.docs, "words": args.words},
+        "grammar": args.grammar,
+        "cpu_count": os.cpu_count(),
+        "scaling": steps,
+        "failover": failover,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--nodes", type=int, default=min(4, os.cpu_count() or 1), help="scale from 1 to this many")
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--words", type=int, default=2000, help="words per document")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--grammar", default="stub", choices=["stub", "languagetool"])
+    parser.add_argument("--stub-per-kchar-ms", type=float, default=2.0)
+    parser.add_argument("--node-timeout", type=float, default=3.0)
+    parser.add_argument("--kill-node", action="store_true", help="finish with a run that kills one node mid-way")
+    parser.add_argument("--corpus-dir", type=Path, default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--out", type=Path)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    result = asyncio.run(run(args))
+    if args.out:
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Reproducible benchmark corpus built on the `files/file_gen.py` templates.
+
+The same spec (seed, document count, size mix, format mix, error rates) always yields
+byte-identical texts, so runs on different machines or commits are comparable.
+"""
+import json
+import random
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+from backend.files.file_gen import BASE_SENTENCES, generate_error_text
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    seed: int = 1234
+    docs: int = 200
+    # (words per document, relative weight)
+    sizes: Tuple[Tuple[int, float], ...] = ((200, 0.6), (2000, 0.3), (20000, 0.1))
+    # (extension, relative weight)
+    formats: Tuple[Tuple[str, float], ...] = (("txt", 0.4), ("md", 0.3), ("docx", 0.3))
+    spelling_rate: float = 0.15
+    grammar_rate: float = 0.3
+
+
+def write_minimal_docx(path: "Path | BinaryIO", text: str, words_per_paragraph: int = 120) -> None:
+    """Write a small but valid .docx without python-docx (one run per paragraph)."""
+    words = text.split()
+    paragraphs = "".join(
+        f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(' '.join(words[i:i + words_per_paragraph]))}</w:t></w:r></w:p>"
+        for i in range(0, len(words), words_per_paragraph)
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{_W_NS}"><w:body>{paragraphs}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _DOCX_RELS)
+        archive.writestr("word/document.xml", document)
+
+
+def benchmark_dictionary() -> List[str]:
+    """Lexicon of the correctly spelled template words, so only injected errors are flagged."""
+    words = set()
+    for sentence in BASE_SENTENCES:
+        words.update(w.strip(".,").lower() for w in sentence.split())
+    return sorted(words)
+
+
+def build_corpus(spec: CorpusSpec, out_dir: Path) -> List[Dict]:
+    """Generate (or reuse) the corpus for `spec` in `out_dir`; returns the manifest entries."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / "manifest.json"
+    spec_dict = asdict(spec)
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("spec") == json.loads(json.dumps(spec_dict)):
+            return manifest["files"]
+
+    rng = random.Random(spec.seed)
+    sizes, size_weights = zip(*spec.sizes)
+    formats, format_weights = zip(*spec.formats)
+    files = []
+    for i in range(1, spec.docs + 1):
+        words = rng.choices(sizes, weights=size_weights)[0]
+        ext = rng.choices(formats, weights=format_weights)[0]
+        text = generate_error_text(words, spec.spelling_rate, spec.grammar_rate, rng=rng)
+        path = out_dir / f"doc_{i:05d}.{ext}"
+        if ext == "docx":
+            write_minimal_docx(path, text)
+        else:
+            path.write_text(text, encoding="utf-8")
+        files.append({"name": path.name, "format": ext, "words": words, "bytes": path.stat().st_size})
+
+    (out_dir / "dictionary.json").write_text(json.dumps(benchmark_dictionary()), encoding="utf-8")
+    manifest_path.write_text(json.dumps({"spec": spec_dict, "files": files}, indent=1), encoding="utf-8")
+    return files
@@ -0,0 +1,96 @@
+"""
+Compare the streaming DOCX extractor against python-docx.
+
+    python -m backend.benchmarks.docx_extract [--dir generated_files_with_errors] [--json out.json]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from backend.services.docx_extract import extract_docx_text
+
+DEFAULT_DIR = Path(__file__).resolve().parents[2] / "generated_files_with_errors"
+
+
+def _python_docx_text(data: bytes) -> str:
+    from docx import Document  # type: ignore
+
+    doc = Document(BytesIO(data))
+    return "\n".join(p.text for p in doc.paragraphs)
+
+
+def _measure(fn: Callable[[bytes], str], payloads: List[bytes], repeat: int) -> Dict:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for data in payloads:
+            fn(data)
+        best = min(best, time.perf_counter() - started)
+
+    # Peak allocation for a single pass, measured separately so tracing does not skew timings.
+    tracemalloc.start()
+    for data in payloads:
+        fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": best,
+        "docs_per_sec": len(payloads) / best if best else 0.0,
+        "peak_alloc_bytes": peak,
+    }
+
+
+def run(directory: Path, repeat: int = 3, limit: int | None = None) -> Dict:
+    paths = sorted(directory.glob("*.docx"))[:limit]
+    if not paths:
+        raise SystemExit(f"No .docx files found in {directory}")
+    payloads = [p.read_bytes() for p in paths]
+
+    results: Dict = {"files": len(payloads), "bytes": sum(len(p) for p in payloads)}
+    results["streaming"] = _measure(extract_docx_text, payloads, repeat)
+
+    try:
+        import docx  # type: ignore  # noqa: F401
+    except ImportError:
+        results["python_docx"] = None
+        return results
+
+    results["python_docx"] = _measure(_python_docx_text, payloads, repeat)
+    results["speedup"] = results["python_docx"]["seconds"] / results["streaming"]["seconds"]
+    results["mismatches"] = [
+        p.name for p, data in zip(paths, payloads) if extract_docx_text(data) != _python_docx_text(data)
+    ]
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, default=DEFAULT_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--json", type=Path, default=None, help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    results = run(args.dir, repeat=args.repeat, limit=args.limit)
+    print(f"{results['files']} files, {results['bytes'] / 1e6:.1f} MB")
+    for name in ("streaming", "python_docx"):
+        r = results.get(name)
+        if r is None:
+            print(f"  {name:<12} skipped (python-docx not installed)")
+            continue
+        print(
+            f"  {name:<12} {r['seconds']:.3f}s  {r['docs_per_sec']:.1f} docs/s  "
+            f"peak {r['peak_alloc_bytes'] / 1e6:.1f} MB"
+        )
+    if "speedup" in results:
+        print(f"  speedup      {results['speedup']:.1f}x, text mismatches: {len(results['mismatches'])}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
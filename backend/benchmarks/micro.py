@@ -0,0 +1,169 @@
+"""
+Microbenchmarks for the analysis hot paths, with a stored baseline and a regression gate.
+
+    python -m backend.benchmarks.micro                      # run and print
+    python -m backend.benchmarks.micro --save-baseline      # record micro_baseline.json
+    python -m backend.benchmarks.micro --compare --tolerance 0.25   # exit 1 on regressions
+
+Inputs are fixed (seeded) so numbers are comparable across commits on the same machine;
+record the baseline on the machine that runs the gate.
+"""
+import argparse
+import io
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from backend.benchmarks.corpus import write_minimal_docx
+from backend.files.file_gen import generate_error_text
+from backend.processing.chunk_worker import (
+    WORD_RE,
+    compute_line_offsets,
+    offset_to_position,
+    rule_based_grammar_checks,
+)
+from backend.processing.file_worker import chunk_text, collect_tokens, deduplicate_issues
+from backend.services.file_decode import decode_uploaded_file
+from backend.services.spell import BKTree, SpellChecker, damerau_levenshtein
+
+BASELINE_PATH = Path(__file__).with_name("micro_baseline.json")
+SEED = 20240601
+
+
+def _lexicon(rng: random.Random, size: int = 3000) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def _misspell(rng: random.Random, word: str) -> str:
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1 :]
+
+
+def _build_cases() -> Dict[str, Callable[[], object]]:
+    rng = random.Random(SEED)
+    lexicon = _lexicon(rng)
+    queries = [_misspell(rng, rng.choice(lexicon)) for _ in range(20)]
+    pairs = [(rng.choice(lexicon), _misspell(rng, rng.choice(lexicon))) for _ in range(200)]
+    tree = BKTree()
+    for word in lexicon:
+        tree.insert(word)
+    checker = SpellChecker(lexicon, {w: len(w) for w in lexicon})
+
+    text = "\n".join(generate_error_text(120, rng=rng) for _ in range(250))  # ~200 KB, many lines
+    line_offsets = compute_line_offsets(text)
+    offsets = [rng.randrange(len(text)) for _ in range(5000)]
+    spans: List[Tuple[str, int, int]] = [(m.group(), m.start(), m.end()) for m in WORD_RE.finditer(text)]
+    issues = []
+    for word, start, end in spans[:6000]:
+        line, col = offset_to_position(start, line_offsets)
+        issue_type = "grammar" if start % 3 else "spelling"
+        issues.append(
+            {"type": issue_type, "severity": "error", "message": "m" * (start % 7), "original": word,
+             "suggestions": ["x"] * (start % 4), "position": {"start": start, "end": end, "line": line, "col": col}}
+        )
+        if start % 5 == 0:  # overlapping duplicate, as produced by chunk overlap
+            issues.append(dict(issues[-1], type="spelling"))
+
+    docx_buffer = io.BytesIO()
+    write_minimal_docx(docx_buffer, text[:60_000])
+    docx_bytes = docx_buffer.getvalue()
+    txt_bytes = text.encode("utf-8")
+
+    return {
+        "damerau_levenshtein": lambda: [damerau_levenshtein(a, b) for a, b in pairs],
+        "bktree_search": lambda: [tree.search(q, 2) for q in queries],
+        "spellchecker_suggest": lambda: [checker.suggest(q) for q in queries],
+        "chunk_text": lambda: chunk_text(text, 4096, 128),
+        "collect_tokens": lambda: collect_tokens(text, line_offsets),
+        "compute_line_offsets": lambda: compute_line_offsets(text),
+        "offset_to_position": lambda: [offset_to_position(o, line_offsets) for o in offsets],
+        "deduplicate_issues": lambda: deduplicate_issues(issues),
+        "rule_based_grammar_checks": lambda: rule_based_grammar_checks(text, spans, line_offsets),
+        "decode_uploaded_file_docx": lambda: decode_uploaded_file("bench.docx", docx_bytes),
+        "decode_uploaded_file_txt": lambda: decode_uploaded_file("bench.txt", txt_bytes),
+    }
+
+
+def _time_case(fn: Callable[[], object], repeat: int, min_seconds: float) -> float:
+    """Best-of-`repeat` seconds per call, with the loop count calibrated to `min_seconds`."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds or number >= 1 << 20:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def run(selected: List[str] | None = None, repeat: int = 5, min_seconds: float = 0.1) -> Dict[str, float]:
+    cases = _build_cases()
+    names = selected or list(cases)
+    return {name: _time_case(cases[name], repeat, min_seconds) for name in names}
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    regressions = []
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if seconds > base * (1.0 + tolerance):
+            regressions.append(
+                f"{name}: {seconds * 1e3:.3f}ms vs baseline {base * 1e3:.3f}ms (+{(seconds / base - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="Subset of benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-seconds", type=float, default=0.1, help="Minimum measured time per repetition")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Fail if any benchmark regresses beyond --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown as a fraction (0.25 = 25%%)")
+    parser.add_argument("--json", type=Path, default=None, help="Write results (seconds per call) here")
+    args = parser.parse_args()
+
+    results = run(args.names or None, repeat=args.repeat, min_seconds=args.min_seconds)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"] if args.baseline.exists() else {}
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        delta = f"  ({(seconds / base - 1) * 100:+.0f}% vs baseline)" if base else ""
+        print(f"{name:<28} {seconds * 1e3:>10.3f} ms{delta}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"results": results}, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        merged = {**baseline, **results}
+        args.baseline.write_text(json.dumps({"results": merged}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+    if args.compare:
+        if not baseline:
+            raise SystemExit(f"No baseline at {args.baseline}; run with --save-baseline first")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nPerformance regressions:", *regressions, sep="\n  ")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
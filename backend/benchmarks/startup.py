@@ -0,0 +1,135 @@
+"""
+Import-time report for the API process and the pool workers.
+
+    python -m backend.benchmarks.startup                    # default modules, top 15 imports each
+    python -m backend.benchmarks.startup --module backend.app --top 30 --json startup.json
+
+Each module is imported in a fresh interpreter under `python -X importtime`; the report
+gives the median wall time over `--repeat` runs, the slowest imports by cumulative and
+self time, and which heavy optional dependencies were pulled in eagerly. Worker modules
+must not import the web stack or optional dependencies at import time.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+# Modules whose import cost is paid on every API start (`--reload`) and every worker (re)spawn.
+DEFAULT_MODULES = (
+    "backend.app",
+    "backend.processing.file_worker",
+    "backend.processing.profiling",
+    "backend.processing.worker_pool",
+    "backend.cluster.node",
+)
+# Imported lazily on first use; finding one in a report is a regression.
+LAZY_DEPENDENCIES = ("wordfreq", "language_tool_python", "msgpack", "docx")
+# The pool workers run analysis only; the web stack is the API process's business.
+WEB_STACK = ("fastapi", "starlette", "pydantic", "uvicorn")
+WORKER_MODULES = (
+    "backend.processing.file_worker",
+    "backend.processing.profiling",
+    "backend.processing.worker_pool",
+    "backend.cluster.node",
+)
+
+
+def _parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of `import time: self [us] | cumulative | imported package`."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header row
+        name = fields[2].rstrip()
+        rows.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_us": int(fields[0]),
+                "cumulative_us": int(fields[1]),
+            }
+        )
+    return rows
+
+
+def measure(module: str, repeat: int) -> Dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+    walls: List[float] = []
+    rows: List[Dict] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        walls.append(time.perf_counter() - started)
+        if proc.returncode != 0:
+            raise SystemExit(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+        rows = _parse_importtime(proc.stderr)
+    imported = {row["module"].split(".")[0] for row in rows}
+    target = next((row for row in rows if row["module"] == module), None)
+    return {
+        "module": module,
+        "wall_ms": round(statistics.median(walls) * 1000.0, 1),
+        "import_ms": round(target["cumulative_us"] / 1000.0, 1) if target else None,
+        "modules_imported": len(rows),
+        "eager_optional": sorted(imported.intersection(LAZY_DEPENDENCIES)),
+        "web_stack": sorted(imported.intersection(WEB_STACK)),
+        "rows": rows,
+    }
+
+
+def _top(rows: List[Dict], key: str, limit: int) -> List[Dict]:
+    return sorted(rows, key=lambda row: row[key], reverse=True)[:limit]
+
+
+def report(result: Dict, limit: int) -> List[str]:
+    problems = []
+    print(
+        f"\n{result['module']}: {result['import_ms']} ms import, {result['wall_ms']} ms process wall "
+        f"(median), {result['modules_imported']} modules"
+    )
+    for key, title in (("cumulative_us", "cumulative"), ("self_us", "self")):
+        print(f"  top {limit} by {title}:")
+        for row in _top(result["rows"], key, limit):
+            print(f"    {row[key] / 1000.0:9.1f} ms  {row['module']}")
+    if result["eager_optional"]:
+        problems.append(f"{result['module']} eagerly imports {', '.join(result['eager_optional'])}")
+    if result["module"] in WORKER_MODULES and result["web_stack"]:
+        problems.append(f"{result['module']} (worker) imports {', '.join(result['web_stack'])}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", default=None, help="Module to import (repeatable)")
+    parser.add_argument("--top", type=int, default=15, help="Imports to list per ranking")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module; wall time is the median")
+    parser.add_argument("--json", type=Path, default=None, help="Write the full per-import rows here")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a lazy dependency or the web stack leaks in")
+    args = parser.parse_args()
+
+    results = [measure(module, max(1, args.repeat)) for module in args.module or DEFAULT_MODULES]
+    problems = [problem for result in results for problem in report(result, args.top)]
+    for problem in problems:
+        print(f"WARNING: {problem}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.check and problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
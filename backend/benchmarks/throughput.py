@@ -0,0 +1,340 @@
+"""
+End-to-end throughput benchmark: seeded corpus -> real FastAPI app -> docs/sec and latency.
+
+Every configuration in the sweep runs in a fresh interpreter (settings are read from the
+environment at import), either in-process through an ASGI transport or against a
+uvicorn server on localhost. Grammar uses the deterministic stub by default so the
+suite runs without Java.
+
+    python -m backend.benchmarks.throughput --docs 100 --process-workers 1,2 \\
+        --chunk-size 1024,4096 --out bench_results.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from backend.benchmarks.corpus import CorpusSpec, build_corpus
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+DEFAULT_CORPUS_DIR = Path(tempfile.gettempdir()) / "turbotext-bench-corpus"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def _csv(value: str, cast=str) -> List:
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _drive(client, payloads: List[tuple], batch_size: int, concurrency: int) -> Dict:
+    batches = [payloads[i : i + batch_size] for i in range(0, len(payloads), batch_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = {"http": 0, "file_errors": 0}
+
+    async def _send(batch):
+        files = [("files", (name, data)) for name, data in batch]
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/analyze-files", files=files, timeout=None)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        if response.status_code != 200:
+            failures["http"] += 1
+            return
+        failures["file_errors"] += sum(1 for f in response.json()["files"] if f.get("error"))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_send(batch) for batch in batches])
+    elapsed = time.perf_counter() - started
+    return {"seconds": elapsed, "latencies_ms": latencies, **failures}
+
+
+async def _run_in_process(payloads, batch_size, concurrency) -> Dict:
+    import httpx
+
+    from backend import app as app_module
+
+    app = app_module.app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _drive(client, payloads[:1], 1, 1)  # warm up worker caches outside the measurement
+            result = await _drive(client, payloads, batch_size, concurrency)
+    return result
+
+
+def process_group_options() -> Dict:
+    """Popen options giving the child its own process group, so its pool workers are stopped with it."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def kill_process_group(proc: subprocess.Popen) -> None:
+    """Kill `proc` and everything it started (`taskkill /T` on Windows, which has no process groups to signal)."""
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _stop_process_group(proc: subprocess.Popen) -> None:
+    try:
+        if os.name == "nt":
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(proc.pid, signal.SIGINT)
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        pass
+    except ProcessLookupError:
+        return
+    kill_process_group(proc)
+    proc.wait()
+
+
+async def _run_over_http(payloads, batch_size, concurrency) -> Dict:
+    import httpx
+
+    port = _free_port()
+    # Own session so pool workers (forked from uvicorn, holding its socket) are torn down with it.
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+        **process_group_options(),
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            for _ in range(300):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            await _drive(client, payloads[:1], 1, 1)
+            return await _drive(client, payloads, batch_size, concurrency)
+    finally:
+        _stop_process_group(server)
+
+
+def _peak_rss_mb() -> Tuple[Optional[float], Optional[float]]:
+    """Peak RSS of this process and of its largest reaped child, in MB (None where `resource` is missing)."""
+    if resource is None:
+        return None, None
+    unit = 1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0  # ru_maxrss is bytes on macOS, KB elsewhere
+    return tuple(
+        round(resource.getrusage(who).ru_maxrss / unit, 1) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+    )
+
+
+def _child(config: Dict) -> Dict:
+    corpus_dir = Path(config["corpus_dir"])
+    names = json.loads((corpus_dir / "manifest.json").read_text(encoding="utf-8"))["files"]
+    payloads = [(f["name"], (corpus_dir / f["name"]).read_bytes()) for f in names]
+    runner = _run_in_process if config["mode"] == "inprocess" else _run_over_http
+    result = asyncio.run(runner(payloads, config["batch_size"], config["concurrency"]))
+
+    latencies = result.pop("latencies_ms")
+    self_rss, child_rss = _peak_rss_mb()
+    return {
+        "config": {k: v for k, v in config.items() if k != "corpus_dir"},
+        "docs": len(payloads),
+        "bytes": sum(len(p[1]) for p in payloads),
+        "seconds": round(result["seconds"], 4),
+        "docs_per_sec": round(len(payloads) / result["seconds"], 3) if result["seconds"] else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+        },
+        "peak_rss_mb": {"api": self_rss, "workers_max": child_rss},
+        "http_failures": result["http"],
+        "file_errors": result["file_errors"],
+    }
+
+
+def _config_env(config: Dict, storage_root: str) -> Dict[str, str]:
+    env = os.environ.copy()
+    env.update(
+        {
+            "PROCESS_WORKERS": str(config["process_workers"]),
+            "THREAD_WORKERS": str(config["thread_workers"]),
+            "CHUNK_SIZE": str(config["chunk_size"]),
+            "CHUNK_OVERLAP": str(config["chunk_overlap"]),
+            "DICTIONARY_PATH": str(Path(config["corpus_dir"]) / "dictionary.json"),
+            "STORAGE_ROOT": storage_root,
+            "MAX_FILES": str(max(1000, config["batch_size"])),
+            "GRAMMAR_BACKEND": config["grammar"],
+            "STUB_GRAMMAR_LATENCY_MS": str(config["stub_latency_ms"]),
+            "STUB_GRAMMAR_PER_KCHAR_MS": str(config["stub_per_kchar_ms"]),
+        }
+    )
+    return env
+
+
+def sweep(args: argparse.Namespace) -> List[Dict]:
+    spec = CorpusSpec(
+        seed=args.seed,
+        docs=args.docs,
+        sizes=tuple((int(w), float(p)) for w, p in (item.split(":") for item in _csv(args.sizes))),
+        formats=tuple((ext, float(p)) for ext, p in (item.split(":") for item in _csv(args.formats))),
+        spelling_rate=args.spelling_rate,
+        grammar_rate=args.grammar_rate,
+    )
+    corpus_dir = args.corpus_dir / f"seed{spec.seed}-docs{spec.docs}"
+    build_corpus(spec, corpus_dir)
+
+    results = []
+    grid = itertools.product(
+        _csv(args.process_workers, int),
+        _csv(args.thread_workers, int),
+        _csv(args.chunk_size),
+        _csv(args.chunk_overlap, int),
+    )
+    for process_workers, thread_workers, chunk_size, chunk_overlap in grid:
+        config = {
+            "mode": args.mode,
+            "process_workers": process_workers,
+            "thread_workers": thread_workers,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "batch_size": args.batch_size,
+            "concurrency": args.concurrency,
+            "grammar": args.grammar,
+            "stub_latency_ms": args.stub_latency_ms,
+            "stub_per_kchar_ms": args.stub_per_kchar_ms,
+            "corpus_dir": str(corpus_dir),
+        }
+        with tempfile.TemporaryDirectory(prefix="turbotext-bench-") as storage_root:
+            proc = subprocess.run(
+                [sys.executable, "-m", "backend.benchmarks.throughput", "--child", json.dumps(config)],
+                env=_config_env(config, storage_root),
+                capture_output=True,
+                text=True,
+            )
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stderr)
+            raise SystemExit(f"Benchmark run failed for {config}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["corpus"] = {"seed": spec.seed, "docs": spec.docs, "sizes": spec.sizes, "formats": spec.formats}
+        results.append(result)
+        _print_row(result)
+    return results
+
+
+def _print_row(result: Dict) -> None:
+    c = result["config"]
+    print(
+        f"pw={c['process_workers']:<2} tw={c['thread_workers']:<2} chunk={c['chunk_size']:<6} ov={c['chunk_overlap']:<4} "
+        f"{result['docs_per_sec']:>8.2f} docs/s  p50={result['latency_ms']['p50']:>8.1f}ms "
+        f"p95={result['latency_ms']['p95']:>8.1f}ms p99={result['latency_ms']['p99']:>8.1f}ms"
+        + (
+            f"  rss api={result['peak_rss_mb']['api']:.0f}MB worker={result['peak_rss_mb']['workers_max']:.0f}MB"
+            if result["peak_rss_mb"]["api"] is not None
+            else ""
+        )
+        + (f"  failures={result['http_failures']}" if result["http_failures"] else "")
+    )
+
+
+def compare_auto(results: List[Dict]) -> List[Dict]:
+    """For each configuration swept with `--chunk-size ...,auto`, compare auto against the best fixed size."""
+    groups: Dict[tuple, Dict[str, Dict]] = {}
+    for result in results:
+        c = result["config"]
+        key = (c["process_workers"], c["thread_workers"], c["chunk_overlap"])
+        groups.setdefault(key, {})[str(c["chunk_size"])] = result
+    comparisons = []
+    for (process_workers, thread_workers, chunk_overlap), by_size in groups.items():
+        auto = by_size.pop("auto", None)
+        if auto is None or not by_size:
+            continue
+        best_size, best = max(by_size.items(), key=lambda item: item[1]["docs_per_sec"])
+        comparisons.append(
+            {
+                "process_workers": process_workers,
+                "thread_workers": thread_workers,
+                "chunk_overlap": chunk_overlap,
+                "auto_docs_per_sec": auto["docs_per_sec"],
+                "best_fixed_chunk_size": best_size,
+                "best_fixed_docs_per_sec": best["docs_per_sec"],
+                "speedup": round(auto["docs_per_sec"] / best["docs_per_sec"], 3) if best["docs_per_sec"] else None,
+                "auto_p95_ms": auto["latency_ms"]["p95"],
+                "best_fixed_p95_ms": best["latency_ms"]["p95"],
+            }
+        )
+    return comparisons
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus-dir", type=Path, default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--sizes", default="200:0.6,2000:0.3,20000:0.1", help="words:weight,...")
+    parser.add_argument("--formats", default="txt:0.4,md:0.3,docx:0.3", help="ext:weight,...")
+    parser.add_argument("--spelling-rate", type=float, default=0.15)
+    parser.add_argument("--grammar-rate", type=float, default=0.3)
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--process-workers", default="1,2", help="comma-separated sweep values")
+    parser.add_argument("--thread-workers", default="4")
+    parser.add_argument("--chunk-size", default="4096", help="sizes and/or 'auto' (adaptive), e.g. 1024,4096,auto")
+    parser.add_argument("--chunk-overlap", default="128")
+    parser.add_argument("--batch-size", type=int, default=1, help="files per request")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent requests")
+    parser.add_argument("--grammar", choices=["stub", "languagetool"], default="stub")
+    parser.add_argument("--stub-latency-ms", type=float, default=5.0)
+    parser.add_argument("--stub-per-kchar-ms", type=float, default=1.0)
+    parser.add_argument("--out", type=Path, default=None, help="Write machine-readable results (JSON) here")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    if args.child:
+        print(json.dumps(_child(json.loads(args.child))))
+        return
+    results = sweep(args)
+    comparisons = compare_auto(results)
+    for row in comparisons:
+        print(
+            f"auto vs best fixed (chunk={row['best_fixed_chunk_size']}) at pw={row['process_workers']} "
+            f"tw={row['thread_workers']}: {row['auto_docs_per_sec']:.2f} vs {row['best_fixed_docs_per_sec']:.2f} docs/s "
+            f"(x{row['speedup']}), p95 {row['auto_p95_ms']:.0f} vs {row['best_fixed_p95_ms']:.0f} ms"
+        )
+    if args.out:
+        args.out.write_text(json.dumps({"results": results, "auto_vs_fixed": comparisons}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
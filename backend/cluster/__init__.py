@@ -0,0 +1 @@
+"""Multi-node analysis: a coordinator in the API process and worker nodes (`python -m backend.cluster.node`)."""
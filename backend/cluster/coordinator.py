@@ -0,0 +1,285 @@
+"""
+Coordinator: the API process hands pool tasks to worker nodes over TCP.
+
+Nodes (`python -m backend.cluster.node`) connect, announce how many tasks they run at
+once, and then receive tasks up to that many. `Coordinator.run` has the same shape as
+`RecyclingPool.run`, so the API routes a task to the cluster or the local pool at one
+call site.
+
+A node that closes its connection or misses heartbeats for `node_timeout` seconds is
+dropped and its in-flight tasks go back to the front of the queue for another node,
+up to `max_attempts` dispatches per task. Tasks that raise on a node are not retried
+(the document would fail the same way elsewhere), except when the node's own process
+pool broke under them. When the last node leaves, queued tasks fail with
+`ClusterUnavailable` so the caller can run them locally.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+from backend.cluster.protocol import ALLOWED_TASKS, Channel, ProtocolError, task_name
+
+logger = logging.getLogger("backend")
+
+_HELLO_TIMEOUT_SECONDS = 10.0
+
+
+class ClusterUnavailable(Exception):
+    """No node can take (or finish) the task; run it locally instead."""
+
+
+class RemoteTaskError(Exception):
+    """The task raised on a worker node; the message names the original exception."""
+
+
+class _Task:
+    __slots__ = ("id", "fn", "args", "future", "attempts", "submitted")
+
+    def __init__(self, task_id: int, fn: str, args: tuple, future: asyncio.Future) -> None:
+        self.id = task_id
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.attempts = 0
+        self.submitted = time.perf_counter()
+
+
+class _Node:
+    __slots__ = ("name", "channel", "slots", "running", "last_seen", "connected_at", "completed", "info")
+
+    def __init__(self, name: str, channel: Channel, slots: int) -> None:
+        self.name = name
+        self.channel = channel
+        self.slots = slots
+        self.running: Dict[int, _Task] = {}
+        self.last_seen = time.monotonic()
+        self.connected_at = time.time()
+        self.completed = 0
+        self.info: Dict = {}
+
+    @property
+    def free(self) -> int:
+        return self.slots - len(self.running)
+
+
+class Coordinator:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        secret: str,
+        heartbeat_seconds: float = 2.0,
+        node_timeout: float = 10.0,
+        max_attempts: int = 3,
+        max_frame_bytes: int = 256 * 1024 * 1024,
+        on_capacity: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        if not secret:
+            raise ValueError("CLUSTER_SECRET must be set to accept worker nodes")
+        self.host = host
+        self.port = port
+        self.secret = secret.encode("utf-8")
+        self.heartbeat_seconds = heartbeat_seconds
+        self.node_timeout = node_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.max_frame_bytes = max_frame_bytes
+        self.on_capacity = on_capacity
+        self.nodes: Dict[str, _Node] = {}
+        self.counters = {"dispatched": 0, "completed": 0, "task_errors": 0, "requeued": 0, "failed": 0, "cancelled": 0, "nodes_lost": 0}
+        self._queue: Deque[_Task] = deque()
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._sessions: Set[asyncio.Task] = set()
+
+    @property
+    def capacity(self) -> int:
+        """Tasks the connected nodes run at once (0 = no nodes)."""
+        return sum(node.slots for node in self.nodes.values())
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # resolves port 0
+        self._monitor = asyncio.create_task(self._watch())
+        logger.info("Cluster coordinator listening on %s:%d", self.host, self.port)
+
+    async def close(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+        if self._server is not None:
+            self._server.close()
+        for node in list(self.nodes.values()):
+            self._drop(node, "coordinator shutting down", requeue=False)
+        self._fail_queued("coordinator shut down")
+        if self._sessions:  # closed sockets end each session's read loop
+            await asyncio.wait(set(self._sessions), timeout=_HELLO_TIMEOUT_SECONDS)
+
+    async def run(self, fn: Any, *args: Any) -> Any:
+        name = task_name(fn)
+        if name not in ALLOWED_TASKS:
+            raise ValueError(f"{name} cannot run on worker nodes")
+        if not self.nodes:
+            raise ClusterUnavailable("no worker nodes connected")
+        task = _Task(next(self._ids), name, args, asyncio.get_running_loop().create_future())
+        self._queue.append(task)
+        self._dispatch()
+        try:
+            return await task.future
+        except asyncio.CancelledError:
+            # Still queued: drop it. Already on a node: tell the node to stop it and reuse the slot.
+            try:
+                self._queue.remove(task)
+            except ValueError:
+                self._cancel_running(task)
+            raise
+
+    def _cancel_running(self, task: _Task) -> None:
+        for node in self.nodes.values():
+            if node.running.pop(task.id, None) is not None:
+                self.counters["cancelled"] += 1
+                asyncio.create_task(self._send_cancel(node, task.id))
+                self._dispatch()
+                return
+
+    async def _send_cancel(self, node: _Node, task_id: int) -> None:
+        try:
+            await node.channel.send({"type": "cancel", "id": task_id})
+        except (ConnectionError, OSError):
+            pass  # the node is going away anyway
+
+    def _dispatch(self) -> None:
+        while self._queue:
+            node = max(self.nodes.values(), key=lambda n: n.free, default=None)
+            if node is None or node.free <= 0:
+                return
+            task = self._queue.popleft()
+            if task.future.done():
+                continue
+            task.attempts += 1
+            node.running[task.id] = task
+            self.counters["dispatched"] += 1
+            asyncio.create_task(self._send(node, task))
+
+    async def _send(self, node: _Node, task: _Task) -> None:
+        try:
+            await node.channel.send({"type": "task", "id": task.id, "fn": task.fn, "args": task.args})
+        except (ConnectionError, OSError) as exc:
+            self._drop(node, f"send failed: {exc}")
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        channel = Channel(reader, writer, self.secret, self.max_frame_bytes)
+        node: Optional[_Node] = None
+        session = asyncio.current_task()
+        self._sessions.add(session)
+        try:
+            hello = await asyncio.wait_for(channel.receive(), _HELLO_TIMEOUT_SECONDS)
+            if hello["type"] != "hello" or int(hello.get("slots", 0)) < 1:
+                raise ProtocolError("expected hello with at least one slot")
+            name = str(hello.get("node") or channel.peer)
+            while name in self.nodes:
+                name += "'"
+            node = self.nodes[name] = _Node(name, channel, int(hello["slots"]))
+            await channel.send({"type": "welcome", "node": name, "heartbeat_seconds": self.heartbeat_seconds})
+            logger.info("Cluster node %s joined from %s with %d slots", name, channel.peer, node.slots)
+            self._capacity_changed()
+            self._dispatch()
+            while True:
+                message = await channel.receive()
+                node.last_seen = time.monotonic()
+                if message["type"] == "result":
+                    self._finish(node, message)
+                elif message["type"] == "heartbeat":
+                    node.info = {k: v for k, v in message.items() if k != "type"}
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as exc:
+            if node is not None:
+                self._drop(node, f"connection closed ({type(exc).__name__})")
+        except (ProtocolError, asyncio.TimeoutError, ValueError, TypeError, KeyError) as exc:
+            logger.warning("Cluster peer %s rejected: %s", node.name if node else channel.peer, exc or type(exc).__name__)
+            if node is not None:
+                self._drop(node, "protocol error")
+        finally:
+            self._sessions.discard(session)
+            await channel.close()
+
+    def _finish(self, node: _Node, message: Dict) -> None:
+        task = node.running.pop(message["id"], None)
+        if task is None or task.future.done():  # cancelled by the caller
+            self._dispatch()
+            return
+        node.completed += 1
+        if message["ok"]:
+            self.counters["completed"] += 1
+            task.future.set_result(message["value"])
+        elif message.get("retry") and task.attempts < self.max_attempts:
+            self.counters["requeued"] += 1
+            self._queue.appendleft(task)
+        else:
+            self.counters["task_errors"] += 1
+            task.future.set_exception(RemoteTaskError(f"{message['error']} (on node {node.name})"))
+        self._dispatch()
+
+    def _drop(self, node: _Node, reason: str, requeue: bool = True) -> None:
+        """Forget `node` and hand its in-flight tasks to the others (idempotent)."""
+        if self.nodes.get(node.name) is not node:
+            return
+        del self.nodes[node.name]
+        self.counters["nodes_lost"] += 1
+        logger.warning("Cluster node %s left (%s); %d tasks in flight", node.name, reason, len(node.running))
+        for task in node.running.values():
+            if task.future.done():
+                continue
+            if requeue and task.attempts < self.max_attempts:
+                self.counters["requeued"] += 1
+                self._queue.appendleft(task)
+            else:
+                self.counters["failed"] += 1
+                task.future.set_exception(
+                    ClusterUnavailable(f"node {node.name} lost ({reason}) after {task.attempts} attempt(s)")
+                )
+        node.running.clear()
+        node.channel.writer.close()  # ends its `_serve` loop if the socket is still open
+        self._capacity_changed()
+        if not self.nodes:
+            self._fail_queued("every worker node left")
+        self._dispatch()
+
+    def _fail_queued(self, reason: str) -> None:
+        while self._queue:
+            task = self._queue.popleft()
+            if not task.future.done():
+                task.future.set_exception(ClusterUnavailable(reason))
+
+    def _capacity_changed(self) -> None:
+        if self.on_capacity is not None:
+            self.on_capacity(self.capacity)
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            deadline = time.monotonic() - self.node_timeout
+            for node in list(self.nodes.values()):
+                if node.last_seen < deadline:
+                    self._drop(node, f"no heartbeat for {self.node_timeout:g}s")
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            "listen": f"{self.host}:{self.port}",
+            "capacity": self.capacity,
+            "queued": len(self._queue),
+            **self.counters,
+            "nodes": {
+                name: {
+                    "slots": node.slots,
+                    "running": len(node.running),
+                    "completed": node.completed,
+                    "last_seen_seconds": round(now - node.last_seen, 2),
+                    "connected_at": node.connected_at,
+                    **node.info,
+                }
+                for name, node in self.nodes.items()
+            },
+        }
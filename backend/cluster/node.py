@@ -0,0 +1,160 @@
+"""
+Worker node: runs tasks from a coordinator on a local process pool.
+
+    CLUSTER_SECRET=... python -m backend.cluster.node --coordinator api-host:9100 --processes 8
+
+The node connects out to the coordinator (so only the coordinator listens), reports its
+slot count and sends a heartbeat every interval the coordinator asks for. Each task runs
+with the settings the coordinator sent, so dictionary, LanguageTool and STORAGE_ROOT
+paths must resolve the same way on every node. If the connection drops, running tasks are
+abandoned (the coordinator has already requeued them) and the node reconnects with
+backoff, keeping its warm pool.
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import socket
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from backend.cluster.protocol import ALLOWED_TASKS, Channel, ProtocolError, parse_address
+from backend.config import Settings, load_settings
+from backend.processing.worker_pool import RecyclingPool
+
+logger = logging.getLogger("backend")
+
+_MAX_BACKOFF_SECONDS = 10.0
+
+
+def _resolve(name: str):
+    if name not in ALLOWED_TASKS:
+        raise ProtocolError(f"task {name} is not allowed on worker nodes")
+    module, _, attr = name.rpartition(".")
+    return getattr(importlib.import_module(module), attr)
+
+
+async def _execute(channel: Channel, pool: RecyclingPool, message: Dict) -> None:
+    started = time.perf_counter()
+    reply: Dict = {"type": "result", "id": message["id"]}
+    try:
+        value = await pool.run(_resolve(message["fn"]), *message["args"])
+        reply.update(ok=True, value=value)
+    except BrokenProcessPool as exc:  # a worker died under the task, not the task's fault
+        reply.update(ok=False, retry=True, error=f"{type(exc).__name__}: {exc}")
+    except Exception as exc:
+        reply.update(ok=False, error=f"{type(exc).__name__}: {exc}")
+    reply["seconds"] = round(time.perf_counter() - started, 4)
+    try:
+        await channel.send(reply)
+    except (ConnectionError, OSError):
+        pass  # connection gone; the coordinator requeued this task
+
+
+async def _heartbeat(channel: Channel, pool: RecyclingPool, running: Dict[int, asyncio.Task], interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await channel.send(
+            {
+                "type": "heartbeat",
+                "running": len(running),
+                "pool_generation": pool.generation,
+                "worker_rss_bytes": pool.worker_rss_bytes,
+            }
+        )
+
+
+async def _session(channel: Channel, pool: RecyclingPool, name: str, slots: int) -> None:
+    await channel.send({"type": "hello", "node": name, "slots": slots, "pid": os.getpid()})
+    welcome = await channel.receive()
+    if welcome["type"] != "welcome":
+        raise ProtocolError(f"expected welcome, got {welcome['type']}")
+    logger.info("Joined coordinator %s as %s with %d slots", channel.peer, welcome["node"], slots)
+    running: Dict[int, asyncio.Task] = {}
+    beat = asyncio.create_task(_heartbeat(channel, pool, running, float(welcome["heartbeat_seconds"])))
+    try:
+        while True:
+            receive = asyncio.ensure_future(channel.receive())
+            done, _ = await asyncio.wait({receive, beat}, return_when=asyncio.FIRST_COMPLETED)
+            if beat in done:  # sending a heartbeat failed: the connection is gone
+                receive.cancel()
+                beat.result()
+            message = receive.result()
+            if message["type"] == "task":
+                task_id = message["id"]
+                running[task_id] = asyncio.create_task(_execute(channel, pool, message))
+                running[task_id].add_done_callback(lambda _, task_id=task_id: running.pop(task_id, None))
+            elif message["type"] == "cancel" and message["id"] in running:
+                running[message["id"]].cancel()  # the pool raises the task's cancellation flag
+    finally:
+        beat.cancel()
+        for task in list(running.values()):
+            task.cancel()
+
+
+async def serve(coordinator: str, name: str, slots: int, settings: Settings, secret: str) -> None:
+    host, port = parse_address(coordinator)
+    pool = RecyclingPool(
+        slots,
+        settings,
+        start_method=settings.pool_start_method,
+        max_tasks=settings.worker_max_tasks,
+        max_rss_bytes=settings.worker_max_rss_mb * 1024 * 1024,
+    )
+    pool.start()
+    backoff = 0.5
+    try:
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError as exc:
+                logger.warning("Coordinator %s:%d unreachable (%s); retrying in %.1fs", host, port, exc, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(_MAX_BACKOFF_SECONDS, backoff * 2)
+                continue
+            channel = Channel(reader, writer, secret.encode("utf-8"), settings.cluster_max_frame_mb * 1024 * 1024)
+            try:
+                await _session(channel, pool, name, slots)
+            except (asyncio.IncompleteReadError, ConnectionError, OSError) as exc:
+                logger.warning("Lost coordinator connection (%s)", type(exc).__name__)
+                backoff = 0.5
+            except (ProtocolError, KeyError) as exc:
+                logger.error("Coordinator rejected the session: %s", exc)
+                backoff = min(_MAX_BACKOFF_SECONDS, backoff * 2)
+            finally:
+                await channel.close()
+            await asyncio.sleep(backoff)
+    finally:
+        await pool.close()
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument(
+        "--coordinator",
+        default=os.environ.get("CLUSTER_COORDINATOR", ""),
+        help="coordinator host:port (its CLUSTER_LISTEN; default CLUSTER_COORDINATOR)",
+    )
+    parser.add_argument("--processes", type=int, default=0, help="worker processes (default PROCESS_WORKERS or CPU count)")
+    parser.add_argument("--name", default="", help="node name in /health (default host-pid)")
+    args = parser.parse_args(argv)
+    if not args.coordinator:
+        parser.error("--coordinator or CLUSTER_COORDINATOR is required")
+    settings = load_settings()
+    if not settings.cluster_secret:
+        parser.error("CLUSTER_SECRET must be set (the same value as on the coordinator)")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    slots = args.processes or settings.process_workers or max(1, os.cpu_count() or 1)
+    name = args.name or f"{socket.gethostname()}-{os.getpid()}"
+    try:
+        asyncio.run(serve(args.coordinator, name, slots, settings, settings.cluster_secret))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Wire format between the coordinator and worker nodes.
+
+Every message is a pickled dict in a frame: 4-byte big-endian payload length, a 32-byte
+HMAC-SHA256 of the payload under the shared `CLUSTER_SECRET`, then the payload. The MAC
+is checked before anything is unpickled, so only holders of the secret can make a peer
+run code; frames are not encrypted, so keep the cluster on a private network.
+
+Messages (`type`): node → coordinator `hello` (node name, slots), `result` (task id,
+`ok`, `value` or `error`, seconds), `heartbeat` (running tasks, RSS); coordinator → node
+`welcome` (heartbeat interval), `task` (task id, function, args), `cancel` (task id; the
+node stops it and sends no result).
+"""
+import asyncio
+import hashlib
+import hmac
+import pickle
+import struct
+from typing import Any, Dict, Tuple
+
+_HEADER = struct.Struct("!I")
+_MAC_BYTES = 32
+DEFAULT_PORT = 9100
+# Functions a node agrees to run (module-level, so pickle sends them by name).
+ALLOWED_TASKS = frozenset(
+    {
+        "backend.processing.file_worker.process_document",
+        "backend.processing.profiling.profile_document",
+        "backend.services.file_decode.decode_uploaded_file_timed",
+    }
+)
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def task_name(fn: Any) -> str:
+    return f"{fn.__module__}.{fn.__qualname__}"
+
+
+def parse_address(value: str, default_host: str = "127.0.0.1") -> Tuple[str, int]:
+    """`host:port`, `:port` or `host` → (host, port)."""
+    host, sep, port = value.rpartition(":")
+    if not sep:
+        return value or default_host, DEFAULT_PORT
+    return host or default_host, int(port)
+
+
+class Channel:
+    """Authenticated message stream over one TCP connection; sends are serialized."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, secret: bytes, max_frame_bytes: int):
+        self.reader = reader
+        self.writer = writer
+        self._secret = secret
+        self._max_frame = max_frame_bytes
+        self._send_lock = asyncio.Lock()
+
+    @property
+    def peer(self) -> str:
+        peer = self.writer.get_extra_info("peername")
+        return f"{peer[0]}:{peer[1]}" if peer else "?"
+
+    async def send(self, message: Dict) -> None:
+        payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+        mac = hmac.new(self._secret, payload, hashlib.sha256).digest()
+        async with self._send_lock:
+            self.writer.write(_HEADER.pack(len(payload)) + mac)
+            self.writer.write(payload)
+            await self.writer.drain()
+
+    async def receive(self) -> Dict:
+        """Next message; raises `asyncio.IncompleteReadError` when the peer closes the connection."""
+        (length,) = _HEADER.unpack(await self.reader.readexactly(_HEADER.size))
+        if length > self._max_frame:
+            raise ProtocolError(f"frame of {length} bytes exceeds the {self._max_frame}-byte limit")
+        mac = await self.reader.readexactly(_MAC_BYTES)
+        payload = await self.reader.readexactly(length)
+        if not hmac.compare_digest(mac, hmac.new(self._secret, payload, hashlib.sha256).digest()):
+            raise ProtocolError("bad message authentication code (check CLUSTER_SECRET)")
+        message = pickle.loads(payload)
+        if not isinstance(message, dict) or "type" not in message:
+            raise ProtocolError("malformed message")
+        return message
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
@@ -1,5 +1,10 @@
 import os
 from dataclasses import dataclass
+from typing import Tuple
+
+
+def _int_or_auto(value: str) -> int:
+    return 0 if value.strip().lower() == "auto" else int(value)
 
 
 @dataclass(frozen=True)
@@ -9,17 +14,116 @@ class Settings:
     storage_root: str = os.environ.get("STORAGE_ROOT", "storage")
     dictionary_path: str = os.environ.get("DICTIONARY_PATH", "data/dictionary.json")
     language: str = os.environ.get("LANGUAGE", "en-US")
+    # Language DICTIONARY_PATH is written in; other languages use DICTIONARY_PATHS ("de=path,fr=path") or wordfreq.
+    dictionary_language: str = os.environ.get("DICTIONARY_LANGUAGE", os.environ.get("LANGUAGE", "en-US"))
+    dictionary_paths: str = os.environ.get("DICTIONARY_PATHS", "")
+    # Languages each worker loads at start besides LANGUAGE (comma-separated); others load on first use.
+    preload_languages: str = os.environ.get("PRELOAD_LANGUAGES", "")
+    # Per-process budget for loaded lexicons and grammar tools; least recently used ones are evicted past it.
+    language_model_budget_mb: int = int(os.environ.get("LANGUAGE_MODEL_BUDGET_MB", "1024"))
+    # What one local LanguageTool server (its JVM) is charged against that budget.
+    language_tool_model_mb: int = int(os.environ.get("LANGUAGE_TOOL_MODEL_MB", "512"))
+    # Custom dictionary (STORAGE_ROOT/dictionaries/<name>.json) layered over the lexicon; requests may pick another.
+    custom_dictionary: str = os.environ.get("CUSTOM_DICTIONARY", "")
+    # Extra accepted words for one request (set per request, never from the environment).
+    custom_words: Tuple[str, ...] = ()
+    # URL of a LanguageTool server shared by all workers (e.g. http://127.0.0.1:8081); no per-worker JVMs.
+    language_tool_server: str = os.environ.get("LANGUAGE_TOOL_SERVER", "")
     # Default to the bundled LanguageTool directory if present; override via LANGUAGE_TOOL_PATH to use another install.
     language_tool_path: str = os.environ.get("LANGUAGE_TOOL_PATH", "data/LanguageTool-6.6")
-    chunk_size: int = int(os.environ.get("CHUNK_SIZE", "4096"))
+    # "auto" (stored as 0) sizes chunks per document from its length, pool load and measured per-chunk cost.
+    chunk_size: int = _int_or_auto(os.environ.get("CHUNK_SIZE", "4096"))
+    chunk_size_min: int = int(os.environ.get("CHUNK_SIZE_MIN", "1024"))
+    chunk_size_max: int = int(os.environ.get("CHUNK_SIZE_MAX", "65536"))
     chunk_overlap: int = int(os.environ.get("CHUNK_OVERLAP", "128"))
     process_workers: int = int(os.environ.get("PROCESS_WORKERS", "0"))  # 0 → auto
     thread_workers: int = int(os.environ.get("THREAD_WORKERS", "0"))  # 0 → auto
+    # multiprocessing start method for the pool ("fork", "spawn", "forkserver"; empty → platform default).
+    # spawn/forkserver workers import only the worker modules and do not inherit the server's socket.
+    pool_start_method: str = os.environ.get("POOL_START_METHOD", "")
+    # Replace the worker pool (warm, letting submitted work finish) once any worker has run WORKER_MAX_TASKS
+    # tasks or reports RSS above WORKER_MAX_RSS_MB (read from /proc; Linux only). 0 disables either limit.
+    worker_max_tasks: int = int(os.environ.get("WORKER_MAX_TASKS", "0"))
+    worker_max_rss_mb: int = int(os.environ.get("WORKER_MAX_RSS_MB", "1024"))
     max_files: int = int(os.environ.get("MAX_FILES", "1000"))
     max_file_bytes: int = int(os.environ.get("MAX_FILE_BYTES", str(5 * 1024 * 1024)))  # 5MB
+    # Plain-text uploads above MAX_FILE_BYTES and up to this size are spooled to STORAGE_ROOT/large and analyzed
+    # from a memory map in large-document mode (0 → reject them as before).
+    large_document_max_bytes: int = int(os.environ.get("LARGE_DOCUMENT_MAX_BYTES", str(1024 * 1024 * 1024)))  # 1GB
+    # Large documents (text, issues, indexes) are deleted this long after their analysis finished, and the oldest
+    # first whenever all of them together would exceed LARGE_DOCUMENT_DISK_BYTES (0 → no limit for either).
+    large_document_ttl_seconds: int = int(os.environ.get("LARGE_DOCUMENT_TTL", str(24 * 3600)))
+    large_document_disk_bytes: int = int(os.environ.get("LARGE_DOCUMENT_DISK_BYTES", str(20 * 1024 * 1024 * 1024)))
+    # Admission control: pool tasks in flight at once (0 → pool size), and limits on admitted-but-unfinished
+    # requests / document bytes beyond which new requests get 429/503 with Retry-After (0 → no limit).
+    admission_max_inflight: int = int(os.environ.get("ADMISSION_MAX_INFLIGHT", "0"))
+    admission_max_queued_requests: int = int(os.environ.get("ADMISSION_MAX_QUEUED_REQUESTS", "64"))
+    admission_max_queued_bytes: int = int(os.environ.get("ADMISSION_MAX_QUEUED_BYTES", str(512 * 1024 * 1024)))
+    # Requests with one document up to this size use the interactive lane unless `priority=` says otherwise.
+    interactive_max_bytes: int = int(os.environ.get("INTERACTIVE_MAX_BYTES", str(64 * 1024)))
+    # Consecutive interactive grants after which a waiting bulk task gets a slot (prevents bulk starvation).
+    scheduler_interactive_burst: int = int(os.environ.get("SCHEDULER_INTERACTIVE_BURST", "4"))
     disable_grammar: bool = os.environ.get("DISABLE_GRAMMAR", "0") == "1"
-    # Cache up to this many decoded file contents for on-demand editor loads (avoids sending full text in bulk responses).
-    content_cache_items: int = int(os.environ.get("CONTENT_CACHE_ITEMS", "64"))
+    # "languagetool" (default) or "stub": a deterministic stand-in with configurable latency, for benchmarks
+    # and machines without Java.
+    grammar_backend: str = os.environ.get("GRAMMAR_BACKEND", "languagetool")
+    stub_grammar_latency_ms: float = float(os.environ.get("STUB_GRAMMAR_LATENCY_MS", "0"))
+    stub_grammar_per_kchar_ms: float = float(os.environ.get("STUB_GRAMMAR_PER_KCHAR_MS", "0"))
+    # Where decoded contents live: "memory" (per-process cache) or "sqlite" (STORAGE_ROOT/content.sqlite3,
+    # shared by all API processes; use with `uvicorn --workers N`).
+    content_store: str = os.environ.get("CONTENT_STORE", "memory")
+    # Decoded file contents kept for on-demand editor loads (avoids sending full text in bulk responses).
+    # Budgeted by compressed bytes; CONTENT_CACHE_ITEMS optionally also caps the entry count (0 → no cap).
+    content_cache_items: int = int(os.environ.get("CONTENT_CACHE_ITEMS", "0"))
+    content_cache_bytes: int = int(os.environ.get("CONTENT_CACHE_BYTES", str(64 * 1024 * 1024)))
+    content_cache_ttl_seconds: int = int(os.environ.get("CONTENT_CACHE_TTL", str(24 * 3600)))  # 0 → never expire
+    # Spill evicted entries to STORAGE_ROOT/content_cache instead of dropping them. CONTENT_CACHE_DISK_BYTES caps the
+    # spill directory, and with CONTENT_STORE=sqlite the database's payloads.
+    content_cache_spill: bool = os.environ.get("CONTENT_CACHE_SPILL", "1") == "1"
+    content_cache_disk_bytes: int = int(os.environ.get("CONTENT_CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))
+    # Built offset indexes kept per process for windowed /file-content and /file-issues requests.
+    window_index_items: int = int(os.environ.get("WINDOW_INDEX_ITEMS", "16"))
+    window_max_chars: int = int(os.environ.get("WINDOW_MAX_CHARS", str(256 * 1024)))
+    window_max_issues: int = int(os.environ.get("WINDOW_MAX_ISSUES", "1000"))
+    # Pre-flight plausibility check: reject binary/garbage text before spending a full analysis on it.
+    preflight_enabled: bool = os.environ.get("PREFLIGHT", "1") == "1"
+    preflight_sample_chars: int = int(os.environ.get("PREFLIGHT_SAMPLE_CHARS", "8192"))
+    preflight_max_control_ratio: float = float(os.environ.get("PREFLIGHT_MAX_CONTROL_RATIO", "0.02"))
+    preflight_min_letter_ratio: float = float(os.environ.get("PREFLIGHT_MIN_LETTER_RATIO", "0.5"))
+    preflight_min_dictionary_hit_rate: float = float(os.environ.get("PREFLIGHT_MIN_DICTIONARY_HIT_RATE", "0.3"))
+    # Abort a document once issues per token exceed this (after MIN_TOKENS have been checked); 0 disables.
+    max_issue_density: float = float(os.environ.get("MAX_ISSUE_DENSITY", "0.5"))
+    issue_density_min_tokens: int = int(os.environ.get("ISSUE_DENSITY_MIN_TOKENS", "200"))
+    # `profile=true` requests (stack sampler + tracemalloc in the worker) are refused unless PROFILING=1.
+    profiling_enabled: bool = os.environ.get("PROFILING", "0") == "1"
+    profile_interval_ms: float = float(os.environ.get("PROFILE_INTERVAL_MS", "2"))
+    profile_top_functions: int = int(os.environ.get("PROFILE_TOP_FUNCTIONS", "25"))
+    # Also write STORAGE_ROOT/profiles/*.folded (collapsed stacks for flamegraph.pl / speedscope).
+    profile_collapsed_stacks: bool = os.environ.get("PROFILE_COLLAPSED_STACKS", "1") == "1"
+    # JSON `/analyze` bodies larger than this (or chunked) are parsed incrementally, each document queued as soon
+    # as it has arrived, instead of being buffered and validated whole.
+    stream_json_min_bytes: int = int(os.environ.get("STREAM_JSON_MIN_BYTES", str(1024 * 1024)))
+    # Identical documents (same text and settings) in flight at once share one pool task instead of each running.
+    coalesce_inflight: bool = os.environ.get("COALESCE_INFLIGHT", "1") == "1"
+    # Default time budget per request in seconds (0 = none); clients may ask for up to REQUEST_TIMEOUT_MAX_SECONDS
+    # with `?timeout=`. Past it, documents stop between chunks and come back marked partial.
+    request_timeout_seconds: float = float(os.environ.get("REQUEST_TIMEOUT_SECONDS", "0"))
+    request_timeout_max_seconds: float = float(os.environ.get("REQUEST_TIMEOUT_MAX_SECONDS", "300"))
+    # Absolute time.time() by which the worker stops a document (set per request, never from the environment).
+    deadline: float = 0.0
+    # `export=true` requests save their results under STORAGE_ROOT/exports for `GET /exports/{id}`; kept this long.
+    export_ttl_seconds: int = int(os.environ.get("EXPORT_TTL", str(24 * 3600)))  # 0 → never expire
+    # `/ws/live`: analyze a revision once no newer one has arrived for this long.
+    live_debounce_ms: float = float(os.environ.get("LIVE_DEBOUNCE_MS", "300"))
+    # host:port the coordinator accepts worker nodes on (`python -m backend.cluster.node`); empty = local pool only.
+    cluster_listen: str = os.environ.get("CLUSTER_LISTEN", "")
+    # Shared secret authenticating coordinator <-> node messages; required whenever CLUSTER_LISTEN is set.
+    cluster_secret: str = os.environ.get("CLUSTER_SECRET", "")
+    cluster_heartbeat_seconds: float = float(os.environ.get("CLUSTER_HEARTBEAT_SECONDS", "2"))
+    # A node silent this long is dropped and its in-flight tasks are requeued on the others.
+    cluster_node_timeout: float = float(os.environ.get("CLUSTER_NODE_TIMEOUT", "10"))
+    cluster_max_attempts: int = int(os.environ.get("CLUSTER_MAX_ATTEMPTS", "3"))
+    cluster_max_frame_mb: int = int(os.environ.get("CLUSTER_MAX_FRAME_MB", "256"))
 
 
 def load_settings() -> Settings:
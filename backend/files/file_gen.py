@@ -1,6 +1,6 @@
+import argparse
 import os
 import random
-from docx import Document
 
 # CONFIG
 OUTPUT_DIR = "generated_files_with_errors"
@@ -8,8 +8,6 @@ TOTAL_FILES = 1000
 WORDS_PER_FILE = 2000
 FILE_TYPES = ["txt", "md", "docx"]
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
 # Base sentence templates (grammatically correct)
 BASE_SENTENCES = [
     "Technology has changed the way people communicate with each other.",
@@ -41,15 +39,15 @@ SPELLING_ERRORS = {
     "efficiently": "efficently"
 }
 
-def introduce_spelling_errors(text, rate=0.15):
+def introduce_spelling_errors(text, rate=0.15, rng=random):
     words = text.split()
     for i in range(len(words)):
         clean_word = words[i].lower().strip(".,")
-        if clean_word in SPELLING_ERRORS and random.random() < rate:
+        if clean_word in SPELLING_ERRORS and rng.random() < rate:
             words[i] = SPELLING_ERRORS[clean_word]
     return " ".join(words)
 
-def introduce_grammar_errors(text):
+def introduce_grammar_errors(text, rate=0.3, rng=random):
     errors = [
         lambda s: s.replace(" is ", " are ", 1),
         lambda s: s.replace(" are ", " is ", 1),
@@ -57,36 +55,56 @@ def introduce_grammar_errors(text):
         lambda s: s.replace(".", "", 1),
         lambda s: s.replace(" the ", " teh ", 1),
     ]
-    if random.random() < 0.3:
-        text = random.choice(errors)(text)
+    if rng.random() < rate:
+        text = rng.choice(errors)(text)
     return text
 
-def generate_error_text(word_count):
+def generate_error_text(word_count, spelling_rate=0.15, grammar_rate=0.3, rng=random):
     content = []
-    while len(" ".join(content).split()) < word_count:
-        sentence = random.choice(BASE_SENTENCES)
-        sentence = introduce_spelling_errors(sentence)
-        sentence = introduce_grammar_errors(sentence)
+    words = 0
+    while words < word_count:
+        sentence = rng.choice(BASE_SENTENCES)
+        sentence = introduce_spelling_errors(sentence, spelling_rate, rng)
+        sentence = introduce_grammar_errors(sentence, grammar_rate, rng)
         content.append(sentence)
+        words += len(sentence.split())
     return " ".join(content)
 
-for i in range(1, TOTAL_FILES + 1):
-    file_type = random.choice(FILE_TYPES)
-    text = generate_error_text(WORDS_PER_FILE)
-    filename = f"file_{i}.{file_type}"
-    path = os.path.join(OUTPUT_DIR, filename)
+def write_docx(path, text, words_per_paragraph=120):
+    from docx import Document  # optional; only needed for .docx output
+
+    doc = Document()
+    words = text.split()
+    for j in range(0, len(words), words_per_paragraph):
+        doc.add_paragraph(" ".join(words[j:j+words_per_paragraph]))
+    doc.save(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate files with spelling & grammar mistakes.")
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--count", type=int, default=TOTAL_FILES)
+    parser.add_argument("--words", type=int, default=WORDS_PER_FILE)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible corpus")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    for i in range(1, args.count + 1):
+        file_type = rng.choice(FILE_TYPES)
+        text = generate_error_text(args.words, rng=rng)
+        filename = f"file_{i}.{file_type}"
+        path = os.path.join(args.out, filename)
+
+        if file_type in ["txt", "md"]:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
 
-    if file_type in ["txt", "md"]:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(text)
+        elif file_type == "docx":
+            write_docx(path, text)
 
-    elif file_type == "docx":
-        doc = Document()
-        words = text.split()
-        for j in range(0, len(words), 120):
-            doc.add_paragraph(" ".join(words[j:j+120]))
-        doc.save(path)
+        print(f"Created: {filename}")
 
-    print(f"Created: {filename}")
+    print(f"\n✅ {args.count} files with spelling & grammar mistakes generated successfully!")
 
-print("\n✅ 1000 files with spelling & grammar mistakes generated successfully!")
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from typing import List, Optional, Literal
+from typing import Annotated, List, Optional, Literal, Union
 from pydantic import BaseModel, Field
 
 
@@ -7,11 +7,34 @@ class Document(BaseModel):
     content: str = Field(..., min_length=1)
 
 
-class AnalyzeRequest(BaseModel):
-    documents: List[Document] = Field(..., min_length=1)
-    chunk_size: Optional[int] = Field(None, gt=256, lt=64_000)
+class AnalyzeOptions(BaseModel):
+    """Everything in an `/analyze` JSON body except `documents`."""
+
+    chunk_size: Optional[Union[Annotated[int, Field(gt=256, lt=64_000)], Literal["auto"]]] = None
     chunk_overlap: Optional[int] = Field(None, ge=0, lt=8_000)
     language: Optional[str] = None
+    # Named custom dictionary (see `/dictionaries/{name}`) and extra words accepted for this request only.
+    dictionary: Optional[str] = Field(None, pattern=r"^[A-Za-z0-9_-]{1,64}$")
+    custom_words: Optional[List[str]] = Field(None, max_length=10_000)
+
+
+class AnalyzeRequest(AnalyzeOptions):
+    documents: List[Document] = Field(..., min_length=1)
+
+
+class LiveRevision(BaseModel):
+    """One editor revision sent over `/ws/live`; only the latest one is analyzed."""
+
+    revision: int = Field(..., ge=0)
+    text: str
+    language: Optional[str] = None
+    dictionary: Optional[str] = Field(None, pattern=r"^[A-Za-z0-9_-]{1,64}$")
+    custom_words: Optional[List[str]] = Field(None, max_length=10_000)
+
+
+class DictionaryUpdate(BaseModel):
+    add: List[str] = Field(default_factory=list, max_length=100_000)
+    remove: List[str] = Field(default_factory=list, max_length=100_000)
 
 
 class Position(BaseModel):
@@ -0,0 +1,117 @@
+"""
+Cooperative cancellation of pool tasks.
+
+`ProcessPoolExecutor` cannot stop a task once a worker has picked it up, so an abandoned
+document would otherwise run to the end. The pool owns a block of shared one-byte flags
+that every worker inherits; each submitted task is given one, and when the coroutine
+awaiting it is cancelled the pool raises the flag. The document loop checks
+`requested()` between chunks and stops, cancelling its queued chunks, so the worker
+is free again after at most one chunk per thread.
+
+Next to each flag is a deadline slot. A task shared by several requests (see
+`coalescing`) is submitted with the first request's deadline; a later request with a
+later deadline pushes it through `DeadlineHandle.extend`, and the worker reads it via
+`deadline()` at every check.
+"""
+import math
+import multiprocessing
+import threading
+from concurrent.futures import Future
+from typing import List, Optional
+
+# In workers: the inherited flags and deadlines (see `install`) and the slot of the task being run.
+_flags = None
+_deadlines = None
+_current = threading.local()
+
+
+def install(flags, deadlines=None) -> None:
+    """Pool initializer hook: remember the shared flags (and deadline slots) in this worker."""
+    global _flags, _deadlines
+    _flags = flags
+    _deadlines = deadlines
+
+
+def requested() -> bool:
+    """Whether the task this worker is running has been abandoned by its caller."""
+    slot = getattr(_current, "slot", -1)
+    return _flags is not None and slot >= 0 and _flags[slot] != 0
+
+
+def deadline(submitted: float) -> float:
+    """The running task's deadline: `submitted` (its settings' deadline) unless the caller has since moved it."""
+    slot = getattr(_current, "slot", -1)
+    if _deadlines is None or slot < 0 or _deadlines[slot] == 0:
+        return submitted
+    moved = _deadlines[slot]
+    return 0.0 if math.isinf(moved) else moved
+
+
+def run_with_slot(slot: int, fn, *args):
+    _current.slot = slot
+    try:
+        return fn(*args)
+    finally:
+        _current.slot = -1
+
+
+class CancelFlags:
+    """Parent side: hands out flag slots to submitted tasks (thread-safe; slots come back when tasks finish)."""
+
+    def __init__(self, size: int) -> None:
+        self.array = multiprocessing.RawArray("b", size)
+        # 0: the task's own deadline applies; otherwise the moved deadline (inf: none).
+        self.deadlines = multiprocessing.RawArray("d", size)
+        self._free: List[int] = list(range(size - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[int]:
+        """A cleared slot, or None when all are in use (the task then runs uncancellable)."""
+        with self._lock:
+            if not self._free:
+                return None
+            slot = self._free.pop()
+        self.array[slot] = 0
+        self.deadlines[slot] = 0.0
+        return slot
+
+    def cancel(self, slot: int, future: Future) -> None:
+        """Raise the flag of `slot` unless `future` (its task) already finished and gave the slot back."""
+        with self._lock:
+            if not future.done():
+                self.array[slot] = 1
+
+    def set_deadline(self, slot: int, future: Future, deadline: float) -> None:
+        """Move the deadline of `slot` (0 = none) unless `future` already finished and gave the slot back."""
+        with self._lock:
+            if not future.done():
+                self.deadlines[slot] = deadline or math.inf
+
+    def release(self, slot: int) -> None:
+        with self._lock:
+            self._free.append(slot)
+
+
+class DeadlineHandle:
+    """
+    Parent side: the deadline (absolute `time.time()`, 0 = none) of one task that may be moved later while it
+    is queued or running. Only ever extended.
+    """
+
+    def __init__(self, deadline: float) -> None:
+        self.deadline = deadline
+        self._target = None
+
+    def extend(self, deadline: float) -> None:
+        if not self.deadline:
+            return  # already unbounded
+        if deadline and deadline <= self.deadline:
+            return
+        self.deadline = deadline
+        if self._target is not None:
+            self._target[0].set_deadline(self._target[1], self._target[2], deadline)
+
+    def attach(self, flags: CancelFlags, slot: int, future: Future) -> None:
+        """Bind to the submitted task; its slot gets the current deadline and every later extension."""
+        self._target = (flags, slot, future)
+        flags.set_deadline(slot, future, self.deadline)
@@ -0,0 +1,98 @@
+"""
+Adaptive chunk sizing (`CHUNK_SIZE=auto`).
+
+Each worker process fits per-chunk cost as `overhead + per_char * chars` from the chunk
+timings it has already measured (LanguageTool round-trip, per-chunk setup, overlap
+re-checks), then picks the size that gives every usable thread one chunk while keeping
+the fixed overhead a small fraction of each chunk's work. Only time spent blocked on
+LanguageTool overlaps across chunk threads (spelling holds the GIL), so the number of
+usable threads is scaled by that share.
+"""
+import math
+from typing import Dict, Tuple
+
+# Priors used until a worker has timed a few chunks.
+PRIOR_OVERHEAD_S = 0.002
+PRIOR_PER_CHAR_S = 2e-6
+# Fixed per-chunk cost should stay below this share of a chunk's total cost.
+TARGET_OVERHEAD_FRACTION = 0.1
+_MIN_OBSERVATIONS = 4
+
+
+class ChunkCostModel:
+    """Exponentially decayed least-squares fit of chunk seconds against chunk length."""
+
+    def __init__(self, decay: float = 0.98) -> None:
+        self.decay = decay
+        self.weight = 0.0
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0.0
+        self.sum_blocking = 0.0
+
+    def observe(self, chars: int, seconds: float, blocking_seconds: float = 0.0) -> None:
+        """Record one chunk; `blocking_seconds` is the part spent waiting outside the GIL."""
+        d = self.decay
+        self.weight = self.weight * d + 1.0
+        self.sum_x = self.sum_x * d + chars
+        self.sum_y = self.sum_y * d + seconds
+        self.sum_xx = self.sum_xx * d + chars * chars
+        self.sum_xy = self.sum_xy * d + chars * seconds
+        self.sum_blocking = self.sum_blocking * d + blocking_seconds
+
+    def parallel_share(self) -> float:
+        """Fraction of chunk cost that can overlap with other chunk threads."""
+        if self.weight < _MIN_OBSERVATIONS or self.sum_y <= 0:
+            return 1.0
+        return min(1.0, self.sum_blocking / self.sum_y)
+
+    def estimate(self) -> Tuple[float, float]:
+        """(overhead seconds per chunk, seconds per character)."""
+        if self.weight < _MIN_OBSERVATIONS:
+            return PRIOR_OVERHEAD_S, PRIOR_PER_CHAR_S
+        w = self.weight
+        mean_x, mean_y = self.sum_x / w, self.sum_y / w
+        variance = self.sum_xx / w - mean_x * mean_x
+        if mean_x > 0 and variance > (0.1 * mean_x) ** 2:
+            per_char = (self.sum_xy / w - mean_x * mean_y) / variance
+            overhead = mean_y - per_char * mean_x
+            if per_char > 0 and overhead >= 0:
+                return overhead, per_char
+        # Too little spread in chunk sizes to separate the terms: keep the prior overhead.
+        overhead = min(PRIOR_OVERHEAD_S, mean_y)
+        per_char = (mean_y - overhead) / mean_x if mean_x > 0 else PRIOR_PER_CHAR_S
+        return overhead, max(per_char, 1e-9)
+
+
+def choose_chunk_size(
+    text_length: int,
+    threads: int,
+    pool_load: float,
+    overhead_s: float,
+    per_char_s: float,
+    min_size: int,
+    max_size: int,
+    parallel_share: float = 1.0,
+) -> Tuple[int, Dict]:
+    """
+    Pick a chunk size for one document.
+
+    `pool_load` is the share of the process pool that other documents were using when this
+    one was submitted: when it is busy there are no idle cores for intra-document
+    parallelism, so splitting only adds per-chunk overhead.
+    """
+    idle_threads = threads * max(0.0, 1.0 - pool_load)
+    parallelism = max(1, round(1 + (idle_threads - 1) * parallel_share))
+    overhead_floor = overhead_s * (1.0 - TARGET_OVERHEAD_FRACTION) / (TARGET_OVERHEAD_FRACTION * per_char_s)
+    per_thread = math.ceil(text_length / parallelism) if text_length else min_size
+    size = int(min(max_size, max(min_size, overhead_floor, per_thread)))
+    return size, {
+        "mode": "auto",
+        "parallelism": parallelism,
+        "pool_load": round(pool_load, 3),
+        "parallel_share": round(parallel_share, 3),
+        "overhead_ms": round(overhead_s * 1000.0, 3),
+        "per_kchar_ms": round(per_char_s * 1e6, 4),
+    }
+
+
+# One model per worker process; updated after every analyzed document.
+cost_model = ChunkCostModel()
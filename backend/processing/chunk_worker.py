@@ -1,10 +1,12 @@
 import re
-from typing import Any, Dict, List, Tuple
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from backend.services.grammar import check_text
-from backend.services.spell import SpellChecker
+from backend.services.spell import LexiconOverlay, SpellChecker, lexicon_language
 
-WORD_RE = re.compile(r"[A-Za-z][A-Za-z'-]*")
+# Letters of any script (not digits or "_"), with inner or trailing apostrophes and hyphens: "Größe", "l'été".
+WORD_RE = re.compile(r"[^\W\d_]+(?:['-]+[^\W\d_]*)*")
 HYPHEN_WHITELIST = {
     "long-term",
     "short-term",
@@ -33,6 +35,8 @@ SINGULAR_SUBJECTS = {"he", "she", "it", "cat", "dog", "student", "child"}
 BASE_VERBS = {"chase", "run", "walk", "talk", "wait", "plan"}
 ARTICLE_NOUNS = {"park", "zoo", "market", "office"}
 MASS_NOUNS = {"homework"}
+# Words between checks of `analyze_chunk(should_stop=...)`.
+_STOP_CHECK_TOKENS = 256
 
 
 def compute_line_offsets(text: str) -> List[int]:
@@ -137,28 +141,70 @@ def rule_based_grammar_checks(
     return issues
 
 
+class RuleSet:
+    """Language-specific checks around the lexicon: accepted hyphenations, known misspellings, grammar rules."""
+
+    __slots__ = ("name", "hyphen_whitelist", "common_misspellings", "grammar_checks")
+
+    def __init__(
+        self,
+        name: str,
+        hyphen_whitelist: frozenset = frozenset(),
+        common_misspellings: Optional[Dict[str, List[str]]] = None,
+        grammar_checks: Optional[Callable[[str, List[Tuple[str, int, int]], List[int]], List[Dict]]] = None,
+    ) -> None:
+        self.name = name
+        self.hyphen_whitelist = hyphen_whitelist
+        self.common_misspellings = common_misspellings or {}
+        self.grammar_checks = grammar_checks
+
+
+ENGLISH_RULES = RuleSet("en", frozenset(HYPHEN_WHITELIST), COMMON_MISSPELLINGS, rule_based_grammar_checks)
+# Languages without hand-written rules rely on the lexicon and LanguageTool alone.
+NO_RULES = RuleSet("none")
+RULE_SETS = {"en": ENGLISH_RULES}
+
+
+def rules_for(language: str) -> RuleSet:
+    return RULE_SETS.get(lexicon_language(language), NO_RULES)
+
+
 def analyze_chunk(
     chunk_text: str,
     start_offset: int,
     line_offsets: List[int],
-    spell_checker: SpellChecker,
+    spell_checker: SpellChecker | LexiconOverlay,
     grammar_tool: Any | None,
+    timings: Dict[str, float] | None = None,
+    rules: RuleSet = ENGLISH_RULES,
+    should_stop: Optional[Callable[[], bool]] = None,
 ) -> List[Dict]:
+    """
+    Spelling, LanguageTool and rule checks for one chunk; per-stage seconds go into `timings`. Once
+    `should_stop()` is true (checked every `_STOP_CHECK_TOKENS` words and before LanguageTool) the chunk
+    returns what it has: its document has stopped and will not use the result.
+    """
+    hyphen_whitelist, common_misspellings = rules.hyphen_whitelist, rules.common_misspellings
     issues: List[Dict] = []
     token_spans: List[Tuple[str, int, int]] = []
+    clock = time.perf_counter
+    started = clock()
+    cpu_started = time.thread_time()
 
     for match in WORD_RE.finditer(chunk_text):
         word = match.group()
         abs_start = start_offset + match.start()
         abs_end = start_offset + match.end()
         token_spans.append((word, abs_start, abs_end))
+        if should_stop is not None and len(token_spans) % _STOP_CHECK_TOKENS == 0 and should_stop():
+            return issues
         lower_word = word.lower()
 
-        if lower_word in HYPHEN_WHITELIST:
+        if lower_word in hyphen_whitelist:
             continue
 
-        if lower_word in COMMON_MISSPELLINGS:
-            suggestions = COMMON_MISSPELLINGS[lower_word]
+        if lower_word in common_misspellings:
+            suggestions = common_misspellings[lower_word]
         elif not spell_checker.is_correct(word):
             suggestions = spell_checker.suggest(word)
         else:
@@ -181,7 +227,12 @@ def analyze_chunk(
             }
         )
 
+    spelling_done = clock()
+    spelling_cpu = time.thread_time() - cpu_started
+    if should_stop is not None and should_stop():
+        return issues
     if grammar_tool:
+        custom_words = spell_checker.added if isinstance(spell_checker, LexiconOverlay) else None
         matches = check_text(grammar_tool, chunk_text)
         for match in matches:
             abs_start = start_offset + match.offset
@@ -197,6 +248,8 @@ def analyze_chunk(
             except Exception:
                 category_id = ""
             issue_type = "spelling" if ("MORFOLOGIK" in rule_id or "SPELL" in rule_id or category_id == "TYPOS") else "grammar"
+            if issue_type == "spelling" and custom_words and original.lower() in custom_words:
+                continue  # LanguageTool does not know the custom dictionary; its words are not misspellings
             severity = "suggestion" if issue_type == "grammar" and category_id in {"STYLE", "TYPOGRAPHY"} else "error"
             repls = getattr(match, "replacements", [])
             if repls and hasattr(repls[0], "value"):
@@ -220,5 +273,14 @@ def analyze_chunk(
                 }
             )
 
-    issues.extend(rule_based_grammar_checks(chunk_text, token_spans, line_offsets))
+    grammar_done = clock()
+    grammar_cpu = time.thread_time() - cpu_started - spelling_cpu
+    if rules.grammar_checks is not None:
+        issues.extend(rules.grammar_checks(chunk_text, token_spans, line_offsets))
+    if timings is not None:
+        timings["spelling"] = spelling_done - started
+        timings["grammar"] = grammar_done - spelling_done
+        timings["rules"] = clock() - grammar_done
+        # Own CPU plus time blocked on LanguageTool, excluding waits for the GIL held by sibling chunks.
+        timings["chunk_cost"] = time.thread_time() - cpu_started - grammar_cpu + timings["grammar"]
     return issues
@@ -1,12 +1,31 @@
 import os
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List, Tuple
+from bisect import bisect_left
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from backend.config import Settings
-from backend.processing.chunk_worker import analyze_chunk, compute_line_offsets, WORD_RE, offset_to_position
-from backend.services.grammar import GrammarNotAvailable, get_language_tool
-from backend.services.spell import get_spell_checker
+from backend.processing import cancellation
+from backend.processing.chunk_sizing import choose_chunk_size, cost_model
+from backend.processing.chunk_worker import (
+    analyze_chunk,
+    compute_line_offsets,
+    offset_to_position,
+    rules_for,
+    WORD_RE,
+)
+from backend.processing.results import DocumentResult, IssueColumns, TokenColumns
+from backend.services.custom_dictionaries import apply_overlay
+from backend.services.grammar import GrammarNotAvailable, get_language_tool, get_stub_language_tool
+from backend.services.language_models import registry
+from backend.services.preflight import MIN_LEXICON_SIZE, PlausibilityReport, assess_text
+from backend.services.spell import SpellChecker, dictionary_path_for, get_spell_checker
+
+
+# How often a document waiting on a chunk checks its cancellation flag.
+_POLL_SECONDS = 0.05
 
 
 def chunk_text(text: str, size: int, overlap: int) -> List[Tuple[int, str]]:
@@ -46,56 +65,280 @@ def deduplicate_issues(issues: List[Dict]) -> List[Dict]:
     return deduped
 
 
-def collect_tokens(text: str, line_offsets: List[int]) -> List[Dict]:
-    tokens: List[Dict] = []
+def collect_tokens(text: str, line_offsets: List[int]) -> TokenColumns:
+    tokens = TokenColumns()
+    append = tokens.append
     for match in WORD_RE.finditer(text):
         abs_start = match.start()
-        abs_end = match.end()
         line, col = offset_to_position(abs_start, line_offsets)
-        tokens.append(
-            {
-                "text": match.group(),
-                "position": {
-                    "start": abs_start,
-                    "end": abs_end,
-                    "line": line,
-                    "col": col,
-                },
-            }
-        )
+        append(match.group(), abs_start, match.end(), line, col)
     return tokens
 
 
-def process_document(doc_id: str, text: str, settings: Settings) -> Dict:
-    spell_checker = get_spell_checker(settings.dictionary_path)
+def await_chunk(future: Future, deadline: float) -> Optional[str]:
+    """Wait for one chunk; returns "cancelled" or "deadline" if the document should stop before it finishes."""
+    while True:
+        timeout = _POLL_SECONDS
+        current = cancellation.deadline(deadline)  # a shared task's deadline may be moved while it runs
+        if current:
+            remaining = current - time.time()
+            if remaining <= 0:
+                return "deadline"
+            timeout = min(timeout, remaining)
+        try:
+            future.exception(timeout=timeout)  # raised chunk errors surface from `result()` as before
+        except FuturesTimeout:
+            pass
+        # Nobody is waiting for this document any more; free the worker for the next one.
+        if cancellation.requested():
+            return "cancelled"
+        if future.done():
+            return None
+
+
+def unanalyzed_result(doc_id: str, text: str, reason: str) -> DocumentResult:
+    """Result for a document stopped (by deadline or cancellation) before any chunk was checked."""
+    partial = {"reason": reason, "chunks_completed": 0, "chunks_total": None, "checked_chars": 0, "checked_tokens": 0}
+    return DocumentResult(
+        doc_id,
+        stats={
+            "duration_ms": 0,
+            "bytes": len(text.encode("utf-8")),
+            "word_count": 0,
+            "spelling_issues": 0,
+            "grammar_issues": 0,
+            "partial": partial,
+        },
+        content=text,
+        error=_stop_reason(None, partial),
+    )
+
+
+def _rejected_result(doc_id: str, text: str, report: PlausibilityReport, lexicon: Dict) -> DocumentResult:
+    return DocumentResult(
+        doc_id,
+        stats={
+            "duration_ms": 0,
+            "bytes": len(text.encode("utf-8")),
+            "word_count": 0,
+            "spelling_issues": 0,
+            "grammar_issues": 0,
+            "lexicon": lexicon,
+            "preflight": report.as_dict(),
+        },
+        content=text,
+        error=f"preflight_rejected: {report.reason}",
+    )
+
+
+def _configure_registry(settings: Settings) -> None:
+    budget = settings.language_model_budget_mb * 1024 * 1024
+    if registry.budget_bytes != budget:
+        registry.configure(budget)
+
+
+def _load_spell_checker(settings: Settings) -> SpellChecker:
+    path = dictionary_path_for(
+        settings.language, settings.dictionary_language, settings.dictionary_path, settings.dictionary_paths
+    )
+    return get_spell_checker(path, language=settings.language)
+
+
+def _load_grammar_tool(settings: Settings) -> Any:
+    if settings.grammar_backend == "stub":
+        return get_stub_language_tool(
+            settings.language,
+            latency_ms=settings.stub_grammar_latency_ms,
+            per_kchar_ms=settings.stub_grammar_per_kchar_ms,
+        )
+    return get_language_tool(
+        settings.language,
+        path=settings.language_tool_path,
+        server=settings.language_tool_server,
+        footprint_bytes=settings.language_tool_model_mb * 1024 * 1024,
+    )
+
+
+def preload_languages(settings: Settings) -> List[str]:
+    """LANGUAGE followed by the PRELOAD_LANGUAGES not already listed."""
+    languages = [settings.language]
+    for language in settings.preload_languages.split(","):
+        language = language.strip()
+        if language and language not in languages:
+            languages.append(language)
+    return languages
+
+
+def warm_caches(settings: Settings, grammar: bool = True) -> None:
+    """Build this process's spell checkers (and grammar tools) for the preloaded languages ahead of the first document."""
+    _configure_registry(settings)
+    for language in preload_languages(settings):
+        language_settings = replace(settings, language=language)
+        _load_spell_checker(language_settings)
+        if grammar and not settings.disable_grammar:
+            try:
+                _load_grammar_tool(language_settings)
+            except GrammarNotAvailable:
+                pass
+
+
+def _stage_ms(stages: Dict[str, float]) -> Dict[str, float]:
+    return {name: round(seconds * 1000.0, 3) for name, seconds in stages.items()}
+
+
+def process_document(doc_id: str, text: str, settings: Settings, pool_load: float = 0.0) -> DocumentResult:
+    """Analyze one document; `pool_load` (share of the pool busy with other documents) guides auto chunking."""
+    _configure_registry(settings)
+    # The lexicon and grammar tool this document uses cannot be evicted until it is done.
+    with registry.hold():
+        return _analyze_document(doc_id, text, settings, pool_load)
+
+
+def _analyze_document(doc_id: str, text: str, settings: Settings, pool_load: float) -> DocumentResult:
+    clock = time.perf_counter
+    entered = clock()
+    stages: Dict[str, float] = {}
+    base_checker = _load_spell_checker(settings)
+    # Custom words are a small overlay on the shared base lexicon, rebuilt only when its file changes.
+    spell_checker, lexicon = apply_overlay(
+        base_checker, settings.storage_root, settings.custom_dictionary, settings.custom_words
+    )
+    stages["lexicon"] = clock() - entered  # ~0 once the worker has the checker cached
+    preflight = None
+    if settings.preflight_enabled:
+        mark = clock()
+        lexicon_ok = len(base_checker.dictionary) >= MIN_LEXICON_SIZE
+        preflight = assess_text(
+            text,
+            is_word=spell_checker.is_correct if lexicon_ok else None,
+            sample_chars=settings.preflight_sample_chars,
+            max_control_ratio=settings.preflight_max_control_ratio,
+            min_letter_ratio=settings.preflight_min_letter_ratio,
+            min_dictionary_hit_rate=settings.preflight_min_dictionary_hit_rate,
+        )
+        stages["preflight"] = clock() - mark
+        if not preflight.plausible:
+            result = _rejected_result(doc_id, text, preflight, lexicon)
+            result.stats["stage_ms"] = _stage_ms(stages)
+            return result
+
+    deadline = cancellation.deadline(settings.deadline)
+    if deadline and time.time() >= deadline:
+        return unanalyzed_result(doc_id, text, "deadline")  # spent its whole budget in the queue
+
     grammar_enabled = not settings.disable_grammar
+    mark = clock()
     try:
-        grammar_tool = get_language_tool(settings.language, path=settings.language_tool_path) if grammar_enabled else None
+        grammar_tool = _load_grammar_tool(settings) if grammar_enabled else None
     except GrammarNotAvailable:
         grammar_tool = None
         grammar_enabled = False
 
+    stages["grammar_load"] = clock() - mark
     started = time.time()
+    mark = clock()
     line_offsets = compute_line_offsets(text)
     tokens = collect_tokens(text, line_offsets)
+    stages["tokenize"], mark = clock() - mark, clock()
 
+    max_workers = settings.thread_workers or min(32, max(4, (os.cpu_count() or 4)))
     chunk_size = settings.chunk_size
+    chunk_plan = None
+    if chunk_size <= 0:  # CHUNK_SIZE=auto
+        overhead_s, per_char_s = cost_model.estimate()
+        chunk_size, chunk_plan = choose_chunk_size(
+            len(text),
+            max_workers,
+            pool_load,
+            overhead_s,
+            per_char_s,
+            settings.chunk_size_min,
+            settings.chunk_size_max,
+            cost_model.parallel_share(),
+        )
     overlap = min(settings.chunk_overlap, chunk_size // 4)
     chunks = chunk_text(text, chunk_size, overlap)
+    stages["chunking"], mark = clock() - mark, clock()
 
-    max_workers = settings.thread_workers or min(32, max(4, (os.cpu_count() or 4)))
     issues: List[Dict] = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    # Distinct (start, end) spans so far: chunk overlaps report some issues twice, and `deduplicate_issues`
+    # keeps one per span, so this is the count the density limit is measured against.
+    issue_spans: Set[Tuple[int, int]] = set()
+    rules = rules_for(settings.language)
+    token_starts = tokens.start
+    density_limit = settings.max_issue_density
+    breaker = None
+    stopped = None  # "cancelled" or "deadline" when the loop gives up early
+    completed = 0
+    chunk_timings: List[Dict[str, float]] = [{} for _ in chunks]
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
         futures = [
             executor.submit(
-                analyze_chunk, chunk_text_part, start_offset, line_offsets, spell_checker, grammar_tool
+                analyze_chunk,
+                chunk_text_part,
+                start_offset,
+                line_offsets,
+                spell_checker,
+                grammar_tool,
+                timings,
+                rules,
+                stop.is_set,
             )
-            for start_offset, chunk_text_part in chunks
+            for (start_offset, chunk_text_part), timings in zip(chunks, chunk_timings)
         ]
-        for future in futures:
-            issues.extend(future.result())
+        for idx, future in enumerate(futures):
+            stopped = await_chunk(future, settings.deadline)
+            if stopped:
+                break
+            chunk_issues = future.result()
+            issues.extend(chunk_issues)
+            completed = idx + 1
+            if density_limit <= 0 or idx == len(futures) - 1:
+                continue
+            issue_spans.update((i["position"]["start"], i["position"]["end"]) for i in chunk_issues)
+            start_offset, chunk_text_part = chunks[idx]
+            checked_tokens = bisect_left(token_starts, start_offset + len(chunk_text_part))
+            if checked_tokens < settings.issue_density_min_tokens:
+                continue
+            density = len(issue_spans) / checked_tokens
+            if density > density_limit:
+                # Issues clearly outnumber real content; stop paying for the rest of the document.
+                breaker = {
+                    "tripped": True,
+                    "issue_density": round(density, 4),
+                    "limit": density_limit,
+                    "chunks_checked": idx + 1,
+                    "tokens_checked": checked_tokens,
+                }
+                break
+    finally:
+        # Stopped early: drop queued chunks and tell running ones to return at their next check, then wait for
+        # them, so no chunk thread keeps the CPU (or the LanguageTool lock) into the worker's next document.
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
 
+    stages["analysis"], mark = clock() - mark, clock()
+    # Thread-seconds summed over the chunks whose results were used; with several threads these can exceed
+    # `analysis` wall time.
+    for (_, chunk_text_part), timings in zip(chunks[:completed], chunk_timings):
+        for name, seconds in timings.items():
+            stages[name] = stages.get(name, 0.0) + seconds
+        cost_model.observe(len(chunk_text_part), timings["chunk_cost"], timings["grammar"])
+
+    partial = None
+    if stopped:
+        checked_chars = chunks[completed - 1][0] + len(chunks[completed - 1][1]) if completed else 0
+        partial = {
+            "reason": stopped,
+            "chunks_completed": completed,
+            "chunks_total": len(chunks),
+            "checked_chars": checked_chars,
+            "checked_tokens": bisect_left(token_starts, checked_chars),
+        }
     issues = deduplicate_issues(issues)
+    stages["dedup"], mark = clock() - mark, clock()
     duration_ms = int((time.time() - started) * 1000)
     severity_counts = {"error": 0, "suggestion": 0}
     for i in issues:
@@ -106,26 +349,59 @@ def process_document(doc_id: str, text: str, settings: Settings) -> Dict:
             severity_counts[sev] += 1
     weighted_errors = severity_counts["error"] + 0.3 * severity_counts["suggestion"]
     weighted_accuracy = 100.0
-    if tokens:
-        weighted_accuracy = max(0.0, 100.0 - (weighted_errors / len(tokens)) * 100.0)
-
-    return {
-        "id": doc_id,
-        "tokens": tokens,
-        "issues": issues,
-        "stats": {
+    # A partial or breaker-stopped result is scored on the text it covers, not on the whole document.
+    if partial:
+        scored_tokens = partial["checked_tokens"]
+    elif breaker:
+        scored_tokens = breaker["tokens_checked"]
+    else:
+        scored_tokens = len(tokens)
+    if scored_tokens < len(tokens):
+        # Only the checked prefix is reported, so a half-checked document does not look clean.
+        tokens.truncate(scored_tokens)
+    if scored_tokens:
+        weighted_accuracy = max(0.0, 100.0 - (weighted_errors / scored_tokens) * 100.0)
+
+    packed_issues = IssueColumns.from_dicts(issues)
+    stages["pack"] = clock() - mark
+    stages["total"] = clock() - entered
+    return DocumentResult(
+        doc_id,
+        tokens=tokens,
+        issues=packed_issues,
+        stats={
             "duration_ms": duration_ms,
             "chunks": len(chunks),
+            "chunk_size": chunk_size,
+            "chunk_plan": chunk_plan,
             "thread_workers": max_workers,
             "bytes": len(text.encode("utf-8")),
-            "word_count": len(tokens),
-            "spelling_issues": sum(1 for i in issues if i["type"] == "spelling"),
-            "grammar_issues": sum(1 for i in issues if i["type"] == "grammar"),
+            "word_count": scored_tokens,
+            "spelling_issues": packed_issues.count("spelling"),
+            "grammar_issues": packed_issues.count("grammar"),
             "severity_counts": severity_counts,
             "weighted_errors": weighted_errors,
             "weighted_accuracy": weighted_accuracy,
             "grammar_enabled": grammar_enabled,
+            "language": settings.language,
+            "lexicon": lexicon,
+            "preflight": preflight.as_dict() if preflight else None,
+            "circuit_breaker": breaker,
+            "partial": partial,
+            "stage_ms": _stage_ms(stages),
         },
-        "content": text,
-        "error": None,
-    }
+        content=text,
+        error=_stop_reason(breaker, partial),
+    )
+
+
+def _stop_reason(breaker: Any, partial: Any) -> Any:
+    if partial and partial["reason"] == "cancelled":
+        return "cancelled: abandoned by the caller"
+    if partial:
+        if partial["chunks_total"] is None:
+            return "deadline_exceeded: not analyzed"
+        return f"deadline_exceeded: checked {partial['chunks_completed']} of {partial['chunks_total']} chunks"
+    if breaker:
+        return f"issue_density_exceeded: {breaker['issue_density']} issues/token"
+    return None
@@ -0,0 +1,628 @@
+"""
+Large-document mode: analysis of texts far beyond MAX_FILE_BYTES with bounded memory.
+
+The document is a UTF-8 file under STORAGE_ROOT/large/<content_id>/ and is read through
+a memory map. Chunks are cut lazily at line (else whitespace) boundaries, without
+overlap, and only a few pool-fulls of them exist at once. Each chunk's issues are
+written to `issues.jsonl` as soon as the chunk is done, in document order. Next to them go
+flat int64 index files the windowed endpoints bisect through their own memory maps:
+
+    text                 the document
+    lines.bin            char offset of every line start
+    chunks.bin           (byte offset, char offset) of every chunk start
+    issue_offsets.bin    byte offset of every issue line in issues.jsonl (+ end)
+    issue_starts.bin     char offset of every issue
+    issue_lines.bin      line of every issue
+    meta.json            totals and stats; written last, so its presence means "ready"
+
+Tokens are counted but not collected, so results carry stats and an empty `tokens`/
+`issues` payload; the viewer pages content and issues through `/file-content/{id}/range`
+and `/file-issues/{id}` as for any stored document.
+"""
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from backend.config import Settings
+from backend.processing.chunk_sizing import choose_chunk_size, cost_model
+from backend.processing.chunk_worker import WORD_RE, analyze_chunk, rules_for
+from backend.processing.file_worker import (
+    _configure_registry,
+    _load_grammar_tool,
+    _load_spell_checker,
+    _stage_ms,
+    _stop_reason,
+    await_chunk,
+    deduplicate_issues,
+    unanalyzed_result,
+)
+from backend.processing.results import DocumentResult, IssueColumns
+from backend.services.custom_dictionaries import apply_overlay
+from backend.services.grammar import GrammarNotAvailable
+from backend.services.language_models import registry
+from backend.services.preflight import MIN_LEXICON_SIZE, assess_text
+
+TEXT_NAME = "text"
+META_NAME = "meta.json"
+_CONTENT_ID_RE = re.compile(r"[0-9a-f]{32}")
+_SPACE = frozenset(b" \t\r\n\f\v")
+_SPACE_RE = re.compile(r"\s+")
+# Chunks submitted ahead of the one being written, per analysis thread.
+_LOOKAHEAD_PER_THREAD = 2
+# Issues read from issues.jsonl per read() when iterating them.
+_ISSUES_PER_READ = 4096
+
+
+def document_dir(storage_root: str, content_id: str) -> Optional[Path]:
+    """Directory of a large document; None for ids that are not plain hex (they come from URLs)."""
+    if not _CONTENT_ID_RE.fullmatch(content_id):
+        return None
+    return Path(storage_root) / "large" / content_id
+
+
+def _directory_size(directory: Path) -> int:
+    total = 0
+    for path in directory.iterdir():
+        try:
+            total += path.stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+def _stored_at(directory: Path) -> float:
+    """When the document was last analyzed (meta.json), else when it was stored (its directory)."""
+    try:
+        return (directory / META_NAME).stat().st_mtime
+    except OSError:
+        return directory.stat().st_mtime
+
+
+def remove_document(storage_root: str, content_id: str) -> None:
+    directory = document_dir(storage_root, content_id)
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def sweep_documents(storage_root: str, ttl_seconds: float = 0, max_bytes: int = 0, incoming: int = 0) -> int:
+    """
+    Delete documents stored longer than `ttl_seconds`, then the oldest analyzed ones until the rest plus
+    `incoming` bytes fit in `max_bytes` (0 disables either limit). Documents still being analyzed (no
+    meta.json yet) only ever expire. Returns how many were deleted.
+    """
+    root = Path(storage_root) / "large"
+    if not root.is_dir() or not (ttl_seconds or max_bytes):
+        return 0
+    cutoff = time.time() - ttl_seconds if ttl_seconds else None
+    entries = []
+    removed = 0
+    for directory in root.iterdir():
+        if not _CONTENT_ID_RE.fullmatch(directory.name):
+            continue
+        try:
+            stored_at = _stored_at(directory)
+        except OSError:
+            continue
+        if cutoff is not None and stored_at < cutoff:
+            shutil.rmtree(directory, ignore_errors=True)
+            removed += 1
+            continue
+        entries.append((stored_at, directory, _directory_size(directory)))
+    if max_bytes:
+        used = incoming + sum(size for _, _, size in entries)
+        for _, directory, size in sorted(entries, key=lambda entry: entry[0]):
+            if used <= max_bytes:
+                break
+            if not (directory / META_NAME).exists():
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            used -= size
+            removed += 1
+    return removed
+
+
+def store_document(
+    source: BinaryIO, storage_root: str, ttl_seconds: float = 0, max_bytes: int = 0, size: int = 0
+) -> Tuple[str, int]:
+    """
+    Copy an upload of `size` bytes into a new large-document directory in 1MB pieces, after sweeping expired
+    documents and making room for it within `max_bytes`; returns its content id and size.
+    """
+    sweep_documents(storage_root, ttl_seconds, max_bytes, size)
+    content_id = uuid4().hex
+    directory = document_dir(storage_root, content_id)
+    directory.mkdir(parents=True)
+    with open(directory / TEXT_NAME, "wb") as out:
+        shutil.copyfileobj(source, out, 1024 * 1024)
+        return content_id, out.tell()
+
+
+def iter_chunks(data: Any, size: int, slack: int) -> Iterator[Tuple[int, int]]:
+    """
+    Byte ranges covering `data` (bytes or mmap) of about `size` bytes each, extended by up to `slack`
+    bytes to the next newline, else to the next whitespace, and never inside a UTF-8 sequence.
+    """
+    total = len(data)
+    start = 0
+    while start < total:
+        end = min(total, start + size)
+        if end < total:
+            newline = data.find(b"\n", end, min(total, end + slack))
+            if newline != -1:
+                end = newline + 1
+            else:
+                limit = min(total, end + slack)
+                while end < limit and data[end] not in _SPACE:
+                    end += 1
+                while end < total and data[end] & 0xC0 == 0x80:  # hard cut: not inside a character
+                    end += 1
+        yield start, end
+        start = end
+
+
+def _analyze_large_chunk(
+    text: str,
+    char_start: int,
+    line_offsets: List[int],
+    line_base: int,
+    spell_checker: Any,
+    grammar_tool: Any,
+    timings: Dict[str, float],
+    rules: Any,
+    should_stop: Any = None,
+    lookback: int = 0,
+) -> Tuple[List[Dict], int]:
+    """
+    `analyze_chunk` against this chunk's line starts only; returns deduplicated issues and the word count.
+    `text` starts with `lookback` characters of the previous chunk (the overlap), which are not counted as words.
+    """
+    issues = analyze_chunk(text, char_start, line_offsets, spell_checker, grammar_tool, timings, rules, should_stop)
+    for issue in issues:
+        issue["position"]["line"] += line_base
+    words = sum(1 for _ in WORD_RE.finditer(text, lookback))
+    return deduplicate_issues(issues), words
+
+
+class _Writer:
+    """Appends issues and index entries for a document as chunks complete."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        (directory / META_NAME).unlink(missing_ok=True)  # readers see a rerun only once it is complete
+        self.issues = open(directory / "issues.jsonl", "wb")
+        self.index = {
+            name: open(directory / f"{name}.bin", "wb")
+            for name in ("lines", "chunks", "issue_offsets", "issue_starts", "issue_lines")
+        }
+        self.issue_count = 0
+
+    def append(self, name: str, values: array) -> None:
+        values.tofile(self.index[name])
+
+    def write_issues(self, issues: List[Dict]) -> None:
+        if not issues:
+            return
+        columns = IssueColumns.from_dicts(issues)
+        offsets = array("q")
+        position = self.issues.tell()
+        for line in columns.iter_json():
+            offsets.append(position)
+            encoded = line.encode("utf-8") + b"\n"
+            self.issues.write(encoded)
+            position += len(encoded)
+        self.append("issue_offsets", offsets)
+        self.append("issue_starts", columns.start)
+        self.append("issue_lines", columns.line)
+        self.issue_count += len(columns)
+
+    def close(self, meta: Dict, end_byte: int, end_char: int) -> None:
+        # End sentinels: a window or issue page never has to read past the checked part of the text.
+        self.append("chunks", array("q", [end_byte, end_char]))
+        self.append("issue_offsets", array("q", [self.issues.tell()]))
+        self.issues.close()
+        for handle in self.index.values():
+            handle.close()
+        partial = self.directory / (META_NAME + ".tmp")
+        partial.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(partial, self.directory / META_NAME)
+
+
+def _preflight_sample(data: Any, sample_bytes: int) -> str:
+    """Head, middle and tail of the file, like `assess_text` samples an in-memory text."""
+    total = len(data)
+    if total <= sample_bytes:
+        return bytes(data[:]).decode("utf-8", errors="replace")
+    window = sample_bytes // 3
+    mid = total // 2
+    parts = (data[:window], data[mid - window // 2 : mid + window // 2], data[total - window :])
+    return "\n".join(bytes(part).decode("utf-8", errors="ignore") for part in parts)
+
+
+def process_large_document(
+    doc_id: str, content_id: str, settings: Settings, pool_load: float = 0.0
+) -> DocumentResult:
+    """Pool task: analyze STORAGE_ROOT/large/<content_id>/text; issues and indexes are written next to it."""
+    _configure_registry(settings)
+    with registry.hold():
+        return _analyze_large_document(doc_id, content_id, settings, pool_load)
+
+
+def _analyze_large_document(doc_id: str, content_id: str, settings: Settings, pool_load: float) -> DocumentResult:
+    clock = time.perf_counter
+    entered = clock()
+    stages: Dict[str, float] = {}
+    directory = document_dir(settings.storage_root, content_id)
+    if directory is None:
+        raise ValueError(f"invalid content id {content_id!r}")
+    base_checker = _load_spell_checker(settings)
+    spell_checker, lexicon = apply_overlay(
+        base_checker, settings.storage_root, settings.custom_dictionary, settings.custom_words
+    )
+    stages["lexicon"] = clock() - entered
+    with open(directory / TEXT_NAME, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+    try:
+        base_stats: Dict[str, Any] = {
+            "duration_ms": 0,
+            "bytes": size,
+            "word_count": 0,
+            "spelling_issues": 0,
+            "grammar_issues": 0,
+            "lexicon": lexicon,
+        }
+        preflight = None
+        if settings.preflight_enabled:
+            mark = clock()
+            lexicon_ok = len(base_checker.dictionary) >= MIN_LEXICON_SIZE
+            sample = _preflight_sample(data, settings.preflight_sample_chars)
+            preflight = assess_text(
+                sample,
+                is_word=spell_checker.is_correct if lexicon_ok else None,
+                sample_chars=len(sample),
+                max_control_ratio=settings.preflight_max_control_ratio,
+                min_letter_ratio=settings.preflight_min_letter_ratio,
+                min_dictionary_hit_rate=settings.preflight_min_dictionary_hit_rate,
+            )
+            stages["preflight"] = clock() - mark
+            if not preflight.plausible:
+                base_stats.update(preflight=preflight.as_dict(), stage_ms=_stage_ms(stages))
+                return DocumentResult(doc_id, stats=base_stats, error=f"preflight_rejected: {preflight.reason}")
+        return _check_chunks(
+            doc_id, data, size, directory, settings, pool_load, spell_checker, base_stats, preflight, stages, entered
+        )
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def _check_chunks(
+    doc_id: str,
+    data: Any,
+    size: int,
+    directory: Path,
+    settings: Settings,
+    pool_load: float,
+    spell_checker: Any,
+    stats: Dict[str, Any],
+    preflight: Any,
+    stages: Dict[str, float],
+    entered: float,
+) -> DocumentResult:
+    clock = time.perf_counter
+    grammar_enabled = not settings.disable_grammar
+    mark = clock()
+    try:
+        grammar_tool = _load_grammar_tool(settings) if grammar_enabled else None
+    except GrammarNotAvailable:
+        grammar_tool = None
+        grammar_enabled = False
+    stages["grammar_load"] = clock() - mark
+    if settings.deadline and time.time() >= settings.deadline:
+        result = unanalyzed_result(doc_id, "", "deadline")  # spent its whole budget in the queue
+        result.stats["bytes"] = size
+        return result
+    started = time.time()
+    mark = clock()
+
+    max_workers = settings.thread_workers or min(32, max(4, (os.cpu_count() or 4)))
+    chunk_size = settings.chunk_size
+    chunk_plan = None
+    if chunk_size <= 0:  # CHUNK_SIZE=auto, sized from the byte length
+        overhead_s, per_char_s = cost_model.estimate()
+        chunk_size, chunk_plan = choose_chunk_size(
+            size,
+            max_workers,
+            pool_load,
+            overhead_s,
+            per_char_s,
+            settings.chunk_size_min,
+            settings.chunk_size_max,
+            cost_model.parallel_share(),
+        )
+    slack = max(settings.chunk_overlap, chunk_size // 4)
+    # As in `chunk_text`: each chunk is analyzed together with the last `overlap` characters of the one before,
+    # so matches crossing a boundary are found; issues at a seam are held until the next chunk is merged in.
+    overlap = min(settings.chunk_overlap, chunk_size // 4)
+    rules = rules_for(settings.language)
+    writer = _Writer(directory)
+    writer.append("lines", array("q", [0]))
+
+    char_pos = 0  # char offset of the next chunk
+    line_no = 1  # line of the next chunk's first character
+    line_start = 0  # char offset where that line starts
+    words = 0
+    severity_counts = {"error": 0, "suggestion": 0}
+    type_counts = {"spelling": 0, "grammar": 0}
+    completed = 0
+    checked_chars = 0
+    checked_bytes = 0
+    stopped = None
+    breaker = None
+    density_limit = settings.max_issue_density
+    pending: deque = deque()
+    held: List[Dict] = []  # issues starting in the overlap the next chunk re-reads
+    tail = ""  # end of the last submitted chunk's text, prepended to the next one
+    tail_line_start, tail_line = 0, 1  # start and number of the line `tail` begins in
+    chunks = iter_chunks(data, chunk_size, slack)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _submit() -> bool:
+        nonlocal char_pos, line_no, line_start, tail, tail_line_start, tail_line
+        for byte_start, byte_end in chunks:
+            text = bytes(data[byte_start:byte_end]).decode("utf-8", errors="replace")
+            # Line starts inside this chunk; the first entry is the start of the line the chunk begins in.
+            offsets = [line_start]
+            find = text.find
+            idx = find("\n")
+            while idx != -1:
+                offsets.append(char_pos + idx + 1)
+                idx = find("\n", idx + 1)
+            # The analyzed text also covers the previous chunk's tail, so its line starts come first.
+            tail_start = char_pos - len(tail)
+            analyzed_offsets = [tail_line_start]
+            idx = tail.find("\n")
+            while idx != -1:
+                analyzed_offsets.append(tail_start + idx + 1)
+                idx = tail.find("\n", idx + 1)
+            analyzed_offsets.extend(offsets[1:])
+            timings: Dict[str, float] = {}
+            future = executor.submit(
+                _analyze_large_chunk,
+                tail + text,
+                tail_start,
+                analyzed_offsets,
+                tail_line - 1,
+                spell_checker,
+                grammar_tool,
+                timings,
+                rules,
+                stop.is_set,
+                len(tail),
+            )
+            # The next chunk re-reads from the first word start in the last `overlap` characters, so it never
+            # sees the back half of a word as a word of its own.
+            cut = len(text) - min(overlap, len(text))
+            if cut:
+                space = _SPACE_RE.search(text, cut)
+                cut = space.end() if space else len(text)
+            seam = char_pos + cut
+            pending.append(
+                (future, byte_start, byte_end, char_pos, len(text), array("q", offsets[1:]), timings, seam)
+            )
+            tail = text[cut:]
+            line = bisect_right(offsets, seam) - 1
+            tail_line_start, tail_line = offsets[line], line_no + line
+            char_pos += len(text)
+            line_no += len(offsets) - 1
+            line_start = offsets[-1]
+            return True
+        return False
+
+    def _write(issues: List[Dict]) -> None:
+        writer.write_issues(issues)
+        for issue in issues:
+            severity = issue.get("severity", "error")
+            severity_counts[severity if severity in severity_counts else "suggestion"] += 1
+            type_counts[issue["type"]] = type_counts.get(issue["type"], 0) + 1
+
+    try:
+        for _ in range(max_workers * _LOOKAHEAD_PER_THREAD):
+            if not _submit():
+                break
+        while pending:
+            future, byte_start, byte_end, chunk_char_start, chunk_chars, new_lines, timings, seam = pending[0]
+            stopped = await_chunk(future, settings.deadline)
+            if stopped:
+                break
+            pending.popleft()
+            chunk_issues, chunk_words = future.result()
+            _submit()
+            # Both chunks saw the seam: one issue per span, as `deduplicate_issues` does over a whole document.
+            merged = deduplicate_issues(held + chunk_issues) if held else chunk_issues
+            cut = bisect_left([issue["position"]["start"] for issue in merged], seam) if pending else len(merged)
+            _write(merged[:cut])
+            held = merged[cut:]
+            writer.append("chunks", array("q", [byte_start, chunk_char_start]))
+            writer.append("lines", new_lines)
+            for name, seconds in timings.items():
+                stages[name] = stages.get(name, 0.0) + seconds
+            cost_model.observe(chunk_chars, timings["chunk_cost"], timings["grammar"])
+            words += chunk_words
+            completed += 1
+            checked_chars = chunk_char_start + chunk_chars
+            checked_bytes = byte_end
+            if density_limit > 0 and pending and words >= settings.issue_density_min_tokens:
+                density = writer.issue_count / words
+                if density > density_limit:
+                    breaker = {
+                        "tripped": True,
+                        "issue_density": round(density, 4),
+                        "limit": density_limit,
+                        "chunks_checked": completed,
+                        "tokens_checked": words,
+                    }
+                    break
+    finally:
+        # As in `file_worker`: running chunks return at their next check and are waited for, queued ones dropped.
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+    _write(held)  # the last checked chunk's seam issues: no later chunk will re-read them
+    stages["analysis"] = clock() - mark
+
+    partial = None
+    if stopped:
+        partial = {
+            "reason": stopped,
+            # Chunks are cut lazily, so the total is an estimate from the byte size.
+            "chunks_completed": completed,
+            "chunks_total": max(completed + 1, math.ceil(size / chunk_size)),
+            "checked_chars": checked_chars,
+            "checked_tokens": words,
+        }
+    weighted_errors = severity_counts["error"] + 0.3 * severity_counts["suggestion"]
+    weighted_accuracy = max(0.0, 100.0 - (weighted_errors / words) * 100.0) if words else 100.0
+    large = {
+        "content_id": directory.name,
+        "chunks": completed,
+        "issues": writer.issue_count,
+        "total_chars": checked_chars,
+        "total_lines": line_no if not stopped and not breaker else None,
+        "complete": not stopped and not breaker,
+    }
+    stages["total"] = clock() - entered
+    stats.update(
+        {
+            "duration_ms": int((time.time() - started) * 1000),
+            "chunks": completed,
+            "chunk_size": chunk_size,
+            "chunk_plan": chunk_plan,
+            "thread_workers": max_workers,
+            "word_count": words,
+            "spelling_issues": type_counts.get("spelling", 0),
+            "grammar_issues": type_counts.get("grammar", 0),
+            "severity_counts": severity_counts,
+            "weighted_errors": weighted_errors,
+            "weighted_accuracy": weighted_accuracy,
+            "grammar_enabled": grammar_enabled,
+            "language": settings.language,
+            "preflight": preflight.as_dict() if preflight else None,
+            "circuit_breaker": breaker,
+            "partial": partial,
+            "large_document": large,
+            "stage_ms": _stage_ms(stages),
+        }
+    )
+    writer.close({"total_chars": checked_chars, "issues": writer.issue_count, "stats": stats}, checked_bytes, checked_chars)
+    return DocumentResult(doc_id, stats=stats, error=_stop_reason(breaker, partial))
+
+
+def _int64_view(path: Path) -> Any:
+    """Read-only int64 sequence over a `.bin` index file, memory-mapped (bisect works on it directly)."""
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return array("q")
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast("q")
+
+
+class StoredIssues:
+    """Issues of a large document, read line by line from `issues.jsonl` by index."""
+
+    def __init__(self, directory: Path, count: int) -> None:
+        self.count = count
+        self.offsets = _int64_view(directory / "issue_offsets.bin")
+        self.start = _int64_view(directory / "issue_starts.bin")
+        self.line = _int64_view(directory / "issue_lines.bin")
+        self.path = directory / "issues.jsonl"
+
+    def __len__(self) -> int:
+        return self.count
+
+    def iter_json(self, lo: int = 0, hi: Optional[int] = None) -> Iterator[str]:
+        hi = self.count if hi is None else min(hi, self.count)
+        if lo >= hi:
+            return
+        with open(self.path, "rb") as handle:
+            handle.seek(self.offsets[lo])
+            # A batch of issues at a time: an export walks all of them.
+            for batch in range(lo, hi, _ISSUES_PER_READ):
+                batch_end = min(hi, batch + _ISSUES_PER_READ)
+                payload = handle.read(self.offsets[batch_end] - self.offsets[batch])
+                # Split on b"\n" only: str.splitlines() would also break at U+2028 and friends inside strings.
+                for line in payload.split(b"\n")[:-1]:
+                    yield line.decode("utf-8")
+
+
+class LargeDocumentIndex:
+    """The `windowing.DocumentIndex` interface over a large document's files; nothing is loaded whole."""
+
+    def __init__(self, directory: Path, meta: Dict) -> None:
+        self.directory = directory
+        self.total_chars: int = meta["total_chars"]
+        self.line_starts = _int64_view(directory / "lines.bin")
+        chunks = _int64_view(directory / "chunks.bin")
+        self.chunk_bytes, self.chunk_chars = chunks[0::2], chunks[1::2]
+        self.issues = StoredIssues(directory, meta["issues"])
+        self.issue_lines = self.issues.line
+
+    @property
+    def total_lines(self) -> int:
+        return len(self.line_starts)
+
+    def line_range_to_chars(self, line_start: int, line_end: int) -> Tuple[int, int]:
+        first = min(max(1, line_start), self.total_lines)
+        last = min(max(first, line_end), self.total_lines)
+        start = self.line_starts[first - 1]
+        end = self.line_starts[last] if last < self.total_lines else self.total_chars
+        return start, end
+
+    def char_range_to_lines(self, start: int, end: int) -> Tuple[int, int]:
+        first = bisect_right(self.line_starts, start)
+        last = max(first, bisect_right(self.line_starts, max(start, end - 1)))
+        return first, last
+
+    def content_window(self, start: int, end: int) -> str:
+        start, end = max(0, start), min(max(0, end), self.total_chars)
+        if start >= end:
+            return ""
+        first = bisect_right(self.chunk_chars, start) - 1
+        last = bisect_left(self.chunk_chars, end)  # first chunk (or the end sentinel) at or past `end`
+        with open(self.directory / TEXT_NAME, "rb") as handle:
+            handle.seek(self.chunk_bytes[first])
+            raw = handle.read(self.chunk_bytes[last] - self.chunk_bytes[first])
+        offset = start - self.chunk_chars[first]
+        return raw.decode("utf-8", errors="replace")[offset : offset + end - start]
+
+    def issue_span_by_offset(self, start: int, end: int) -> Tuple[int, int]:
+        return bisect_left(self.issues.start, start), bisect_left(self.issues.start, end)
+
+    def issue_span_by_line(self, line_start: int, line_end: int) -> Tuple[int, int]:
+        return bisect_left(self.issue_lines, line_start), bisect_right(self.issue_lines, line_end)
+
+
+def open_large_index(storage_root: str, content_id: str, ttl_seconds: float = 0) -> Optional[LargeDocumentIndex]:
+    """Index of an analyzed large document, or None if `content_id` is not one (still being analyzed, expired)."""
+    directory = document_dir(storage_root, content_id)
+    if directory is None:
+        return None
+    try:
+        if ttl_seconds and time.time() - (directory / META_NAME).stat().st_mtime > ttl_seconds:
+            return None
+        meta = json.loads((directory / META_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return LargeDocumentIndex(directory, meta)
@@ -0,0 +1,165 @@
+"""
+Opt-in per-document profiling (`profile=true`, enabled with `PROFILING=1`).
+
+Runs `process_document` inside the pool worker under a stack sampler and tracemalloc.
+The sampler reads every thread's frame via `sys._current_frames()`, so it also sees the
+chunk threads that a deterministic profiler on the worker's main thread would miss, and
+its samples fold directly into collapsed stacks for flamegraph tools.
+"""
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+from backend.config import Settings
+from backend.processing.file_worker import process_document
+from backend.processing.results import DocumentResult
+
+# Children of the `analysis` wall-clock stage; the rest hang directly off `total`.
+_ANALYSIS_STAGES = ("spelling", "grammar", "rules", "chunk_cost")
+PROFILE_ID_RE = re.compile(r"[0-9a-f]{32}")
+_BACKEND_DIR = os.sep + "backend" + os.sep
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples all other threads' stacks every `interval` seconds from a daemon thread."""
+
+    def __init__(self, interval: float = 0.002) -> None:
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.ticks = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.ticks += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                # Root each stack at the innermost run of backend frames: the pool/thread bootstrap
+                # (and, after fork, the parent's frames) above it are noise.
+                stack: List[str] = []
+                in_backend = False
+                while frame is not None:
+                    ours = _BACKEND_DIR in frame.f_code.co_filename
+                    if in_backend and not ours:
+                        break
+                    in_backend = in_backend or ours
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if in_backend:  # skip idle pool threads and unrelated interpreter threads
+                    self.stacks[";".join(reversed(stack))] += 1
+                    self.samples += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def top_functions(self, seconds_per_sample: float, limit: int) -> List[Dict]:
+        cumulative: Counter = Counter()
+        own: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            for label in set(frames):
+                cumulative[label] += count
+            own[frames[-1]] += count
+        return [
+            {
+                "function": label,
+                "cumulative_s": round(count * seconds_per_sample, 4),
+                "self_s": round(own[label] * seconds_per_sample, 4),
+                "samples": count,
+            }
+            for label, count in cumulative.most_common(limit)
+        ]
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def stage_tree(stage_ms: Dict[str, float]) -> Dict:
+    """Nest the flat `stats.stage_ms` into total → stages → analysis sub-stages."""
+    children = []
+    for name, ms in stage_ms.items():
+        if name == "total" or name in _ANALYSIS_STAGES:
+            continue
+        node = {"name": name, "ms": ms}
+        if name == "analysis":
+            node["children"] = [{"name": sub, "ms": stage_ms[sub]} for sub in _ANALYSIS_STAGES if sub in stage_ms]
+            node["note"] = "children are thread-seconds summed over chunks"
+        children.append(node)
+    return {"name": "total", "ms": stage_ms.get("total", sum(c["ms"] for c in children)), "children": children}
+
+
+def collapsed_stacks_path(storage_root: str, profile_id: str) -> str:
+    """Where the collapsed stacks of `profile_id` live (served by `GET /profiles/{id}`, never exposed as a path)."""
+    return os.path.join(storage_root, "profiles", f"{profile_id}.folded")
+
+
+def store_collapsed_stacks(storage_root: str, stacks: str) -> str:
+    """Save collapsed stacks under a new id for `GET /profiles/{id}`; returns the id."""
+    profile_id = uuid.uuid4().hex
+    path = collapsed_stacks_path(storage_root, profile_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(stacks)
+    return profile_id
+
+
+def profile_document(doc_id: str, text: str, settings: Settings, pool_load: float = 0.0) -> DocumentResult:
+    """
+    `process_document` plus `stats.profile`; meant to run in a pool worker (or on a cluster node), one document
+    at a time. `stats.profile.collapsed_stacks` holds the folded stacks themselves, for the caller to store.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline_bytes, _ = tracemalloc.get_traced_memory()
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    with StackSampler(settings.profile_interval_ms / 1000.0) as sampler:
+        result = process_document(doc_id, text, settings, pool_load)
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+    current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    if not tracing:
+        tracemalloc.stop()
+
+    # Each thread contributes at most one sample per tick; ticks run late when the GIL is busy,
+    # so the observed tick rate (not the nominal interval) converts samples to seconds.
+    seconds_per_sample = wall / max(1, sampler.ticks)
+    # The stacks travel back with the result: on a cluster node, a file under the node's STORAGE_ROOT could not be
+    # served by the API. The API stores them and replaces this with `collapsed_stacks_id`.
+    collapsed: Optional[str] = None
+    if settings.profile_collapsed_stacks and sampler.samples:
+        collapsed = sampler.collapsed()
+
+    result.stats["profile"] = {
+        "wall_seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "peak_alloc_bytes": max(0, peak_bytes - baseline_bytes),
+        "retained_alloc_bytes": max(0, current_bytes - baseline_bytes),
+        "samples": sampler.samples,
+        "sample_interval_ms": settings.profile_interval_ms,
+        "stage_tree": stage_tree(result.stats.get("stage_ms") or {}),
+        "top_functions": sampler.top_functions(seconds_per_sample, settings.profile_top_functions),
+        "collapsed_stacks": collapsed,
+    }
+    return result
@@ -0,0 +1,305 @@
+"""
+Per-file report formats shared by the batch CLI and exports.
+
+`text_report` reproduces the `<file>_report.txt` download of the viewer; `jsonl_record`
+is one self-contained JSON line (summary plus issues, no tokens); `summary_row` is the
+per-file row of the viewer's CSV export.
+
+Bulk exports read stored JSONL records (the batch CLI's `results.jsonl`, or a saved API
+export) in ~1MB pieces, parse each record's issues one at a time, and yield the output in
+~64KB pieces, optionally gzipped, so memory stays bounded whatever the number of files or
+issues, including a large document's single record with millions of issues.
+"""
+import codecs
+import csv
+import hashlib
+import io
+import json
+import re
+import zlib
+from json.encoder import encode_basestring_ascii as _json_str
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from backend.processing.results import DocumentResult
+from backend.services.json_stream import ITEM, ObjectStreamParser
+
+SUMMARY_FIELDS = (
+    "filename",
+    "word_count",
+    "spelling_issues",
+    "grammar_issues",
+    "spelling_pct",
+    "grammar_pct",
+    "overall_accuracy",
+)
+ISSUE_FIELDS = ("filename", "type", "message", "original", "suggestions", "start", "end", "line", "col")
+# Export format → (file extension, media type).
+EXPORT_FORMATS = {
+    "summary-csv": ("csv", "text/csv; charset=utf-8"),
+    "issues-csv": ("csv", "text/csv; charset=utf-8"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+    "txt": ("txt", "text/plain; charset=utf-8"),
+}
+_EXPORT_PIECE_CHARS = 64 * 1024
+_READ_BYTES = 1024 * 1024
+_ISSUES_PER_PIECE = 1024
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9\-_.]")
+
+
+def report_filename(doc_id: str, source: str = "") -> str:
+    """
+    `<id>_report.txt` with the same character replacement as the viewer's download. With `source` (the
+    file's full path) a short hash of it is added, so ids that collide once replaced (`a/b.txt`, `a_b.txt`,
+    or the same relative name under two roots) still get their own reports.
+    """
+    name = _UNSAFE_NAME_RE.sub("_", doc_id)
+    if source:
+        name += "_" + hashlib.sha1(source.encode("utf-8")).hexdigest()[:8]
+    return f"{name}_report.txt"
+
+
+def summary(result: DocumentResult) -> Dict[str, Any]:
+    stats = result.stats
+    words = stats.get("word_count", 0) or 0
+    spelling = stats.get("spelling_issues", result.issues.count("spelling"))
+    grammar = stats.get("grammar_issues", result.issues.count("grammar"))
+    return {
+        "filename": result.id,
+        "word_count": words,
+        "spelling_issues": spelling,
+        "grammar_issues": grammar,
+        "spelling_pct": spelling / words * 100.0 if words else 0.0,
+        "grammar_pct": grammar / words * 100.0 if words else 0.0,
+        "overall_accuracy": max(0.0, 100.0 - (spelling + grammar) / words * 100.0) if words else 100.0,
+    }
+
+
+def summary_row(result: DocumentResult) -> List[str]:
+    """Values for `SUMMARY_FIELDS`, percentages to two decimals."""
+    values = summary(result)
+    return [
+        f"{values[name]:.2f}" if isinstance(values[name], float) else str(values[name]) for name in SUMMARY_FIELDS
+    ]
+
+
+def _report_head(result: DocumentResult) -> List[str]:
+    values = summary(result)
+    lines = [
+        f"File: {result.id}",
+        f"Word count: {values['word_count']}",
+        f"Spelling issues: {values['spelling_issues']} ({values['spelling_pct']:.2f}%)",
+        f"Grammar issues: {values['grammar_issues']} ({values['grammar_pct']:.2f}%)",
+        f"Overall accuracy: {values['overall_accuracy']:.2f}%",
+    ]
+    if result.error:
+        lines.append(f"Error: {result.error}")
+    lines.extend(["", "Issues:"])
+    return lines
+
+
+def _report_issue(number: int, issue_type: str, message: str, original: str, suggestions: List[str]) -> str:
+    hint = f" Suggestions: {', '.join(suggestions)}" if suggestions else ""
+    return f"  {number}. [{issue_type}] {message} ({original}){hint}"
+
+
+def text_report(result: DocumentResult) -> str:
+    lines = _report_head(result)
+    issues = result.issues
+    if not len(issues):
+        lines.append("  None")
+    for i in range(len(issues)):
+        lines.append(_report_issue(i + 1, issues.type[i], issues.message[i], issues.original[i], issues.suggestions[i]))
+    return "\n".join(lines)
+
+
+def jsonl_record(result: DocumentResult, **extra: Any) -> str:
+    """One JSON line: `extra` fields, id, stats, error and issues (without newline)."""
+    return "".join(jsonl_record_pieces(result, **extra))
+
+
+def jsonl_record_pieces(result: DocumentResult, issues: Optional[Iterable[str]] = None, **extra: Any) -> Iterator[str]:
+    """
+    `jsonl_record` in pieces, with `issues` (issue JSON objects, e.g. a large document's stored ones) in
+    place of the result's own, so a record with millions of issues is never one string.
+    """
+    head = "".join(f"{_json_str(key)}:{json.dumps(value)}," for key, value in extra.items())
+    yield (
+        f'{{{head}"id":{_json_str(result.id)},"stats":{json.dumps(result.stats)},'
+        f'"error":{json.dumps(result.error)},"issues":['
+    )
+    batch: List[str] = []
+    separator = ""
+    for issue in result.issues.iter_json() if issues is None else issues:
+        batch.append(issue)
+        if len(batch) >= _ISSUES_PER_PIECE:
+            yield separator + ",".join(batch)
+            separator, batch = ",", []
+    if batch:
+        yield separator + ",".join(batch)
+    yield "]}"
+
+
+def _complete_length(handle: Any) -> int:
+    """Bytes up to and including the last newline: a torn last line from a killed writer is left out."""
+    position = handle.seek(0, io.SEEK_END)
+    while position > 0:
+        start = max(0, position - 64 * 1024)
+        handle.seek(start)
+        newline = handle.read(position - start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+def iter_record_pieces(path: str) -> Iterator[Optional[str]]:
+    """Text of the complete records of a stored JSONL file in pieces of at most ~1MB, with None after each record."""
+    with open(path, "rb") as handle:
+        remaining = _complete_length(handle)
+        handle.seek(0)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        while remaining:
+            block = handle.read(min(_READ_BYTES, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            text = decoder.decode(block, final=not remaining)
+            start = 0
+            while True:
+                newline = text.find("\n", start)
+                if newline < 0:
+                    if start < len(text):
+                        yield text[start:]
+                    break
+                if newline > start:
+                    yield text[start:newline]
+                yield None
+                start = newline + 1
+
+
+class _RecordRenderer:
+    """Renders one stored record as `fmt` from its parse events, issue by issue."""
+
+    def __init__(self, fmt: str, writer: Any, buffer: io.StringIO, first: bool) -> None:
+        self.fmt = fmt
+        self.writer = writer
+        self.buffer = buffer
+        self.first = first
+        self.fields: Dict[str, Any] = {}
+        self.counts: Dict[str, int] = {}
+        self.issues = 0
+        self.head_written = False
+        self.held: List[str] = []
+
+    def result(self) -> DocumentResult:
+        # Records without issue counts in their stats are summarized from the issues they carry.
+        stats = {f"{kind}_issues": count for kind, count in self.counts.items()}
+        stats.update(self.fields.get("stats") or {})
+        return DocumentResult(str(self.fields.get("id", "")), stats=stats, error=self.fields.get("error"))
+
+    def _head(self) -> None:
+        if self.fmt == "txt" and not self.head_written:
+            self.buffer.write(("" if self.first else "\n\n") + "\n".join(_report_head(self.result())) + "\n")
+        self.head_written = True
+
+    def field(self, key: str, value: Any) -> None:
+        self.fields[key] = value
+
+    def issue(self, issue: Dict[str, Any]) -> None:
+        self.issues += 1
+        self.counts[issue["type"]] = self.counts.get(issue["type"], 0) + 1
+        if self.fmt == "issues-csv":
+            pos = issue["position"]
+            suggestions = "|".join(issue.get("suggestions") or [])
+            self.writer.writerow(
+                [
+                    self.fields.get("id", ""),
+                    issue["type"],
+                    issue["message"],
+                    issue["original"],
+                    suggestions,
+                    pos["start"],
+                    pos["end"],
+                    pos["line"],
+                    pos["col"],
+                ]
+            )
+        elif self.fmt == "txt":
+            line = _report_issue(
+                self.issues, issue["type"], issue["message"], issue["original"], issue.get("suggestions") or []
+            )
+            stats = self.fields.get("stats") or {}
+            if "spelling_issues" in stats and "grammar_issues" in stats:
+                self._head()  # every other field precedes `issues` in a record
+                self.buffer.write(line + "\n")
+            else:
+                self.held.append(line)  # the head needs counts only the whole issue list gives
+
+    def finish(self) -> None:
+        if self.fmt == "summary-csv":
+            self.writer.writerow(summary_row(self.result()))
+        elif self.fmt == "txt":
+            self._head()
+            if not self.issues:
+                self.buffer.write("  None\n")
+            for line in self.held:
+                self.buffer.write(line + "\n")
+
+
+def iter_export(records: Iterable[Optional[str]], fmt: str) -> Iterator[str]:
+    """
+    Render stored records (`iter_record_pieces`) as `fmt` (see `EXPORT_FORMATS`), in pieces of about 64KB.
+    Records are parsed incrementally, so one holding a large document's issues is never loaded whole.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "summary-csv":
+        writer.writerow(SUMMARY_FIELDS)
+    elif fmt == "issues-csv":
+        writer.writerow(ISSUE_FIELDS)
+    first = True
+    parser: Optional[ObjectStreamParser] = None
+    renderer: Optional[_RecordRenderer] = None
+    for piece in records:
+        if fmt == "jsonl":
+            buffer.write("\n" if piece is None else piece)  # already the export shape; no need to parse it
+        elif piece is None:
+            if parser is not None:
+                _render(parser.close(), renderer)
+                renderer.finish()
+                first = False
+            parser = renderer = None
+        elif parser is not None or piece.strip():
+            if parser is None:
+                parser, renderer = ObjectStreamParser("issues"), _RecordRenderer(fmt, writer, buffer, first)
+            _render(parser.feed(piece.encode("utf-8")), renderer)
+        if buffer.tell() >= _EXPORT_PIECE_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _render(events: List[Any], renderer: _RecordRenderer) -> None:
+    for kind, value in events:
+        if kind == ITEM:
+            renderer.issue(value)
+        else:
+            renderer.field(*value)
+
+
+def encode_export(pieces: Iterable[str], gzip: bool = False, level: int = 6) -> Iterator[bytes]:
+    """UTF-8 encode export pieces, optionally as one gzip stream."""
+    if not gzip:
+        for piece in pieces:
+            yield piece.encode("utf-8")
+        return
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    for piece in pieces:
+        chunk = compressor.compress(piece.encode("utf-8"))
+        if chunk:
+            yield chunk
+    yield compressor.flush()
@@ -0,0 +1,204 @@
+"""
+Compact result structures passed from workers to the API process.
+
+Tokens and issues are stored column-wise (parallel lists plus `array` offsets) so a
+document with a million tokens pickles as a handful of buffers instead of millions of
+nested dicts, and the API encodes them straight to JSON without re-validating them into
+pydantic models. The wire shape matches `backend.models.FileResult`, and the bytes match
+what FastAPI's `JSONResponse` rendered for the models: UTF-8 (non-ASCII left unescaped),
+compact separators, and NaN/Infinity refused with a ValueError.
+"""
+import functools
+import json
+from array import array
+from json.encoder import encode_basestring as _json_str
+from typing import Any, Dict, Iterator, List, Optional
+
+_dumps = functools.partial(json.dumps, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def _offsets() -> array:
+    return array("q")
+
+
+class TokenColumns:
+    __slots__ = ("text", "start", "end", "line", "col")
+
+    def __init__(self) -> None:
+        self.text: List[str] = []
+        self.start = _offsets()
+        self.end = _offsets()
+        self.line = _offsets()
+        self.col = _offsets()
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def append(self, text: str, start: int, end: int, line: int, col: int) -> None:
+        self.text.append(text)
+        self.start.append(start)
+        self.end.append(end)
+        self.line.append(line)
+        self.col.append(col)
+
+    def truncate(self, count: int) -> None:
+        """Keep only the first `count` tokens."""
+        for column in (self.text, self.start, self.end, self.line, self.col):
+            del column[count:]
+
+    def iter_json(self, lo: int = 0, hi: Optional[int] = None) -> Iterator[str]:
+        text, start, end, line, col = self.text, self.start, self.end, self.line, self.col
+        for i in range(lo, len(text) if hi is None else hi):
+            yield (
+                f'{{"text":{_json_str(text[i])},"position":{{"start":{start[i]},"end":{end[i]},'
+                f'"line":{line[i]},"col":{col[i]}}}}}'
+            )
+
+    def to_dicts(self) -> List[Dict]:
+        return [
+            {"text": t, "position": {"start": s, "end": e, "line": ln, "col": c}}
+            for t, s, e, ln, c in zip(self.text, self.start, self.end, self.line, self.col)
+        ]
+
+
+class IssueColumns:
+    __slots__ = ("type", "severity", "message", "original", "suggestions", "start", "end", "line", "col")
+
+    def __init__(self) -> None:
+        self.type: List[str] = []
+        self.severity: List[str] = []
+        self.message: List[str] = []
+        self.original: List[str] = []
+        self.suggestions: List[List[str]] = []
+        self.start = _offsets()
+        self.end = _offsets()
+        self.line = _offsets()
+        self.col = _offsets()
+
+    def __len__(self) -> int:
+        return len(self.type)
+
+    @classmethod
+    def from_dicts(cls, issues: List[Dict]) -> "IssueColumns":
+        cols = cls()
+        for issue in issues:
+            pos = issue["position"]
+            cols.type.append(issue["type"])
+            cols.severity.append(issue.get("severity", "error"))
+            cols.message.append(issue["message"])
+            cols.original.append(issue["original"])
+            cols.suggestions.append(list(issue.get("suggestions") or []))
+            cols.start.append(pos["start"])
+            cols.end.append(pos["end"])
+            cols.line.append(pos["line"])
+            cols.col.append(pos["col"])
+        return cols
+
+    def count(self, issue_type: str) -> int:
+        return self.type.count(issue_type)
+
+    # `severity` stays internal (stats/exports); the wire shape matches `backend.models.Issue`.
+    def issue_json(self, i: int) -> str:
+        suggestions = ",".join(_json_str(s) for s in self.suggestions[i])
+        return (
+            f'{{"type":{_json_str(self.type[i])},"message":{_json_str(self.message[i])},'
+            f'"original":{_json_str(self.original[i])},'
+            f'"suggestions":[{suggestions}],"position":{{"start":{self.start[i]},"end":{self.end[i]},'
+            f'"line":{self.line[i]},"col":{self.col[i]}}}}}'
+        )
+
+    def iter_json(self, lo: int = 0, hi: Optional[int] = None) -> Iterator[str]:
+        for i in range(lo, len(self.type) if hi is None else hi):
+            yield self.issue_json(i)
+
+    def issue_dict(self, i: int) -> Dict:
+        return {
+            "type": self.type[i],
+            "message": self.message[i],
+            "original": self.original[i],
+            "suggestions": self.suggestions[i],
+            "position": {"start": self.start[i], "end": self.end[i], "line": self.line[i], "col": self.col[i]},
+        }
+
+    def to_dicts(self) -> List[Dict]:
+        return [self.issue_dict(i) for i in range(len(self.type))]
+
+
+class DocumentResult:
+    """Per-document outcome; trusted worker output, serialized without model validation."""
+
+    __slots__ = ("id", "tokens", "issues", "stats", "content", "error", "content_id", "content_available")
+
+    def __init__(
+        self,
+        id: str,
+        tokens: Optional[TokenColumns] = None,
+        issues: Optional[IssueColumns] = None,
+        stats: Optional[Dict[str, Any]] = None,
+        content: Optional[str] = None,
+        error: Optional[str] = None,
+        content_id: Optional[str] = None,
+        content_available: Optional[bool] = None,
+    ) -> None:
+        self.id = id
+        self.tokens = tokens if tokens is not None else TokenColumns()
+        self.issues = issues if issues is not None else IssueColumns()
+        self.stats = stats if stats is not None else {}
+        self.content = content
+        self.error = error
+        self.content_id = content_id
+        self.content_available = content_available
+
+    def copy(self, id: str) -> "DocumentResult":
+        """Same analysis under another id; tokens and issues are shared, `stats` is copied (callers annotate it)."""
+        return DocumentResult(id, self.tokens, self.issues, dict(self.stats), self.content, self.error)
+
+    def iter_json(self) -> Iterator[str]:
+        yield f'{{"id":{_json_str(self.id)},"tokens":['
+        yield ",".join(self.tokens.iter_json())
+        yield '],"issues":['
+        yield ",".join(self.issues.iter_json())
+        yield (
+            f'],"stats":{_dumps(self.stats)},"content":{_dumps(self.content)},'
+            f'"error":{_dumps(self.error)},"content_id":{_dumps(self.content_id)},'
+            f'"content_available":{_dumps(self.content_available)}}}'
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "tokens": self.tokens.to_dicts(),
+            "issues": self.issues.to_dicts(),
+            "stats": self.stats,
+            "content": self.content,
+            "error": self.error,
+            "content_id": self.content_id,
+            "content_available": self.content_available,
+        }
+
+    def summary_dict(self) -> Dict:
+        """Simplified per-file shape returned by the multipart `/analyze` path."""
+        issues = self.issues
+        spelling_errors = []
+        grammar_errors = []
+        for i, issue_type in enumerate(issues.type):
+            if issue_type == "spelling":
+                spelling_errors.append(
+                    {"word": issues.original[i], "suggestions": issues.suggestions[i], "start": issues.start[i], "end": issues.end[i]}
+                )
+            else:
+                grammar_errors.append(
+                    {"issue": issues.message[i], "suggestions": issues.suggestions[i], "start": issues.start[i], "end": issues.end[i]}
+                )
+        return {"filename": self.id, "spelling_errors": spelling_errors, "grammar_errors": grammar_errors}
+
+
+def encode_files_json(results: List[DocumentResult]) -> bytes:
+    """Encode `{"files": [...]}` (the `AnalyzeResponse` shape) directly to UTF-8 JSON bytes."""
+    parts = ['{"files":[']
+    for idx, result in enumerate(results):
+        if idx:
+            parts.append(",")
+        parts.extend(result.iter_json())
+    parts.append("]}")
+    return "".join(parts).encode("utf-8")
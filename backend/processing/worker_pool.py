@@ -0,0 +1,225 @@
+"""
+Recycling process pool.
+
+Long-lived workers accumulate cached spell checkers and LanguageTool instances and a
+fragmented heap. `RecyclingPool` replaces the executor once any worker has run
+`max_tasks` tasks or reports an RSS above `max_rss_bytes`. The replacement is started and
+warmed (its initializer builds the lexicon and grammar tool) while the old executor keeps
+serving; then new tasks switch over and the old executor is shut down without cancelling,
+so everything already submitted to it finishes.
+
+Each task gets a cancellation flag (see `cancellation`): cancelling the coroutine awaiting
+`run` stops the document in its worker between chunks rather than letting it finish.
+
+With the `fork` start method the lexicons are built once in the parent before the first
+executor starts, so every worker of every generation inherits them copy-on-write instead
+of building its own copy.
+"""
+import asyncio
+import gc
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from backend.config import Settings
+from backend.processing.cancellation import CancelFlags, DeadlineHandle, install as install_cancel_flags, run_with_slot
+from backend.services.language_models import registry
+
+logger = logging.getLogger("backend")
+
+RECYCLE_REASONS = ("tasks", "rss")
+# Tasks submitted at once that can be cancelled; beyond this they run to completion.
+CANCEL_SLOTS = 4096
+# Tasks run by this worker process (see `run_tracked`).
+_tasks_run = 0
+
+
+def _rss_bytes() -> int:
+    """Current resident set size from /proc (0 where unavailable, which disables the RSS cap)."""
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+def warm_worker(settings: Settings, cancel_flags=None, deadlines=None) -> None:
+    """Pool initializer: load caches before the worker takes its first task."""
+    from backend.processing.file_worker import warm_caches
+    from backend.services.grammar import close_language_tools
+
+    install_cancel_flags(cancel_flags, deadlines)
+    # Workers leave via os._exit, skipping atexit; multiprocessing finalizers still run.
+    multiprocessing.util.Finalize(None, close_language_tools, exitpriority=10)
+    try:
+        warm_caches(settings)
+    except Exception:  # a cold worker still works; a raising initializer would break the pool
+        logger.exception("Worker warm-up failed")
+
+
+def run_tracked(slot: int, fn, *args) -> Tuple[Any, int, int, int, Dict]:
+    """
+    Run `fn(*args)` in a worker under cancellation flag `slot`; returns (result, tasks run by it, its RSS bytes,
+    its pid, its language-model registry stats).
+    """
+    global _tasks_run
+    _tasks_run += 1
+    result = run_with_slot(slot, fn, *args)
+    return result, _tasks_run, _rss_bytes(), os.getpid(), registry.stats()
+
+
+class RecyclingPool:
+    """A `ProcessPoolExecutor` that is replaced, warm, when a worker hits the task or RSS limit (0 = none)."""
+
+    def __init__(
+        self,
+        workers: int,
+        settings: Settings,
+        start_method: str = "",
+        max_tasks: int = 0,
+        max_rss_bytes: int = 0,
+    ) -> None:
+        self.workers = workers
+        self.settings = settings
+        self.start_method = start_method
+        self.max_tasks = max_tasks
+        self.max_rss_bytes = max_rss_bytes
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.generation = 0
+        self.recycles: Dict[str, int] = {reason: 0 for reason in RECYCLE_REASONS}
+        self.last_recycle: Optional[Dict] = None
+        # Largest RSS any worker of the current generation has reported.
+        self.worker_rss_bytes = 0
+        # pid -> language models that worker had loaded after its latest task (current generation).
+        self.worker_models: Dict[int, Dict] = {}
+        self.cancelled = 0
+        self.cancel_flags = CancelFlags(CANCEL_SLOTS)
+        self._recycling: Optional[asyncio.Task] = None
+
+    @property
+    def process_workers(self) -> int:
+        """Worker processes serving tasks (0 when running on asyncio's default thread executor)."""
+        return self.workers if self.executor is not None else 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method or None),
+            initializer=warm_worker,
+            initargs=(self.settings, self.cancel_flags.array, self.cancel_flags.deadlines),
+        )
+
+    def _share_lexicons(self) -> None:
+        """Under fork, load the lexicons here so workers inherit them rather than each building a copy."""
+        if multiprocessing.get_context(self.start_method or None).get_start_method() != "fork":
+            return
+        from backend.processing.file_worker import warm_caches
+
+        try:
+            warm_caches(self.settings, grammar=False)  # grammar tools own servers; each worker starts its own
+        except Exception:
+            logger.exception("Lexicon preload failed; workers will load their own")
+            return
+        # Keep the collector from touching (and thereby copying) the inherited objects in every worker.
+        gc.freeze()
+
+    def start(self) -> None:
+        self._share_lexicons()
+        try:
+            self.executor = self._new_executor()
+            self.generation = 1
+        except PermissionError as exc:  # pragma: no cover - environment-specific
+            logger.warning("Process pool unavailable (%s); falling back to threads", exc)
+            self.executor = None
+
+    async def run(self, fn, *args, deadline: Optional[DeadlineHandle] = None) -> Any:
+        """Run `fn(*args)` in a worker; `deadline`, if given, can move the task's deadline while it runs."""
+        loop = asyncio.get_running_loop()
+        if self.executor is None:
+            return await loop.run_in_executor(None, fn, *args)
+        generation = self.generation
+        slot = self.cancel_flags.acquire()
+        future = self.executor.submit(run_tracked, -1 if slot is None else slot, fn, *args)
+        if slot is not None:
+            future.add_done_callback(lambda _: self.cancel_flags.release(slot))
+            if deadline is not None:
+                deadline.attach(self.cancel_flags, slot, future)
+        try:
+            result, tasks, rss, pid, models = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Still queued: the executor drops it. Already running: the worker stops at its next check.
+            if slot is not None:
+                self.cancel_flags.cancel(slot, future)
+            self.cancelled += 1
+            raise
+        if generation == self.generation:
+            self.worker_rss_bytes = max(self.worker_rss_bytes, rss)
+            self.worker_models[pid] = models
+            reason = None
+            if self.max_tasks and tasks >= self.max_tasks:
+                reason = "tasks"
+            elif self.max_rss_bytes and rss >= self.max_rss_bytes:
+                reason = "rss"
+            if reason and self._recycling is None:
+                self._recycling = asyncio.create_task(self._recycle(reason, tasks, rss))
+        return result
+
+    async def _recycle(self, reason: str, tasks: int, rss: int) -> None:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        fresh: Optional[ProcessPoolExecutor] = None
+        try:
+            fresh = self._new_executor()
+            # Workers only take tasks after `warm_worker` returns, so nothing runs on a cold worker.
+            await asyncio.gather(*[loop.run_in_executor(fresh, os.getpid) for _ in range(self.workers)])
+            retired, self.executor, fresh = self.executor, fresh, None
+            self.generation += 1
+            self.worker_rss_bytes = 0
+            self.worker_models = {}
+            self.recycles[reason] += 1
+            self.last_recycle = {
+                "reason": reason,
+                "worker_tasks": tasks,
+                "worker_rss_bytes": rss,
+                "warm_seconds": round(time.perf_counter() - started, 3),
+                "at": time.time(),
+            }
+            logger.info("Recycled worker pool (%s: %d tasks, %d MB RSS)", reason, tasks, rss >> 20)
+            if retired is not None:
+                retired.shutdown(wait=False)  # no cancel_futures: submitted work drains
+        except Exception:
+            logger.exception("Worker pool recycle failed; keeping the current workers")
+        finally:
+            if fresh is not None:  # failed or cancelled before the switch
+                fresh.shutdown(wait=False, cancel_futures=True)
+            self._recycling = None
+
+    async def close(self) -> None:
+        if self._recycling is not None:
+            self._recycling.cancel()
+            try:
+                await self._recycling
+            except asyncio.CancelledError:
+                pass
+        if self.executor is not None:
+            # Waits only for running tasks, so no worker outlives the server (and its inherited socket).
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor = None
+
+    def stats(self) -> Dict:
+        return {
+            "process_workers": self.process_workers,
+            "generation": self.generation,
+            "recycling": self._recycling is not None,
+            "recycles": dict(self.recycles),
+            "max_tasks": self.max_tasks,
+            "max_rss_bytes": self.max_rss_bytes,
+            "worker_rss_bytes": self.worker_rss_bytes,
+            "cancelled_tasks": self.cancelled,
+            "last_recycle": self.last_recycle,
+            "language_models": {str(pid): models for pid, models in self.worker_models.items()},
+        }
@@ -0,0 +1,249 @@
+"""
+Admission control and scheduling in front of the process pool.
+
+Requests are admitted (or refused immediately) against limits on queued requests and
+queued document bytes; admitted work then takes one of a fixed number of in-flight slots
+per pool task, so the executor queue and API memory stay bounded under any load.
+
+Free slots go to waiting tasks by `FairScheduler`: the interactive lane before the bulk
+lane, the least-served client first within a lane, and that client's smallest document
+first, so a single-paragraph check never waits behind a 1000-file upload.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+# Every job is charged at least this many bytes so floods of tiny documents still count.
+_MIN_CHARGE = 1024
+_MAX_TRACKED_CLIENTS = 4096
+
+
+class AdmissionRejected(Exception):
+    """Raised by `AdmissionController.admit`; carries the HTTP status and a Retry-After hint."""
+
+    def __init__(self, status_code: int, reason: str, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class FairScheduler:
+    """
+    Hands out `slots` to waiting tasks. Interactive tasks go first, except that after
+    `interactive_burst` consecutive interactive grants a waiting bulk task gets one, so bulk
+    work is never starved. Within a lane, clients are served in order of bytes already
+    granted (start-time fair queueing; a returning client starts at the current virtual
+    time, so idling earns no credit) and each client's jobs shortest-first.
+    """
+
+    def __init__(self, slots: int, interactive_burst: int = 4) -> None:
+        self.free = slots
+        self.interactive_burst = max(1, interactive_burst)
+        # lane -> client -> heap of [size, seq, future]
+        self._queues: Dict[str, Dict[str, List[list]]] = {lane: {} for lane in LANES}
+        self._served: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._interactive_streak = 0
+        self._seq = itertools.count()
+        self.waiting = {lane: 0 for lane in LANES}
+
+    async def acquire(self, lane: str, client: str, size: int) -> None:
+        lane = lane if lane in self._queues else BULK
+        clients = self._queues[lane]
+        if client not in clients:
+            self._served[client] = max(self._served.get(client, 0.0), self._virtual_time)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(clients.setdefault(client, []), [size, next(self._seq), future])
+        self.waiting[lane] += 1
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # granted just as we were cancelled: pass the slot on
+            raise
+
+    def release(self) -> None:
+        self.free += 1
+        self._dispatch()
+
+    def resize(self, delta: int) -> None:
+        """Add (or with a negative `delta`, retire as they are released) slots."""
+        self.free += delta
+        self._dispatch()
+
+    def _pick_lane(self) -> Optional[str]:
+        interactive, bulk = self.waiting[INTERACTIVE] > 0, self.waiting[BULK] > 0
+        if interactive and (not bulk or self._interactive_streak < self.interactive_burst):
+            self._interactive_streak += 1
+            return INTERACTIVE
+        if bulk:
+            self._interactive_streak = 0
+            return BULK
+        return None
+
+    def _dispatch(self) -> None:
+        while self.free > 0:
+            lane = self._pick_lane()
+            if lane is None:
+                return
+            clients = self._queues[lane]
+            client = min(clients, key=lambda c: self._served[c])
+            heap = clients[client]
+            size, _, future = heapq.heappop(heap)
+            if not heap:
+                del clients[client]
+            self.waiting[lane] -= 1
+            if future.cancelled():
+                continue
+            self._virtual_time = self._served[client]
+            self._served[client] += max(size, _MIN_CHARGE)
+            self.free -= 1
+            future.set_result(None)
+        if len(self._served) > _MAX_TRACKED_CLIENTS:
+            self._forget_idle_clients()
+
+    def _forget_idle_clients(self) -> None:
+        # An idle client at or behind the virtual time would restart there anyway.
+        waiting = {c for clients in self._queues.values() for c in clients}
+        self._served = {
+            c: served for c, served in self._served.items() if c in waiting or served > self._virtual_time
+        }
+
+
+class Ticket:
+    """One admitted request; accumulates how long its pool tasks waited for a slot."""
+
+    __slots__ = ("documents", "size", "lane", "client", "admitted_at", "wait_seconds", "max_wait_seconds")
+
+    def __init__(self, documents: int, size: int, lane: str = BULK, client: str = "") -> None:
+        self.documents = documents
+        self.size = size
+        self.lane = lane
+        self.client = client
+        self.admitted_at = time.perf_counter()
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+
+class AdmissionController:
+    """
+    `max_inflight` pool tasks run at once; `max_queued_requests` / `max_queued_bytes` (0 = no
+    limit) cap what may be admitted and waiting. Over the request limit → 429, over the
+    byte budget → 503, a single request larger than the whole budget → 413.
+    """
+
+    def __init__(
+        self, max_inflight: int, max_queued_bytes: int = 0, max_queued_requests: int = 0, interactive_burst: int = 4
+    ) -> None:
+        self.max_inflight = max(1, max_inflight)
+        self.max_queued_bytes = max_queued_bytes
+        self.max_queued_requests = max_queued_requests
+        self.scheduler = FairScheduler(self.max_inflight, interactive_burst)
+        self.requests = 0
+        self.queued_bytes = 0
+        self.pending_tasks = 0
+        self.waiting_tasks = 0
+        self.running_tasks = 0
+        # EWMA of slot hold time, for Retry-After estimates.
+        self._task_seconds = 0.5
+
+    def resize(self, max_inflight: int) -> None:
+        """Change the slot count; running tasks keep theirs, fewer are granted until under the new limit."""
+        max_inflight = max(1, max_inflight)
+        self.scheduler.resize(max_inflight - self.max_inflight)
+        self.max_inflight = max_inflight
+
+    def retry_after(self) -> int:
+        """Seconds until roughly the current backlog has drained through the slots."""
+        backlog = self.pending_tasks * self._task_seconds / self.max_inflight
+        return int(min(60, max(1, math.ceil(backlog))))
+
+    def _check_too_large(self, size: int) -> None:
+        if self.max_queued_bytes and size > self.max_queued_bytes:
+            raise AdmissionRejected(
+                413, "too_large", f"Request of {size} bytes exceeds the {self.max_queued_bytes}-byte queue budget", 0
+            )
+
+    def _check_queued_bytes(self, size: int) -> None:
+        if self.max_queued_bytes and self.queued_bytes + size > self.max_queued_bytes:
+            raise AdmissionRejected(
+                503, "queued_bytes", f"Analysis queue is full ({self.queued_bytes} bytes queued)", self.retry_after()
+            )
+
+    def admit(self, documents: int, size: int, lane: str = BULK, client: str = "") -> Ticket:
+        self._check_too_large(size)
+        if self.max_queued_requests and self.requests >= self.max_queued_requests:
+            raise AdmissionRejected(
+                429, "queued_requests", f"Too many queued requests ({self.requests})", self.retry_after()
+            )
+        self._check_queued_bytes(size)
+        self.requests += 1
+        self.queued_bytes += size
+        self.pending_tasks += documents
+        return Ticket(documents, size, lane, client)
+
+    def add_documents(self, ticket: Ticket, documents: int, size: int = 0) -> None:
+        """
+        Charge documents (and bytes) a streamed request turned out to carry after it was admitted. The bytes
+        face the same budget as `admit`: past it nothing is charged and AdmissionRejected (413/503) is raised.
+        """
+        if size:
+            self._check_too_large(ticket.size + size)
+            self._check_queued_bytes(size)
+        ticket.documents += documents
+        ticket.size += size
+        self.pending_tasks += documents
+        self.queued_bytes += size
+
+    def release(self, ticket: Ticket) -> None:
+        self.requests -= 1
+        self.queued_bytes -= ticket.size
+        self.pending_tasks -= ticket.documents
+
+    @asynccontextmanager
+    async def slot(self, ticket: Optional[Ticket] = None, size: int = 0) -> AsyncIterator[float]:
+        """Hold one in-flight slot for a job of `size` bytes; yields the seconds spent waiting for it."""
+        requested = time.perf_counter()
+        self.waiting_tasks += 1
+        try:
+            if ticket is not None:
+                await self.scheduler.acquire(ticket.lane, ticket.client, size)
+            else:
+                await self.scheduler.acquire(BULK, "", size)
+        finally:
+            self.waiting_tasks -= 1
+        acquired = time.perf_counter()
+        waited = acquired - requested
+        if ticket is not None:
+            ticket.wait_seconds += waited
+            ticket.max_wait_seconds = max(ticket.max_wait_seconds, waited)
+        self.running_tasks += 1
+        try:
+            yield waited
+        finally:
+            self.running_tasks -= 1
+            self.scheduler.release()
+            self._task_seconds = 0.8 * self._task_seconds + 0.2 * (time.perf_counter() - acquired)
+
+    def stats(self) -> dict:
+        return {
+            "max_inflight": self.max_inflight,
+            "running_tasks": self.running_tasks,
+            "waiting_tasks": self.waiting_tasks,
+            "waiting_interactive": self.scheduler.waiting[INTERACTIVE],
+            "waiting_bulk": self.scheduler.waiting[BULK],
+            "requests": self.requests,
+            "queued_bytes": self.queued_bytes,
+            "max_queued_requests": self.max_queued_requests,
+            "max_queued_bytes": self.max_queued_bytes,
+        }
@@ -0,0 +1,76 @@
+"""
+Single-flight coalescing of identical in-flight work.
+
+Identical documents (templates, re-uploads, the same file open in two tabs) arriving
+while one copy is already queued or running wait on that one task instead of starting
+their own. The shared task keeps running while any caller still waits on it; it is
+cancelled only once every caller has gone.
+"""
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+def content_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=20).digest()
+
+
+class _Call:
+    __slots__ = ("task", "waiters", "context")
+
+    def __init__(self, task: "asyncio.Task[Any]", context: Any = None) -> None:
+        self.task = task
+        self.waiters = 0
+        self.context = context
+
+
+class SingleFlight:
+    """Runs at most one `factory()` per key at a time; later callers with the same key share its result."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+        self.counters = {"leaders": 0, "followers": 0}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        context: Any = None,
+        join: Optional[Callable[[Any], None]] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        Result of the in-flight call for `key` (starting one if none), and whether it was shared. A call started
+        here keeps `context`; a caller joining an existing call gets `join(context)` of the one that started it.
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()), context)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["followers"] += 1
+            if join is not None:
+                join(call.context)
+        call.waiters += 1
+        try:
+            # Shielded: one caller going away must not cancel the work the others wait on.
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {**self.counters, "inflight": len(self._calls)}
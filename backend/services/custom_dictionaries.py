@@ -0,0 +1,162 @@
+"""
+Custom word lists layered over the base lexicon.
+
+Each named dictionary (one per tenant, typically) is a JSON file under
+`STORAGE_ROOT/dictionaries`: `{"version": n, "add": [...], "remove": [...]}`. The API
+edits it with `update_dictionary`, which bumps the version and replaces the file
+atomically. Workers `stat` the file before each document and rebuild only the small
+`LexiconOverlay` when it changed, so edits apply from the next document on without
+rebuilding the base BK-tree or restarting the pool.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from backend.services.spell import LexiconOverlay, SpellChecker
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: edits are serialized per process only
+    fcntl = None  # type: ignore[assignment]
+
+NAME_RE = re.compile(r"[A-Za-z0-9_-]{1,64}")
+_OVERLAY_CACHE_ITEMS = 32
+_edit_lock = threading.Lock()
+# (base version, dictionary name, file signature, request words digest) -> (overlay, dictionary version); per process.
+_overlays: "OrderedDict[Tuple, Tuple[LexiconOverlay, Optional[int]]]" = OrderedDict()
+_overlays_lock = threading.Lock()
+
+
+def dictionary_path(storage_root: str, name: str) -> Path:
+    if not NAME_RE.fullmatch(name):
+        raise ValueError(f"Invalid dictionary name '{name}' (letters, digits, '_' and '-', up to 64)")
+    return Path(storage_root) / "dictionaries" / f"{name}.json"
+
+
+def _normalize(words: Iterable[str]) -> set:
+    return {w.strip().lower() for w in words if w and w.strip()}
+
+
+def dictionary_exists(storage_root: str, name: str) -> bool:
+    return dictionary_path(storage_root, name).is_file()
+
+
+def read_dictionary(storage_root: str, name: str) -> Optional[Dict]:
+    path = dictionary_path(storage_root, name)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    return {
+        "name": name,
+        "version": int(data.get("version", 0)),
+        "add": data.get("add", []),
+        "remove": data.get("remove", []),
+    }
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Serialize edits of one dictionary across threads and (where `fcntl` exists) API processes."""
+    with _edit_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path.with_suffix(".lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def update_dictionary(storage_root: str, name: str, add: Iterable[str] = (), remove: Iterable[str] = ()) -> Dict:
+    """
+    Apply additions and removals and bump the version. Adding a word accepts it; removing
+    one drops it from the additions and flags it even if the base lexicon has it.
+    """
+    path = dictionary_path(storage_root, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    added, removed = _normalize(add), _normalize(remove)
+    with _locked(path):
+        current = read_dictionary(storage_root, name) or {"version": 0, "add": [], "remove": []}
+        words = (set(current["add"]) | added) - removed
+        flagged = (set(current["remove"]) | removed) - added
+        data = {"version": current["version"] + 1, "add": sorted(words), "remove": sorted(flagged)}
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        partial.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(partial, path)
+    return {"name": name, **data}
+
+
+def delete_dictionary(storage_root: str, name: str) -> bool:
+    path = dictionary_path(storage_root, name)
+    with _locked(path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+    path.with_suffix(".lock").unlink(missing_ok=True)
+    return True
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    # Every edit replaces the file, so the inode changes even within one mtime tick.
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def canonical_words(words: Iterable[str]) -> Tuple[str, ...]:
+    """Request words as the overlay sees them (trimmed, lowercased, deduplicated), in a stable order."""
+    return tuple(sorted(_normalize(words)))
+
+
+def words_digest(words: Sequence[str]) -> str:
+    return hashlib.blake2b("\n".join(sorted(_normalize(words))).encode("utf-8"), digest_size=4).hexdigest()
+
+
+def apply_overlay(
+    base: SpellChecker, storage_root: str, name: str = "", words: Sequence[str] = ()
+) -> Tuple["SpellChecker | LexiconOverlay", Dict]:
+    """
+    The checker for one document: `base`, or an overlay of dictionary `name` plus the
+    request's own `words`. Returns it with the lexicon description recorded in the result.
+    """
+    info: Dict = {"version": base.version, "base": base.version, "dictionary": name or None, "custom_words": len(words)}
+    if not name and not words:
+        return base, info
+    path = dictionary_path(storage_root, name) if name else None
+    digest = words_digest(words) if words else ""
+    key = (base.version, name, _signature(path) if path is not None else None, digest)
+    with _overlays_lock:
+        cached = _overlays.get(key)
+        if cached is not None and cached[0].base is base:
+            _overlays.move_to_end(key)
+        else:
+            cached = None
+    if cached is None:
+        data = (read_dictionary(storage_root, name) if name else None) or {"version": 0, "add": [], "remove": []}
+        requested = _normalize(words)
+        version = base.version
+        if name:
+            version += f"+{name}@{data['version']}"
+        if digest:
+            version += f"+words:{digest}"
+        overlay = LexiconOverlay(base, set(data["add"]) | requested, set(data["remove"]) - requested, version)
+        cached = (overlay, data["version"] if name else None)
+        with _overlays_lock:
+            _overlays[key] = cached
+            while len(_overlays) > _OVERLAY_CACHE_ITEMS:
+                _overlays.popitem(last=False)
+    overlay, dictionary_version = cached
+    info.update(version=overlay.version, dictionary_version=dictionary_version)
+    return overlay, info
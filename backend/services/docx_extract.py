@@ -0,0 +1,70 @@
+import zipfile
+from io import BytesIO
+from typing import List
+from xml.etree.ElementTree import iterparse
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_PARAGRAPH = f"{_W_NS}p"
+_TEXT = f"{_W_NS}t"
+# Run-level elements that python-docx renders as characters inside a paragraph.
+_INLINE_CHARS = {
+    f"{_W_NS}tab": "\t",
+    f"{_W_NS}ptab": "\t",
+    f"{_W_NS}br": "\n",
+    f"{_W_NS}cr": "\n",
+    f"{_W_NS}noBreakHyphen": "-",
+}
+# Refuse to inflate documents whose main part is absurdly large (zip bombs).
+MAX_DOCUMENT_XML_BYTES = 256 * 1024 * 1024
+
+
+class DocxExtractionError(ValueError):
+    pass
+
+
+def extract_docx_text(data: bytes, max_xml_bytes: int = MAX_DOCUMENT_XML_BYTES) -> str:
+    """
+    Extract paragraph text from a .docx payload without building a document model.
+    `word/document.xml` is parsed incrementally straight from the zip stream; each
+    paragraph is emitted on its closing tag and its subtree cleared immediately.
+    """
+    try:
+        archive = zipfile.ZipFile(BytesIO(data))
+    except zipfile.BadZipFile as exc:
+        raise DocxExtractionError("not a zip archive") from exc
+
+    with archive:
+        try:
+            info = archive.getinfo("word/document.xml")
+        except KeyError as exc:
+            raise DocxExtractionError("missing word/document.xml") from exc
+        if info.file_size > max_xml_bytes:
+            raise DocxExtractionError(f"word/document.xml exceeds {max_xml_bytes} bytes")
+
+        paragraphs: List[str] = []
+        # Paragraphs can nest (text boxes); keep one buffer per open paragraph.
+        open_paragraphs: List[List[str]] = []
+        with archive.open(info) as stream:
+            try:
+                for event, elem in iterparse(stream, events=("start", "end")):
+                    tag = elem.tag
+                    if event == "start":
+                        if tag == _PARAGRAPH:
+                            open_paragraphs.append([])
+                        continue
+                    if not open_paragraphs:
+                        # Tables, section properties, etc.; their paragraphs are already emitted.
+                        elem.clear()
+                        continue
+                    if tag == _TEXT:
+                        if elem.text:
+                            open_paragraphs[-1].append(elem.text)
+                    elif tag in _INLINE_CHARS:
+                        open_paragraphs[-1].append(_INLINE_CHARS[tag])
+                    elif tag == _PARAGRAPH:
+                        paragraphs.append("".join(open_paragraphs.pop()))
+                        elem.clear()
+            except SyntaxError as exc:  # ParseError subclasses SyntaxError
+                raise DocxExtractionError(f"malformed document.xml: {exc}") from exc
+
+    return "\n".join(paragraphs)
@@ -1,28 +1,25 @@
-from io import BytesIO
+import time
 from pathlib import Path
 from typing import Tuple
 
-try:  # Optional import; only used for DOCX handling.
-    from docx import Document  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    Document = None  # type: ignore
+from backend.services.docx_extract import DocxExtractionError, extract_docx_text
 
 
 def decode_uploaded_file(filename: str | None, data: bytes) -> Tuple[str, str]:
     """
     Decode an uploaded file into plain text.
     Returns (text, reason) where reason is informative for logging.
+    CPU-bound for .docx; callers on the event loop should run it in an executor.
     """
     name = filename or ""
     ext = Path(name).suffix.lower()
 
-    if ext == ".docx" and Document is not None:
+    if ext == ".docx":
         try:
-            doc = Document(BytesIO(data))
-            text = "\n".join(p.text for p in doc.paragraphs)
+            text = extract_docx_text(data)
             if text.strip():
                 return text, "docx-parsed"
-        except Exception:
+        except DocxExtractionError:
             pass  # fall through to text decode
 
     # Fallback: try utf-8 then latin-1
@@ -30,3 +27,10 @@ def decode_uploaded_file(filename: str | None, data: bytes) -> Tuple[str, str]:
         return data.decode("utf-8"), "utf-8"
     except Exception:
         return data.decode("latin-1", errors="ignore"), "latin-1"
+
+
+def decode_uploaded_file_timed(filename: str | None, data: bytes) -> Tuple[str, str, float]:
+    """`decode_uploaded_file` plus the seconds it took, measured where it ran (i.e. in the pool worker)."""
+    started = time.perf_counter()
+    text, reason = decode_uploaded_file(filename, data)
+    return text, reason, time.perf_counter() - started
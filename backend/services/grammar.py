@@ -1,11 +1,15 @@
 import inspect
 import logging
 import os
+import re
 import threading
+import time
 from functools import lru_cache
 from pathlib import Path
 from typing import Any, List, Optional
 
+from backend.services.language_models import registry
+
 _lock = threading.Lock()
 logger = logging.getLogger(__name__)
 
@@ -32,8 +36,37 @@ def _resolve_language_tool_path(path: Optional[str]) -> Optional[str]:
     return None
 
 
-@lru_cache(maxsize=4)
-def get_language_tool(language: str = "en-US", path: Optional[str] = None) -> Any:
+def _close_tool(tool: Any) -> None:
+    try:
+        close = getattr(tool, "close", None)
+        if close:
+            close()
+    except Exception:  # pragma: no cover - best effort during shutdown
+        logger.debug("LanguageTool close failed", exc_info=True)
+
+
+def close_language_tools() -> None:
+    """Stop the LanguageTool servers this process started; worker processes exit without running atexit hooks."""
+    registry.clear("grammar")
+
+
+def get_language_tool(
+    language: str = "en-US", path: Optional[str] = None, server: str = "", footprint_bytes: int = 0
+) -> Any:
+    """
+    LanguageTool for `language`, kept in the model registry and charged `footprint_bytes`
+    (its server's JVM). With `server` (URL of a shared LanguageTool server) no local server
+    is started and nothing is charged.
+    """
+    return registry.get(
+        ("grammar", language, path or "", server),
+        lambda: _init_language_tool(language, path, server),
+        sizer=lambda tool: 0 if server else footprint_bytes,
+        closer=_close_tool,
+    )
+
+
+def _init_language_tool(language: str, path: Optional[str], server: str) -> Any:
     try:
         import language_tool_python  # type: ignore
     except ImportError as exc:
@@ -68,6 +101,18 @@ def get_language_tool(language: str = "en-US", path: Optional[str] = None) -> An
     except Exception:
         pass
 
+    if server:
+        try:
+            tool = language_tool_python.LanguageTool(language, remote_server=server)
+        except Exception as exc:
+            logger.error("LanguageTool server %s unavailable: %s", server, exc)
+            raise GrammarNotAvailable(f"LanguageTool server {server} could not be used. Reason: {exc}") from exc
+        if not hasattr(tool, "_new_spellings_persist"):
+            tool._new_spellings_persist = False  # type: ignore[attr-defined]
+        if not hasattr(tool, "_new_spellings"):
+            tool._new_spellings = []  # type: ignore[attr-defined]
+        return tool
+
     init_exc: Exception | None = None
     supports_path_arg = "path" in inspect.signature(language_tool_python.LanguageTool.__init__).parameters
     try:
@@ -123,3 +168,59 @@ def check_text(tool: Any, text: str) -> List[Any]:
     # language_tool_python instances are not guaranteed thread-safe
     with _lock:
         return tool.check(text)
+
+
+class _StubCategory:
+    def __init__(self, category_id: str):
+        self.id = category_id
+
+
+class _StubMatch:
+    """Mimics the attributes of `language_tool_python.Match` that the chunk worker reads."""
+
+    def __init__(self, offset: int, length: int, message: str, replacements: List[str], rule_id: str, category: str):
+        self.offset = offset
+        self.errorLength = length
+        self.message = message
+        self.replacements = replacements
+        self.ruleId = rule_id
+        self.category = _StubCategory(category)
+
+
+class StubLanguageTool:
+    """
+    Deterministic LanguageTool stand-in for benchmarks and machines without Java.
+
+    Flags a few fixed patterns and sleeps `latency_ms` per check plus `per_kchar_ms` per
+    1000 characters, approximating the round-trip cost of the real server.
+    """
+
+    _PATTERNS = [
+        (re.compile(r"\b(\w+) \1\b", re.IGNORECASE), "Possible typo: you repeated a word.", "ENGLISH_WORD_REPEAT_RULE", "MISC",
+         lambda m: [m.group(1)]),
+        (re.compile(r"\bteh\b"), "Possible spelling mistake found.", "MORFOLOGIK_RULE_EN_US", "TYPOS", lambda m: ["the"]),
+        (re.compile(r"\b(sentences|errors) (does|is)\b"), "Possible agreement error.", "AGREEMENT_SENT_START", "GRAMMAR",
+         lambda m: [f"{m.group(1)} {'do' if m.group(2) == 'does' else 'are'}"]),
+        (re.compile(r"  +"), "Possible typo: you repeated a whitespace", "WHITESPACE_RULE", "TYPOGRAPHY", lambda m: [" "]),
+    ]
+
+    def __init__(self, language: str = "en-US", latency_ms: float = 0.0, per_kchar_ms: float = 0.0):
+        self.language = language
+        self.latency_ms = latency_ms
+        self.per_kchar_ms = per_kchar_ms
+
+    def check(self, text: str) -> List[_StubMatch]:
+        delay = self.latency_ms + self.per_kchar_ms * len(text) / 1000.0
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        matches = []
+        for pattern, message, rule_id, category, replacements in self._PATTERNS:
+            for m in pattern.finditer(text):
+                matches.append(_StubMatch(m.start(), len(m.group()), message, replacements(m), rule_id, category))
+        matches.sort(key=lambda match: match.offset)
+        return matches
+
+
+@lru_cache(maxsize=4)
+def get_stub_language_tool(language: str = "en-US", latency_ms: float = 0.0, per_kchar_ms: float = 0.0) -> StubLanguageTool:
+    return StubLanguageTool(language, latency_ms=latency_ms, per_kchar_ms=per_kchar_ms)
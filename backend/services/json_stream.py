@@ -0,0 +1,228 @@
+"""
+Incremental parsing of `{"documents": [...], ...}` request bodies.
+
+`ObjectStreamParser` is fed the body as it arrives and yields each element of one array
+member as soon as its closing bracket has been read, plus the object's other members,
+so a 1000-document body never exists as one string, one parsed object tree and one
+validated model at the same time. Value boundaries are found with a resumable scan
+(strings are skipped with a regex, so the cost is linear in the body however it is
+split into chunks), and each complete value is decoded with `json.loads`.
+"""
+import codecs
+import json
+import re
+from typing import Any, Iterator, List, Optional, Tuple
+
+ITEM = "item"
+FIELD = "field"
+
+_WS = re.compile(r"[ \t\n\r]*")
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+_STRUCTURE = re.compile(r'["{}\[\]]')
+_SCALAR_END = re.compile(r"[,}\]\s]")
+
+# Parser states.
+_START, _KEY, _COLON, _VALUE, _AFTER_VALUE, _ITEM, _AFTER_ITEM, _END = range(8)
+
+
+class JSONStreamError(ValueError):
+    """The body is not a JSON object of the expected shape."""
+
+
+class ObjectStreamParser:
+    """
+    Feed bytes with `feed()` and iterate the events it returns: `("item", value)` for each element of
+    the `array_key` member, `("field", (key, value))` for every other member. `close()` checks that the
+    object was complete.
+    """
+
+    def __init__(self, array_key: str) -> None:
+        self.array_key = array_key
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._key: Optional[str] = None
+        self._expect_item = False  # after a comma inside the array: `]` is not allowed
+        # Resumable scan of the value starting at `_value_start`: position, nesting depth, inside a string.
+        self._value_start = -1
+        self._scan_pos = 0
+        self._depth = 0
+        self._in_string = False
+        self.array_seen = False
+
+    def feed(self, data: bytes) -> List[Tuple[str, Any]]:
+        self._buf = self._buf[self._consumed():] + self._decoder.decode(data)
+        self._rebase()
+        events: List[Tuple[str, Any]] = []
+        self._parse(events, final=False)
+        return events
+
+    def close(self) -> List[Tuple[str, Any]]:
+        self._buf = self._buf[self._consumed():] + self._decoder.decode(b"", final=True)
+        self._rebase()
+        events: List[Tuple[str, Any]] = []
+        self._parse(events, final=True)
+        if self._state != _END:
+            raise JSONStreamError("Incomplete JSON body")
+        return events
+
+    def _consumed(self) -> int:
+        return self._value_start if self._value_start >= 0 else self._pos
+
+    def _rebase(self) -> None:
+        # `feed` dropped the consumed prefix; shift every saved position by it.
+        shift = self._consumed()
+        self._pos -= shift
+        if self._value_start >= 0:
+            self._scan_pos -= shift
+            self._value_start = 0
+
+    def _skip_ws(self) -> bool:
+        """Advance past whitespace; False when the buffer is exhausted."""
+        self._pos = _WS.match(self._buf, self._pos).end()
+        return self._pos < len(self._buf)
+
+    def _parse(self, events: List[Tuple[str, Any]], final: bool) -> None:
+        buf = self._buf
+        while True:
+            if self._state in (_VALUE, _ITEM) and self._value_start >= 0:
+                value = self._scan_value(final)
+                if value is _INCOMPLETE:
+                    return
+                if self._state == _ITEM:
+                    events.append((ITEM, value))
+                    self._state = _AFTER_ITEM
+                else:
+                    events.append((FIELD, (self._key, value)))
+                    self._state = _AFTER_VALUE
+                continue
+            if not self._skip_ws():
+                return
+            char = buf[self._pos]
+            if self._state == _START:
+                self._expect(char, "{")
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char == "}" and self._key is None:
+                    self._pos += 1
+                    self._state = _END
+                    continue
+                self._expect(char, '"', consume=False)
+                end = self._string_end(self._pos + 1)
+                if end is None:
+                    if final:
+                        raise JSONStreamError("Incomplete JSON body")
+                    return
+                self._key = json.loads(buf[self._pos : end])
+                self._pos = end
+                self._state = _COLON
+            elif self._state == _COLON:
+                self._expect(char, ":")
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if self._key != self.array_key:
+                    self._begin_value()
+                    continue
+                if char != "[":
+                    raise JSONStreamError(f"'{self.array_key}' must be an array")
+                self._pos += 1
+                self.array_seen = True
+                self._state = _ITEM
+                self._expect_item = False
+            elif self._state == _ITEM:
+                if char == "]" and not self._expect_item:
+                    self._pos += 1
+                    self._state = _AFTER_VALUE
+                else:
+                    self._begin_value()
+            elif self._state == _AFTER_ITEM:
+                if char == "]":
+                    self._state = _AFTER_VALUE
+                    self._pos += 1
+                else:
+                    self._expect(char, ",")
+                    self._state = _ITEM
+                    self._expect_item = True
+            elif self._state == _AFTER_VALUE:
+                if char == "}":
+                    self._pos += 1
+                    self._state = _END
+                else:
+                    self._expect(char, ",")
+                    self._state = _KEY
+            else:  # _END: only whitespace may follow
+                raise JSONStreamError("Unexpected data after the JSON object")
+
+    def _expect(self, char: str, wanted: str, consume: bool = True) -> None:
+        if char != wanted:
+            raise JSONStreamError(f"Expected '{wanted}' at body offset {self._pos}, found '{char}'")
+        if consume:
+            self._pos += 1
+
+    def _string_end(self, pos: int) -> Optional[int]:
+        """Index just past the closing quote of the string whose body starts at `pos`, or None if incomplete."""
+        end = _STRING_BODY.match(self._buf, pos).end()
+        return end + 1 if end < len(self._buf) and self._buf[end] == '"' else None
+
+    def _begin_value(self) -> None:
+        self._value_start = self._scan_pos = self._pos
+        self._depth = 0
+        self._in_string = False
+
+    def _scan_value(self, final: bool) -> Any:
+        buf, pos = self._buf, self._scan_pos
+        if pos == self._value_start and pos < len(buf) and buf[pos] not in '{["':
+            match = _SCALAR_END.search(buf, pos)
+            if match is None and not final:
+                return _INCOMPLETE
+            return self._decode(match.start() if match else len(buf))
+        while True:
+            if self._in_string:
+                end = _STRING_BODY.match(buf, pos).end()
+                if end >= len(buf) or buf[end] != '"':  # not closed yet (possibly mid-escape)
+                    self._scan_pos = end
+                    return self._incomplete(final)
+                pos = end + 1  # the closing quote
+                self._in_string = False
+                if self._depth == 0:
+                    return self._decode(pos)
+                continue
+            match = _STRUCTURE.search(buf, pos)
+            if match is None:
+                self._scan_pos = len(buf)
+                return self._incomplete(final)
+            pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return self._decode(pos)
+
+    def _incomplete(self, final: bool) -> Any:
+        if final:
+            raise JSONStreamError("Incomplete JSON body")
+        return _INCOMPLETE
+
+    def _decode(self, end: int) -> Any:
+        try:
+            value = json.loads(self._buf[self._value_start : end])
+        except ValueError as exc:
+            raise JSONStreamError(f"Invalid JSON value at body offset {self._value_start}: {exc}") from None
+        self._pos = end
+        self._value_start = -1
+        return value
+
+
+_INCOMPLETE = object()
+
+
+def iter_events(parser: ObjectStreamParser, chunks: Iterator[bytes]) -> Iterator[Tuple[str, Any]]:
+    """Synchronous helper: run `chunks` through `parser`."""
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
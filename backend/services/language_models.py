@@ -0,0 +1,159 @@
+"""
+Per-process registry of language models (lexicons and grammar backends).
+
+Models are loaded on first use and keyed by the resources they are built from, so
+languages that resolve to the same resource (en-US and en-GB on the `en` word list)
+share one instance. Each model is charged its estimated footprint; once the total
+exceeds `budget_bytes` the least recently used models are evicted, except those held by
+a document in progress (see `hold`). Evicting a grammar tool closes it, which stops its
+LanguageTool server.
+"""
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+Key = Tuple[Hashable, ...]
+
+
+class _Entry:
+    __slots__ = ("model", "size", "closer", "holds")
+
+    def __init__(self, model: Any, size: int, closer: Optional[Callable[[Any], None]]) -> None:
+        self.model = model
+        self.size = size
+        self.closer = closer
+        self.holds = 0
+
+
+class ModelRegistry:
+    """
+    LRU of loaded models under a byte budget (0 = unbounded). Keys are tuples whose first
+    element is the model kind (`"lexicon"`, `"grammar"`); a model larger than the whole
+    budget is still loaded and kept until something else needs the room.
+    """
+
+    def __init__(self, budget_bytes: int = 0) -> None:
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Key, _Entry]" = OrderedDict()
+        self._loading: Dict[Key, threading.Lock] = {}
+        self._bytes = 0
+        self._local = threading.local()
+        self.counters = {"loads": 0, "hits": 0, "evictions": 0, "evicted_bytes": 0}
+
+    def configure(self, budget_bytes: int) -> None:
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            evicted = self._evict_locked()
+        self._close(evicted)
+
+    def get(
+        self,
+        key: Key,
+        loader: Callable[[], Any],
+        sizer: Callable[[Any], int] = lambda model: 0,
+        closer: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Return the model for `key`, loading it with `loader` (once, even under concurrent callers)."""
+        with self._lock:
+            entry = self._hit_locked(key)
+            if entry is not None:
+                return entry.model
+            gate = self._loading.setdefault(key, threading.Lock())
+        with gate:
+            with self._lock:
+                entry = self._hit_locked(key)
+                if entry is not None:
+                    return entry.model
+            model = loader()  # raises through; failures are not cached
+            size = max(0, int(sizer(model)))
+            with self._lock:
+                entry = self._entries[key] = _Entry(model, size, closer)
+                self._bytes += size
+                self.counters["loads"] += 1
+                self._hold_locked(key, entry)
+                self._loading.pop(key, None)
+                evicted = self._evict_locked(keep=key)
+        self._close(evicted)
+        return model
+
+    def _hit_locked(self, key: Key) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            self._hold_locked(key, entry)
+        return entry
+
+    def _hold_locked(self, key: Key, entry: _Entry) -> None:
+        held = getattr(self._local, "held", None)
+        if held is not None and key not in held:
+            held[key] = entry
+            entry.holds += 1
+
+    def _evict_locked(self, keep: Optional[Key] = None) -> List[_Entry]:
+        evicted: List[_Entry] = []
+        if not self.budget_bytes:
+            return evicted
+        for key in list(self._entries):
+            if self._bytes <= self.budget_bytes:
+                break
+            entry = self._entries[key]
+            if key == keep or entry.holds:
+                continue
+            del self._entries[key]
+            self._bytes -= entry.size
+            self.counters["evictions"] += 1
+            self.counters["evicted_bytes"] += entry.size
+            evicted.append(entry)
+        return evicted
+
+    @staticmethod
+    def _close(entries: List[_Entry]) -> None:
+        for entry in entries:
+            if entry.closer is not None:
+                try:
+                    entry.closer(entry.model)
+                except Exception:  # pragma: no cover - best effort
+                    pass
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        """Pin every model this thread gets inside the block until it exits (one document's lifetime)."""
+        outer = getattr(self._local, "held", None)
+        if outer is not None:  # nested: the outer hold already covers it
+            yield
+            return
+        held: Dict[Key, _Entry] = {}
+        self._local.held = held
+        try:
+            yield
+        finally:
+            self._local.held = None
+            with self._lock:
+                for entry in held.values():
+                    entry.holds -= 1
+                evicted = self._evict_locked()
+            self._close(evicted)
+
+    def clear(self, kind: Optional[str] = None) -> None:
+        """Drop (and close) every model, or every model of one kind, regardless of holds."""
+        with self._lock:
+            keys = [key for key in self._entries if kind is None or key[0] == kind]
+            dropped = [self._entries.pop(key) for key in keys]
+            self._bytes -= sum(entry.size for entry in dropped)
+        self._close(dropped)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "models": [":".join(str(part) for part in key) for key in self._entries],
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+            }
+
+
+# One registry per process (each pool worker has its own).
+registry = ModelRegistry()
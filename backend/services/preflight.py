@@ -0,0 +1,85 @@
+import re
+import unicodedata
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional
+
+# Same words as `chunk_worker.WORD_RE`: letters of any script, so de/fr text scores against its own lexicon.
+_TOKEN_RE = re.compile(r"[^\W\d_]+(?:['-]+[^\W\d_]*)*")
+# Dictionary hit rate is only meaningful with a real lexicon, not the tiny fallback list.
+MIN_LEXICON_SIZE = 5000
+MIN_SAMPLE_TOKENS = 20
+
+
+@dataclass(frozen=True)
+class PlausibilityReport:
+    """Cheap plausibility scores for decoded text, computed on a bounded sample."""
+
+    sampled_chars: int
+    control_char_ratio: float
+    letter_ratio: float
+    sampled_tokens: int
+    dictionary_hit_rate: Optional[float]
+    plausible: bool
+    reason: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _sample(text: str, sample_chars: int) -> str:
+    """Take head, middle and tail windows so a valid preamble cannot mask a binary body."""
+    if len(text) <= sample_chars:
+        return text
+    window = sample_chars // 3
+    mid = len(text) // 2
+    return "\n".join((text[:window], text[mid - window // 2 : mid + window // 2], text[-window:]))
+
+
+def assess_text(
+    text: str,
+    is_word: Callable[[str], bool] | None = None,
+    sample_chars: int = 8192,
+    max_control_ratio: float = 0.02,
+    min_letter_ratio: float = 0.5,
+    min_dictionary_hit_rate: float = 0.3,
+) -> PlausibilityReport:
+    sample = _sample(text, sample_chars)
+    control = 0
+    visible = 0
+    letters = 0
+    for ch in sample:
+        if ch.isspace():
+            continue
+        if unicodedata.category(ch)[0] == "C":
+            control += 1
+            continue
+        visible += 1
+        if ch.isalpha():
+            letters += 1
+
+    non_space = control + visible
+    control_ratio = control / non_space if non_space else 0.0
+    letter_ratio = letters / non_space if non_space else 1.0
+
+    tokens: List[str] = _TOKEN_RE.findall(sample) if is_word is not None else []
+    hit_rate = None
+    if len(tokens) >= MIN_SAMPLE_TOKENS:
+        hit_rate = sum(1 for t in tokens if is_word(t)) / len(tokens)  # type: ignore[misc]
+
+    reason = None
+    if control_ratio > max_control_ratio:
+        reason = "control_chars"
+    elif letter_ratio < min_letter_ratio:
+        reason = "non_letter"
+    elif hit_rate is not None and hit_rate < min_dictionary_hit_rate:
+        reason = "low_dictionary_hits"
+
+    return PlausibilityReport(
+        sampled_chars=len(sample),
+        control_char_ratio=round(control_ratio, 4),
+        letter_ratio=round(letter_ratio, 4),
+        sampled_tokens=len(tokens),
+        dictionary_hit_rate=round(hit_rate, 4) if hit_rate is not None else None,
+        plausible=reason is None,
+        reason=reason,
+    )
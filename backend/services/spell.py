@@ -1,15 +1,14 @@
+import hashlib
 import json
+import logging
 import re
-from functools import lru_cache
+import sys
 from pathlib import Path
 from typing import Dict, Iterable, List, Sequence, Tuple
 
-try:
-    # Lightweight frequency lists shipped in the wheel; avoids needing a local dictionary file.
-    from wordfreq import top_n_list, zipf_frequency
-except Exception:  # pragma: no cover - optional dependency
-    top_n_list = None  # type: ignore
-    zipf_frequency = None  # type: ignore
+from backend.services.language_models import registry
+
+logger = logging.getLogger(__name__)
 
 
 # Domain expansion: academic, mental health, tech, common compounds (US/UK variants).
@@ -160,15 +159,56 @@ class BKTree:
         return results
 
 
-def load_dictionary(dictionary_path: str) -> Tuple[Sequence[str], Dict[str, int]]:
+def lexicon_language(language: str) -> str:
+    """Primary subtag of a language tag (`en-GB` → `en`); regional variants share one word list."""
+    return (language or "en").replace("_", "-").split("-", 1)[0].lower()
+
+
+def dictionary_path_for(language: str, default_language: str, default_path: str, overrides: str = "") -> str:
+    """
+    Dictionary file for `language`: an entry of `overrides` (`"de=path,fr=path"`, matched on the
+    full tag, then the primary subtag), else `default_path` when `language` shares the default
+    language's primary subtag, else "" (no file: the `wordfreq` list for that language).
+    """
+    wanted = (language or "").lower()
+    paths: Dict[str, str] = {}
+    for item in overrides.split(","):
+        tag, sep, path = item.partition("=")
+        if sep and tag.strip() and path.strip():
+            paths[tag.strip().lower()] = path.strip()
+    path = paths.get(wanted) or paths.get(lexicon_language(wanted))
+    if path:
+        return path
+    if lexicon_language(wanted) == lexicon_language(default_language):
+        return default_path
+    return ""
+
+
+def _wordfreq_lexicon(n: int = 50000, lang: str = "en") -> Tuple[List[str], Dict[str, int]] | None:
+    """Top-n words of `lang` from `wordfreq` (imported only when no dictionary file exists)."""
+    try:
+        # Lightweight frequency lists shipped in the wheel; avoids needing a local dictionary file.
+        from wordfreq import top_n_list, zipf_frequency
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    try:
+        words = top_n_list(lang, n=n, wordlist="best")
+    except LookupError:  # language not covered by wordfreq
+        return None
+    if not words:
+        return None
+    return words, {w.lower(): int(zipf_frequency(w, lang) * 100) for w in words}
+
+
+def load_dictionary(dictionary_path: str, lang: str = "en") -> Tuple[Sequence[str], Dict[str, int]]:
     """
     Load a JSON dictionary file containing either a list or dict of words.
 
     If the configured dictionary is missing, we fall back to the `wordfreq` package
-    (shipped with frequency lists) to avoid flagging nearly every word as a misspelling.
+    (shipped with frequency lists for `lang`) to avoid flagging nearly every word as a misspelling.
     """
     path = Path(dictionary_path)
-    if path.exists():
+    if dictionary_path and path.exists():
         data = json.loads(path.read_text(encoding="utf-8"))
         if isinstance(data, dict):
             words = list(data.keys())
@@ -181,11 +221,12 @@ def load_dictionary(dictionary_path: str) -> Tuple[Sequence[str], Dict[str, int]
         return words, freq
 
     # Dictionary file missing — try wordfreq for a robust built-in lexicon.
-    if top_n_list and zipf_frequency:
-        words = top_n_list("en", n=50000, wordlist="best")
-        frequencies = {w.lower(): int(zipf_frequency(w, "en") * 100) for w in words}
-        return words, frequencies
+    lexicon = _wordfreq_lexicon(lang=lang)
+    if lexicon is not None:
+        return lexicon
 
+    if lang != "en":
+        logger.warning("No dictionary for language '%s'; using the built-in English fallback list", lang)
     # Last-resort fallback: small hand-curated list to keep the service running.
     fallback = [
         "a", "an", "and", "another", "content", "contain", "document", "errors", "example",
@@ -196,12 +237,34 @@ def load_dictionary(dictionary_path: str) -> Tuple[Sequence[str], Dict[str, int]
     return fallback, {w: 10 for w in fallback}
 
 
+def _rank_candidates(
+    word: str, candidates: List[Tuple[str, int]], freq: Dict[str, int], limit: int, default_freq: int = 0
+) -> List[str]:
+    # Sort by: distance, frequency, length, alphabetical
+    candidates.sort(
+        key=lambda x: (
+            x[1],                                  # smaller distance better
+            -freq.get(x[0], default_freq),         # higher frequency better
+            len(x[0]),                             # shorter length preferred
+            x[0]                                   # alphabetical tie-breaker
+        )
+    )
+
+    out = [term for term, _ in candidates[:limit]]
+    # Preserve casing style of the input for the top suggestion set.
+    if word[:1].isupper():
+        out = [s.capitalize() for s in out]
+    return out
+
+
 class SpellChecker:
     def __init__(self, words: Iterable[str], frequencies: Dict[str, int] | None = None, max_distance: int = 2):
         self.dictionary = {w.lower() for w in words}
         self.freq = {k.lower(): v for k, v in (frequencies or {}).items()}
         self.tree = BKTree()
         self.max_distance = max_distance
+        # Identifies the word list (set by `get_spell_checker`); recorded with every result.
+        self.version = ""
         for word in self.dictionary:
             self.tree.insert(word)
 
@@ -213,35 +276,76 @@ class SpellChecker:
         word_lower = word.lower().strip(".,!?;:'\"")
         if not word_lower:
             return []
+        return _rank_candidates(word, self.tree.search(word_lower, self.max_distance), self.freq, limit)
+
+    def approx_bytes(self) -> int:
+        """Shallow sizes of the word set, frequency map and every BK-tree node (what the registry charges)."""
+        total = sys.getsizeof(self.dictionary) + sys.getsizeof(self.freq)
+        stack = [self.tree.root] if self.tree.root is not None else []
+        while stack:
+            node = stack.pop()
+            total += sys.getsizeof(node) + sys.getsizeof(node.__dict__) + sys.getsizeof(node.children)
+            total += sys.getsizeof(node.term)
+            stack.extend(node.children.values())
+        return total
+
+
+def _build_spell_checker(dictionary_path: str, lang: str, max_distance: int) -> SpellChecker:
+    words, freq = load_dictionary(dictionary_path, lang)
+    if lang == "en":
+        # Expand dictionary with domain/compound words; keep simple frequency boost.
+        words = list(words) + list(EXTRA_WORDS)
+        for w in EXTRA_WORDS:
+            freq.setdefault(w.lower(), 10)
+    checker = SpellChecker(words, freq, max_distance=max_distance)
+    digest = hashlib.blake2b("\n".join(sorted(checker.dictionary)).encode("utf-8"), digest_size=6).hexdigest()
+    checker.version = f"{lang}-{digest}"
+    return checker
+
+
+def get_spell_checker(dictionary_path: str, max_distance: int = 2, language: str = "en-US") -> SpellChecker:
+    """SpellChecker for `language` from a JSON dictionary file (or `wordfreq`), shared via the model registry."""
+    lang = lexicon_language(language)
+    return registry.get(
+        ("lexicon", lang, dictionary_path, max_distance),
+        lambda: _build_spell_checker(dictionary_path, lang, max_distance),
+        sizer=SpellChecker.approx_bytes,
+    )
+
+
+class LexiconOverlay:
+    """
+    Custom words over a shared base `SpellChecker`: `added` words are accepted and
+    suggested, `removed` ones are flagged, and the base BK-tree is never touched. The
+    overlay's own tree holds only the added words, so building one is cheap.
+    """
 
-        candidates = self.tree.search(word_lower, self.max_distance)
+    # Frequency given to added words when ranking suggestions (same boost as EXTRA_WORDS).
+    ADDED_WORD_FREQ = 10
 
-        # Sort by: distance, frequency, length, alphabetical
-        candidates.sort(
-            key=lambda x: (
-                x[1],                          # smaller distance better
-                -self.freq.get(x[0], 0),       # higher frequency better
-                len(x[0]),                     # shorter length preferred
-                x[0]                           # alphabetical tie-breaker
-            )
-        )
+    def __init__(self, base: SpellChecker, added: Iterable[str], removed: Iterable[str] = (), version: str = ""):
+        self.base = base
+        self.added = {w.lower() for w in added}
+        self.removed = {w.lower() for w in removed} - self.added
+        self.max_distance = base.max_distance
+        self.version = version
+        self.tree = BKTree()
+        for word in self.added - base.dictionary:
+            self.tree.insert(word)
 
-        out = [term for term, _ in candidates[:limit]]
-        # Preserve casing style of the input for the top suggestion set.
-        if word[:1].isupper():
-            out = [s.capitalize() for s in out]
-        return out
-
-
-@lru_cache(maxsize=4)
-def get_spell_checker(dictionary_path: str, max_distance: int = 2) -> SpellChecker:
-    """Load a SpellChecker instance from a JSON dictionary file."""
-    words, freq = load_dictionary(dictionary_path)
-    # Expand dictionary with domain/compound words; keep simple frequency boost.
-    expanded_words = list(words) + list(EXTRA_WORDS)
-    for w in EXTRA_WORDS:
-        freq.setdefault(w.lower(), 10)
-    return SpellChecker(expanded_words, freq, max_distance=max_distance)
+    def is_correct(self, word: str) -> bool:
+        lower = word.lower()
+        return lower in self.added or (lower not in self.removed and lower in self.base.dictionary)
+
+    def suggest(self, word: str, limit: int = 5) -> List[str]:
+        word_lower = word.lower().strip(".,!?;:'\"")
+        if not word_lower:
+            return []
+        candidates = self.base.tree.search(word_lower, self.max_distance)
+        if self.removed:
+            candidates = [c for c in candidates if c[0] not in self.removed]
+        candidates.extend(self.tree.search(word_lower, self.max_distance))
+        return _rank_candidates(word, candidates, self.base.freq, limit, self.ADDED_WORD_FREQ)
 
 
 # import json
@@ -1,7 +1,17 @@
 import os
+import re
+import sqlite3
+import threading
+import time
 import uuid
+import zlib
+from collections import OrderedDict
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Dict, Iterable, List, Tuple
+
+from backend.config import Settings
+
+_CACHE_KEY_RE = re.compile(r"[0-9a-f]{8,64}(\.[a-z]+)?")
 
 
 def _ensure_dir(path: Path) -> None:
@@ -39,3 +49,408 @@ def read_file_bytes(storage_root: str, file_id: str) -> bytes:
     if not path.exists():
         raise FileNotFoundError(f"file_id '{file_id}' not found in storage")
     return path.read_bytes()
+
+
+class ContentCache:
+    """
+    Byte-budgeted LRU of zlib-compressed text for on-demand editor loads.
+
+    Entries past the memory budget are spilled to `spill_dir` instead of being dropped,
+    and `flush()` spills the hot set so contents survive a restart. Entries expire after
+    `ttl_seconds` in either tier. Spill files are written and read outside the lock (an
+    evicted entry is still served from memory until its file is in place); only renames
+    and unlinks happen under it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        spill_dir: str | None = None,
+        ttl_seconds: float = 0,
+        max_items: int = 0,
+        max_spill_bytes: int = 0,
+        compress_level: int = 1,
+    ):
+        self.max_bytes = max(1, max_bytes)
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.max_spill_bytes = max_spill_bytes
+        self.compress_level = compress_level
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self._lock = threading.Lock()
+        # key -> (compressed payload, stored_at)
+        self._store: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        # Evicted entries whose spill file is being written: key -> (payload, stored_at).
+        self._spilling: Dict[str, Tuple[bytes, float]] = {}
+        # key -> size on disk, oldest first
+        self._spilled: "OrderedDict[str, int]" = OrderedDict()
+        self._spilled_bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "spills": 0, "spill_hits": 0, "expired": 0}
+        if self.spill_dir is not None:
+            _ensure_dir(self.spill_dir)
+            self._load_spill_index()
+
+    def _load_spill_index(self) -> None:
+        entries = []
+        for path in self.spill_dir.glob("*.tmp"):  # type: ignore[union-attr]
+            path.unlink(missing_ok=True)  # a write interrupted by a crash
+        for path in self.spill_dir.glob("*.z"):  # type: ignore[union-attr]
+            stat = path.stat()
+            if self._expired(stat.st_mtime):
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._spilled[key] = size
+            self._spilled_bytes += size
+
+    def _spill_path(self, key: str) -> Path | None:
+        # Keys come from URLs; only plain hex ids ever map to a file.
+        if self.spill_dir is None or not _CACHE_KEY_RE.fullmatch(key):
+            return None
+        return self.spill_dir / f"{key}.z"
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - stored_at > self.ttl_seconds
+
+    def put(self, key: str, value: str) -> None:
+        payload = zlib.compress(value.encode("utf-8"), self.compress_level)
+        with self._lock:
+            old = self._store.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            # A spilled (or spilling) copy is stale now; a pending write sees it is gone and discards its file.
+            self._spilling.pop(key, None)
+            if key in self._spilled:
+                self._drop_spill_locked(key)
+            self._store[key] = (payload, time.time())
+            self._bytes += len(payload)
+            evicted = self._evict_locked()
+        for evicted_key, evicted_payload, stored_at in evicted:
+            self._spill(evicted_key, evicted_payload, stored_at)
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None:
+                if self._expired(entry[1]):
+                    self._store.pop(key)
+                    self._bytes -= len(entry[0])
+                    self.counters["expired"] += 1
+                    self.counters["misses"] += 1
+                    return None
+                self._store.move_to_end(key)
+                self.counters["hits"] += 1
+                return zlib.decompress(entry[0]).decode("utf-8")
+            entry = self._spilling.get(key)
+            if entry is not None and not self._expired(entry[1]):
+                self.counters["hits"] += 1
+                self.counters["spill_hits"] += 1
+                return zlib.decompress(entry[0]).decode("utf-8")
+            path = self._spill_path(key) if key in self._spilled else None
+        payload = self._read_spill(key, path) if path is not None else None
+        with self._lock:
+            if payload is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            self.counters["spill_hits"] += 1
+        return zlib.decompress(payload).decode("utf-8")
+
+    def contains(self, key: str) -> bool:
+        """Cheap availability check (no decompression, no counters)."""
+        with self._lock:
+            entry = self._store.get(key) or self._spilling.get(key)
+            if entry is not None:
+                return not self._expired(entry[1])
+            return key in self._spilled
+
+    def _read_spill(self, key: str, path: Path) -> bytes | None:
+        try:
+            if self._expired(path.stat().st_mtime):
+                with self._lock:
+                    if key in self._spilled:
+                        self._drop_spill_locked(key)
+                    self.counters["expired"] += 1
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                if key in self._spilled and not path.exists():
+                    self._spilled_bytes -= self._spilled.pop(key, 0)
+            return None
+
+    def _evict_locked(self) -> List[Tuple[str, bytes, float]]:
+        """Drop entries past the budget; returns the ones to spill (now in `_spilling`)."""
+        evicted = []
+        while self._store and (
+            self._bytes > self.max_bytes or (self.max_items and len(self._store) > self.max_items)
+        ):
+            key, (payload, stored_at) = self._store.popitem(last=False)
+            self._bytes -= len(payload)
+            self.counters["evictions"] += 1
+            if not self._expired(stored_at) and self._spill_path(key) is not None:
+                self._spilling[key] = (payload, stored_at)
+                evicted.append((key, payload, stored_at))
+        return evicted
+
+    def _spill(self, key: str, payload: bytes, stored_at: float) -> None:
+        """Write `payload` to a temporary file, then rename it into place if it is still the current copy."""
+        path = self._spill_path(key)
+        if path is None:
+            return
+        partial = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            partial.write_bytes(payload)
+            os.utime(partial, (stored_at, stored_at))
+        except OSError:
+            partial.unlink(missing_ok=True)
+            with self._lock:
+                if self._spilling.get(key, (None,))[0] is payload:
+                    del self._spilling[key]
+            return
+        with self._lock:
+            pending = self._spilling.get(key)
+            stored = self._store.get(key)
+            current = (pending is not None and pending[0] is payload) or (stored is not None and stored[0] is payload)
+            if current:
+                if pending is not None and pending[0] is payload:
+                    del self._spilling[key]
+                os.replace(partial, path)
+                self._spilled_bytes -= self._spilled.pop(key, 0)
+                self._spilled[key] = len(payload)
+                self._spilled_bytes += len(payload)
+                self.counters["spills"] += 1
+                while self.max_spill_bytes and self._spilled_bytes > self.max_spill_bytes and len(self._spilled) > 1:
+                    self._drop_spill_locked(next(iter(self._spilled)))
+        if not current:
+            partial.unlink(missing_ok=True)  # re-put or dropped while it was being written
+
+    def _drop_spill_locked(self, key: str) -> None:
+        self._spilled_bytes -= self._spilled.pop(key, 0)
+        path = self._spill_path(key)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def flush(self) -> None:
+        """Spill every live in-memory entry (call on shutdown so contents survive a restart)."""
+        with self._lock:
+            entries = [(key, payload, stored_at) for key, (payload, stored_at) in self._store.items()]
+            entries.extend((key, payload, stored_at) for key, (payload, stored_at) in self._spilling.items())
+        for key, payload, stored_at in entries:
+            if not self._expired(stored_at):
+                self._spill(key, payload, stored_at)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "items": len(self._store),
+                "bytes": self._bytes,
+                "spilled_items": len(self._spilled),
+                "spilled_bytes": self._spilled_bytes,
+                "backend": "memory",
+            }
+
+
+class SQLiteContentStore:
+    """
+    Content store shared by every API process on the box (`uvicorn --workers N`).
+
+    One SQLite file in WAL mode: readers never block each other or the writer, lookups
+    are primary-key probes, and reads go through SQLite's memory map rather than
+    buffered file reads. Payloads are zlib-compressed like `ContentCache`. Triggers keep
+    the row count and payload bytes in a one-row totals table, so `stats()` and the
+    `max_bytes` budget (oldest entries deleted past it) never scan the table.
+    """
+
+    _SWEEP_EVERY = 256
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 0,
+        max_bytes: int = 0,
+        compress_level: int = 1,
+        mmap_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.path = Path(path)
+        _ensure_dir(self.path.parent)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        self._puts = 0
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS content (key TEXT PRIMARY KEY, payload BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS content_stored_at ON content (stored_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS content_totals "
+                "(id INTEGER PRIMARY KEY CHECK (id = 0), items INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+            )
+            # Seeded once from the rows a store created before the totals table already holds.
+            conn.execute(
+                "INSERT OR IGNORE INTO content_totals "
+                "SELECT 0, COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM content"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS content_inserted AFTER INSERT ON content BEGIN "
+                "UPDATE content_totals SET items = items + 1, bytes = bytes + LENGTH(NEW.payload); END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS content_updated AFTER UPDATE OF payload ON content BEGIN "
+                "UPDATE content_totals SET bytes = bytes - LENGTH(OLD.payload) + LENGTH(NEW.payload); END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS content_deleted AFTER DELETE ON content BEGIN "
+                "UPDATE content_totals SET items = items - 1, bytes = bytes - LENGTH(OLD.payload); END"
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+            self._local.conn = conn
+        return conn
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+
+    def _totals(self) -> Tuple[int, int]:
+        return self._conn().execute("SELECT items, bytes FROM content_totals").fetchone() or (0, 0)
+
+    def put(self, key: str, value: str) -> None:
+        payload = zlib.compress(value.encode("utf-8"), self.compress_level)
+        conn = self._conn()
+        # An upsert rather than INSERT OR REPLACE: REPLACE's implicit delete does not fire the delete trigger.
+        conn.execute(
+            "INSERT INTO content (key, payload, stored_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET payload = excluded.payload, stored_at = excluded.stored_at",
+            (key, payload, time.time()),
+        )
+        self._puts += 1
+        if self.ttl_seconds and self._puts % self._SWEEP_EVERY == 0:
+            conn.execute("DELETE FROM content WHERE stored_at < ?", (self._cutoff(),))
+        if self.max_bytes:
+            self._evict(conn, key)
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> None:
+        """Delete the oldest entries (never `keep`, the one just stored) until the payloads fit `max_bytes`."""
+        while self._totals()[1] > self.max_bytes:
+            deleted = conn.execute(
+                "DELETE FROM content WHERE key = (SELECT key FROM content WHERE key != ? ORDER BY stored_at LIMIT 1)",
+                (keep,),
+            ).rowcount
+            if deleted <= 0:
+                return
+            self.counters["evictions"] += 1
+
+    def get(self, key: str) -> str | None:
+        row = self._conn().execute("SELECT payload, stored_at FROM content WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.counters["misses"] += 1
+            return None
+        if row[1] < self._cutoff():
+            self.counters["expired"] += 1
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def contains(self, key: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM content WHERE key = ? AND stored_at >= ?", (key, self._cutoff())
+        ).fetchone()
+        return row is not None
+
+    def flush(self) -> None:
+        self._conn().execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def stats(self) -> dict:
+        items, stored = self._totals()
+        return {**self.counters, "backend": "sqlite", "items": items, "bytes": stored, "max_bytes": self.max_bytes}
+
+
+def open_content_store(settings: Settings) -> "ContentCache | SQLiteContentStore":
+    """Build the configured content store (`CONTENT_STORE=memory|sqlite`)."""
+    if settings.content_store == "sqlite":
+        return SQLiteContentStore(
+            os.path.join(settings.storage_root, "content.sqlite3"),
+            ttl_seconds=settings.content_cache_ttl_seconds,
+            max_bytes=settings.content_cache_disk_bytes,
+        )
+    if settings.content_store != "memory":
+        raise ValueError(f"Unknown CONTENT_STORE '{settings.content_store}' (expected 'memory' or 'sqlite')")
+    return ContentCache(
+        settings.content_cache_bytes,
+        spill_dir=os.path.join(settings.storage_root, "content_cache") if settings.content_cache_spill else None,
+        ttl_seconds=settings.content_cache_ttl_seconds,
+        max_items=settings.content_cache_items,
+        max_spill_bytes=settings.content_cache_disk_bytes,
+    )
+
+
+class ExportStore:
+    """
+    Saved analysis results for bulk export: one JSONL file per export id under `root`
+    (`reports.jsonl_record_pieces` lines, the same shape as the batch CLI's `results.jsonl`).
+    Files older than `ttl_seconds` are removed when new exports are saved.
+    """
+
+    _ID_RE = re.compile(r"[0-9a-f]{32}")
+
+    def __init__(self, root: str, ttl_seconds: float = 0):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+
+    def path(self, export_id: str) -> Path | None:
+        """File of `export_id`, or None for an unknown, malformed or expired id."""
+        if not self._ID_RE.fullmatch(export_id):
+            return None
+        path = self.root / f"{export_id}.jsonl"
+        try:
+            stored_at = path.stat().st_mtime
+        except OSError:
+            return None
+        if self.ttl_seconds and time.time() - stored_at > self.ttl_seconds:
+            return None
+        return path
+
+    def save(self, records: Iterable[Iterable[str]]) -> str:
+        """Write JSONL records, each given as its text pieces (no newline), under a new export id; returns the id."""
+        _ensure_dir(self.root)
+        self.sweep()
+        export_id = uuid.uuid4().hex
+        path = self.root / f"{export_id}.jsonl"
+        partial = path.with_suffix(".tmp")
+        with open(partial, "w", encoding="utf-8") as handle:
+            for record in records:
+                handle.writelines(record)
+                handle.write("\n")
+        os.replace(partial, path)
+        return export_id
+
+    def sweep(self) -> None:
+        if not self.ttl_seconds:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        for path in self.root.glob("*.jsonl"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
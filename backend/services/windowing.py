@@ -0,0 +1,118 @@
+"""
+Offset indexes for serving windows of large documents.
+
+An index is built once per document (one pass to find line starts, one parse of the
+stored issues) and cached; each window request is then a couple of binary searches
+plus work proportional to the window itself.
+"""
+import json
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from backend.processing.results import IssueColumns
+
+
+def issues_key(content_id: str) -> str:
+    """Content-store key under which a document's issues are kept next to its text."""
+    return f"{content_id}.issues"
+
+
+def line_start_offsets(text: str) -> array:
+    offsets = array("q", [0])
+    find = text.find
+    idx = find("\n")
+    while idx != -1:
+        offsets.append(idx + 1)
+        idx = find("\n", idx + 1)
+    return offsets
+
+
+class DocumentIndex:
+    __slots__ = ("text", "line_starts", "issues", "issue_lines")
+
+    def __init__(self, text: str, issues: Optional[IssueColumns] = None):
+        self.text = text
+        self.line_starts = line_start_offsets(text)
+        self.issues: Optional[IssueColumns] = None
+        self.issue_lines: Optional[array] = None
+        if issues is not None:
+            self.set_issues(issues)
+
+    def set_issues(self, issues: IssueColumns) -> None:
+        # Issues arrive deduplicated and sorted by start, so line numbers are sorted too.
+        self.issues = issues
+        self.issue_lines = issues.line
+
+    @property
+    def total_chars(self) -> int:
+        return len(self.text)
+
+    @property
+    def total_lines(self) -> int:
+        return len(self.line_starts)
+
+    def line_range_to_chars(self, line_start: int, line_end: int) -> Tuple[int, int]:
+        """Convert an inclusive, 1-based line range into a [start, end) character range."""
+        first = min(max(1, line_start), self.total_lines)
+        last = min(max(first, line_end), self.total_lines)
+        start = self.line_starts[first - 1]
+        end = self.line_starts[last] if last < self.total_lines else len(self.text)
+        return start, end
+
+    def char_range_to_lines(self, start: int, end: int) -> Tuple[int, int]:
+        first = bisect_right(self.line_starts, start)
+        last = max(first, bisect_right(self.line_starts, max(start, end - 1)))
+        return first, last
+
+    def content_window(self, start: int, end: int) -> str:
+        return self.text[max(0, start) : max(0, end)]
+
+    def issue_span_by_offset(self, start: int, end: int) -> Tuple[int, int]:
+        """Index range of issues whose start offset falls in [start, end)."""
+        assert self.issues is not None
+        return bisect_left(self.issues.start, start), bisect_left(self.issues.start, end)
+
+    def issue_span_by_line(self, line_start: int, line_end: int) -> Tuple[int, int]:
+        """Index range of issues starting on lines [line_start, line_end] (inclusive)."""
+        assert self.issue_lines is not None
+        return bisect_left(self.issue_lines, line_start), bisect_right(self.issue_lines, line_end)
+
+
+def parse_stored_issues(payload: str) -> IssueColumns:
+    return IssueColumns.from_dicts(json.loads(payload))
+
+
+class IndexCache:
+    """Small LRU of built `DocumentIndex` objects keyed by content_id."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._lock = threading.Lock()
+        self._store: "OrderedDict[str, DocumentIndex]" = OrderedDict()
+
+    def get_or_build(
+        self, content_id: str, load_text: Callable[[str], Optional[str]], load_issues: Callable[[str], Optional[str]]
+    ) -> Optional[DocumentIndex]:
+        with self._lock:
+            index = self._store.get(content_id)
+            if index is not None:
+                self._store.move_to_end(content_id)
+        if index is None:
+            text = load_text(content_id)
+            if text is None:
+                return None
+            index = DocumentIndex(text)
+        if index.issues is None:
+            # Analysis may finish after the viewer first asked for content; retry until issues exist.
+            payload = load_issues(issues_key(content_id))
+            if payload is not None:
+                index.set_issues(parse_stored_issues(payload))
+        with self._lock:
+            self._store[content_id] = index
+            self._store.move_to_end(content_id)
+            while len(self._store) > self.capacity:
+                self._store.popitem(last=False)
+        return index
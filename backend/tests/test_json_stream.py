@@ -0,0 +1,63 @@
+"""Incrementally parsed JSON `/analyze` bodies: options that arrive after `documents`."""
+import json
+import os
+import tempfile
+
+os.environ.setdefault("STORAGE_ROOT", tempfile.mkdtemp(prefix="turbotext-test-"))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.app as app_module
+from backend.processing.results import DocumentResult
+
+DOCUMENTS = [{"id": f"doc-{i}", "content": f"Document number {i} has a speling mistake."} for i in range(8)]
+
+
+@pytest.fixture
+def pool_calls(monkeypatch):
+    """Stands in for the process pool; records the settings each pool task was submitted with."""
+    calls = []
+
+    async def _run_in_pool(fn, doc_id, content, effective_settings, *args, **kwargs):
+        calls.append((doc_id, effective_settings))
+        return DocumentResult(doc_id, stats={"chunk_size": effective_settings.chunk_size})
+
+    monkeypatch.setattr(app_module, "_run_in_pool", _run_in_pool)
+    return calls
+
+
+def _post(before: dict, after: dict) -> dict:
+    """POST the documents chunked, without Content-Length, so the server parses them as they arrive."""
+
+    def _body():
+        yield json.dumps(before)[:-1].encode() + (b", " if before else b"") + b'"documents": ['
+        for i, doc in enumerate(DOCUMENTS):
+            yield (b", " if i else b"") + json.dumps(doc).encode()
+        yield b"]" + b"".join(f", {json.dumps(k)}: {json.dumps(v)}".encode() for k, v in after.items()) + b"}"
+
+    client = TestClient(app_module.app)  # no lifespan: the pool is never started
+    response = client.post("/analyze", content=_body(), headers={"content-type": "application/json"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_unchanged_late_options_waste_no_pool_tasks(pool_calls):
+    settings = app_module.settings
+    restated = {
+        "language": settings.language,
+        "chunk_size": settings.chunk_size or "auto",
+        "custom_words": ["Speling", "speling ", "mistake"],  # same words as before, another order and case
+        "not_an_option": True,
+    }
+    payload = _post({"custom_words": ["mistake", "speling"]}, restated)
+    assert [f["id"] for f in payload["files"]] == [d["id"] for d in DOCUMENTS]
+    assert sorted(doc_id for doc_id, _ in pool_calls) == sorted(d["id"] for d in DOCUMENTS)
+
+
+def test_changed_late_options_rerun_with_the_final_settings(pool_calls):
+    chunk_size = 2048 if app_module.settings.chunk_size == 1024 else 1024
+    payload = _post({}, {"chunk_size": chunk_size})
+    assert [f["stats"]["chunk_size"] for f in payload["files"]] == [chunk_size] * len(DOCUMENTS)
+    rerun = [doc_id for doc_id, s in pool_calls if s.chunk_size == chunk_size]
+    assert sorted(rerun) == sorted(d["id"] for d in DOCUMENTS)